@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the main API endpoints. Drives the ASGI app in-process
+through httpx (no network, no server process) against mongomock, a real
+MongoDB (--mongo-url), an embedded backend (--storage memory|sqlite), or an
+already running server (--base-url).
+
+    python benchmarks/load.py --concurrency 20 --requests 1000 --output results.json
+    python benchmarks/load.py --storage sqlite
+    python benchmarks/load.py --mongo-url mongodb://localhost:27017 --compare results.json
+
+Reports throughput and p50/p95/p99 latency per scenario. With --compare,
+exits non-zero when any scenario's p95 regressed by more than
+--max-regression percent against the earlier results file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+SCENARIOS = [
+    "health", "contact_create", "contact_list", "contact_list_summary", "contact_list_revalidate",
+    "contact_get", "status_create", "status_list", "portfolio",
+]
+
+
+def percentile_ms(samples: list, pct: int) -> float:
+    if len(samples) < 2:
+        return round(samples[0] * 1000, 3) if samples else 0.0
+    return round(statistics.quantiles(samples, n=100)[pct - 1] * 1000, 3)
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request, total: int, concurrency: int) -> dict:
+    """Issue `total` requests from `concurrency` workers; make_request(i) returns (method, url, kwargs)"""
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            method, url, kwargs = make_request(index)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": percentile_ms(latencies, 50),
+        "p95_ms": percentile_ms(latencies, 95),
+        "p99_ms": percentile_ms(latencies, 99),
+        "max_ms": round(max(latencies) * 1000, 3),
+    }
+
+
+def message_body(index: int, run_id: str) -> dict:
+    return {
+        "name": f"Load Tester {index}",
+        "email": f"load{index}@example.com",
+        "subject": f"Benchmark {run_id}",
+        "message": f"Message {index} from benchmark run {run_id}. " * 4,
+    }
+
+
+async def seed(client: httpx.AsyncClient, messages: int, status_checks: int, run_id: str) -> list:
+    """Import messages in bulk through the API and return their ids"""
+    ids = []
+    for start in range(0, messages, 1000):
+        batch = [message_body(index, run_id) for index in range(start, min(start + 1000, messages))]
+        response = await client.post("/api/contact/batch", json={"messages": batch})
+        response.raise_for_status()
+        ids.extend(item["id"] for item in response.json()["results"] if item["success"])
+    for index in range(status_checks):
+        (await client.post("/api/status", json={"client_name": f"bench-{index % 10}"})).raise_for_status()
+    return ids
+
+
+async def page_cursors(client: httpx.AsyncClient, depths: list, page_size: int) -> dict:
+    """Walk the contact list and remember the cursor that opens each requested page"""
+    cursors, cursor = {0: None}, None
+    for page in range(1, max(depths) + 1):
+        params = {"limit": page_size, **({"cursor": cursor} if cursor else {})}
+        cursor = (await client.get("/api/contact", params=params)).json().get("next_cursor")
+        if cursor is None:
+            break
+        cursors[page] = cursor
+    return cursors
+
+
+@asynccontextmanager
+async def in_process_client(mongo_url, storage):
+    """httpx client bound to a freshly built app with its lifespan running"""
+    os.environ.setdefault("MONGO_URL", mongo_url or "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", f"portfolio_load_benchmark_{uuid.uuid4().hex[:8]}")
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    mongo_client = None
+    if storage != "mongo":
+        os.environ["STORAGE_BACKEND"] = storage
+        os.environ.setdefault("SQLITE_PATH", ":memory:")
+    elif mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        mongo_client = AsyncIOMotorClient(mongo_url)
+    else:
+        # mongomock has no text or TTL index support, so migrations are skipped
+        os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+        from mongomock_motor import AsyncMongoMockClient
+        mongo_client = AsyncMongoMockClient()
+
+    import server
+
+    app = server.create_app(mongo_client=mongo_client)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            try:
+                yield client
+            finally:
+                if mongo_client is not None and mongo_url:
+                    await mongo_client.drop_database(os.environ["DB_NAME"])
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    if args.base_url:
+        client_context = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        client_context = in_process_client(args.mongo_url, args.storage)
+
+    results = {}
+    async with client_context as client:
+        ids = await seed(client, args.seed_messages, args.seed_status_checks, run_id)
+        cursors = await page_cursors(client, args.depths, args.page_size)
+
+        def list_page(cursor):
+            params = {"limit": args.page_size, **({"cursor": cursor} if cursor else {})}
+            return lambda index: ("GET", "/api/contact", {"params": params})
+
+        requests = {
+            "health": lambda index: ("GET", "/api/health", {}),
+            "contact_create": lambda index: (
+                "POST", "/api/contact", {"json": message_body(args.seed_messages + index, run_id)}
+            ),
+            "contact_list_summary": lambda index: (
+                "GET", "/api/contact", {"params": {"limit": args.page_size, "view": "summary"}}
+            ),
+            "contact_get": lambda index: ("GET", f"/api/contact/{ids[index % len(ids)]}", {}),
+            "status_create": lambda index: ("POST", "/api/status", {"json": {"client_name": f"bench-{index % 10}"}}),
+            "status_list": lambda index: ("GET", "/api/status", {"params": {"limit": args.page_size}}),
+            "portfolio": lambda index: ("GET", "/api/portfolio", {"headers": {"Accept-Encoding": "gzip"}}),
+        }
+        for scenario in args.scenarios:
+            if scenario == "contact_list":
+                for depth in args.depths:
+                    if depth not in cursors:
+                        print(f"Skipping contact_list page {depth}: not enough seeded messages", file=sys.stderr)
+                        continue
+                    results[f"contact_list_page_{depth}"] = await run_scenario(
+                        client, list_page(cursors[depth]), args.requests, args.concurrency
+                    )
+            elif scenario == "contact_list_revalidate":
+                # Dashboard poll holding the current page: answered 304 from the ETag
+                params = {"limit": args.page_size}
+                etag = (await client.get("/api/contact", params=params)).headers.get("etag", "")
+                results[scenario] = await run_scenario(
+                    client, lambda index: ("GET", "/api/contact", {"params": params, "headers": {"If-None-Match": etag}}),
+                    args.requests, args.concurrency
+                )
+            elif scenario == "contact_get" and not ids:
+                print("Skipping contact_get: no seeded messages", file=sys.stderr)
+            elif scenario == "portfolio" and (await client.get("/api/portfolio")).status_code == 404:
+                print("Skipping portfolio: no content (set PORTFOLIO_PATH)", file=sys.stderr)
+            else:
+                results[scenario] = await run_scenario(client, requests[scenario], args.requests, args.concurrency)
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "target": args.base_url or (
+            args.storage if args.storage != "mongo" else "mongodb" if args.mongo_url else "mongomock"
+        ),
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "seed_messages": args.seed_messages,
+        "page_size": args.page_size,
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list:
+    """Scenarios whose p95 is more than `max_regression` percent above the baseline"""
+    regressions = []
+    for scenario, result in report["results"].items():
+        previous = baseline.get("results", {}).get(scenario)
+        if not previous or not previous["p95_ms"]:
+            continue
+        change = (result["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+        result["p95_change_pct"] = round(change, 1)
+        if change > max_regression:
+            regressions.append(scenario)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--seed-messages", type=int, default=2000)
+    parser.add_argument("--seed-status-checks", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 5, 15], help="List pages to measure")
+    parser.add_argument("--mongo-url", help="Use this MongoDB instead of mongomock (a scratch database is dropped)")
+    parser.add_argument("--storage", choices=["mongo", "memory", "sqlite"], default="mongo",
+                        help="In-process storage backend (sqlite uses SQLITE_PATH, default in-memory)")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of an in-process app")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Earlier results file to compare p95 latencies against")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="Allowed p95 increase in percent")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    regressions = []
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.max_regression)
+        report["regressions"] = regressions
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Full-text search benchmark: seeds a collection with synthetic contact
+messages, builds the production indexes and times the search pipeline used
+by GET /api/contact/search.
+
+    python benchmarks/search.py --documents 1000000 --queries 200 --budget-ms 100
+
+Needs a real MongoDB (MONGO_URL); uses a separate database that is dropped
+afterwards unless --keep is given. Exits non-zero when p95 exceeds the budget.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+from migrations import INDEXES  # noqa: E402
+from repositories.mongo import MESSAGE_PROJECTION  # noqa: E402
+from services.search import build_search_pipeline  # noqa: E402
+
+WORDS = (
+    "project internship recruiter machine learning python model data pipeline "
+    "opportunity interview role team research computer vision deployment cloud "
+    "portfolio resume collaboration startup freelance contract analytics nlp "
+    "transformer dataset kaggle backend frontend api react fastapi mongodb"
+).split()
+NAMES = ["Asha", "Ravi", "Priya", "John", "Maria", "Chen", "Fatima", "Lucas", "Sara", "Omar"]
+STATUSES = ["unread", "read", "archived"]
+
+# Mix of single words, multi-word, phrase and filtered queries
+QUERIES = [
+    {"q": "recruiter"},
+    {"q": "machine learning"},
+    {"q": "\"computer vision\""},
+    {"q": "internship", "status": "unread"},
+    {"q": "fastapi mongodb", "sort": "newest"},
+    {"q": "interview", "since_days": 90},
+]
+
+
+def make_message(now: datetime) -> dict:
+    name = random.choice(NAMES)
+    return {
+        "id": str(uuid.uuid4()),
+        "name": f"{name} {random.choice(NAMES)}",
+        "email": f"{name.lower()}{random.randint(1, 99999)}@example.com",
+        "subject": " ".join(random.choices(WORDS, k=4)).capitalize(),
+        "message": " ".join(random.choices(WORDS, k=random.randint(20, 80))),
+        "timestamp": now - timedelta(seconds=random.randint(0, 365 * 24 * 3600)),
+        "status": random.choice(STATUSES),
+    }
+
+
+async def seed(collection, documents: int, batch_size: int) -> float:
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    for offset in range(0, documents, batch_size):
+        batch = [make_message(now) for _ in range(min(batch_size, documents - offset))]
+        await collection.insert_many(batch, ordered=False)
+    await collection.create_indexes(INDEXES["contact_messages"])
+    return time.perf_counter() - started
+
+
+async def run(args) -> dict:
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[args.database]
+    try:
+        seed_seconds = None
+        if await db.contact_messages.estimated_document_count() < args.documents:
+            await db.contact_messages.drop()
+            seed_seconds = await seed(db.contact_messages, args.documents, args.batch_size)
+
+        now = datetime.now(timezone.utc)
+        latencies = {}
+        for spec in QUERIES:
+            since = now - timedelta(days=spec["since_days"]) if "since_days" in spec else None
+            pipeline = build_search_pipeline(
+                spec["q"], MESSAGE_PROJECTION, status=spec.get("status"), since=since,
+                sort=spec.get("sort", "relevance"), limit=args.limit
+            )
+            samples = []
+            for _ in range(args.queries):
+                started = time.perf_counter()
+                await db.contact_messages.aggregate(pipeline).to_list(length=args.limit)
+                samples.append((time.perf_counter() - started) * 1000)
+            latencies[json.dumps(spec)] = samples
+
+        all_samples = sorted(s for samples in latencies.values() for s in samples)
+        percentiles = statistics.quantiles(all_samples, n=100)
+        return {
+            "documents": args.documents,
+            "seed_seconds": round(seed_seconds, 1) if seed_seconds is not None else None,
+            "queries": len(all_samples),
+            "p50_ms": round(percentiles[49], 2),
+            "p95_ms": round(percentiles[94], 2),
+            "p99_ms": round(percentiles[98], 2),
+            "per_query_p95_ms": {
+                spec: round(statistics.quantiles(samples, n=100)[94], 2) for spec, samples in latencies.items()
+            },
+            "budget_ms": args.budget_ms,
+        }
+    finally:
+        if not args.keep:
+            await client.drop_database(args.database)
+        client.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200, help="Timed runs per query shape")
+    parser.add_argument("--limit", type=int, default=20, help="Page size, as in the endpoint")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Budget for p95 latency")
+    parser.add_argument("--database", default="portfolio_search_benchmark")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded database for later runs")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    report["within_budget"] = report["p95_ms"] <= args.budget_ms
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return 0 if report["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Serialization micro-benchmark for GET /api/contact list pages: per-row cost
+of the model path (ContactMessage per row, response_model re-validation,
+JSONResponse) against the fast path (stored documents encoded directly).
+
+    python benchmarks/serialization.py --pages 100 1000 --repeat 50
+
+No database needed; rows are synthetic documents shaped like stored ones.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+import utils.serialization as serialization  # noqa: E402
+from models.contact import ContactMessage, ContactMessagesListResponse  # noqa: E402
+from routes.contact import _message_document  # noqa: E402
+
+RESPONSE_FIELD = create_response_field(name="Response_list", type_=ContactMessagesListResponse)
+
+
+def make_rows(count: int) -> list:
+    now = datetime.utcnow().replace(microsecond=0)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Sender {index}",
+            "email": f"sender{index}@example.com",
+            "subject": "Internship opportunity",
+            "message": "Hello, I came across your portfolio and would like to talk. " * 5,
+            "timestamp": now - timedelta(minutes=index),
+            "status": "unread",
+            "ip_address": "203.0.113.7",
+            "user_agent": "Mozilla/5.0",
+        }
+        for index in range(count)
+    ]
+
+
+async def model_path(rows: list) -> bytes:
+    """What the list endpoint did before: build models, then FastAPI validates and encodes again"""
+    content = ContactMessagesListResponse(
+        success=True, count=len(rows), data=[ContactMessage(**row) for row in rows], next_cursor=None
+    )
+    encoded = await serialize_response(field=RESPONSE_FIELD, response_content=content)
+    return JSONResponse(encoded).body
+
+
+async def fast_path(rows: list) -> bytes:
+    return serialization.FastJSONResponse({
+        "success": True, "count": len(rows), "data": [_message_document(row) for row in rows], "next_cursor": None
+    }).body
+
+
+async def time_path(path, rows: list, repeat: int) -> float:
+    """Median microseconds per row"""
+    await path(rows)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await path(rows)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) / len(rows) * 1e6
+
+
+async def run(pages: list, repeat: int) -> dict:
+    orjson = serialization.orjson
+    report = {"orjson": orjson is not None, "pages": {}}
+    for size in pages:
+        rows = make_rows(size)
+        assert json.loads(await model_path(rows)) == json.loads(await fast_path(rows))
+        before = await time_path(model_path, rows, repeat)
+        after = await time_path(fast_path, rows, repeat)
+        serialization.orjson = None
+        stdlib = await time_path(fast_path, rows, repeat)
+        serialization.orjson = orjson
+        report["pages"][size] = {
+            "before_us_per_row": round(before, 2),
+            "after_us_per_row": round(after, 2),
+            "after_stdlib_json_us_per_row": round(stdlib, 2),
+            "speedup": round(before / after, 1),
+        }
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000], help="Page sizes to measure")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args.pages, args.repeat))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark: interpreter + `import server` time, and time until
+the lifespan startup has finished (app ready to serve). Each run is a fresh
+process so nothing is cached between runs.
+
+    python benchmarks/startup.py --runs 5 --budget-ms 1500
+
+Exits non-zero when the median time-to-ready exceeds the budget.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Runs inside a fresh interpreter and prints timings as JSON
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import server
+imported = time.perf_counter()
+
+async def main():
+    app = server.create_app()
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    return ready
+
+ready = asyncio.run(main())
+print(json.dumps({"import_ms": (imported - started) * 1000, "ready_ms": (ready - started) * 1000}))
+"""
+
+
+def run_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="Budget for median time-to-ready")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    samples = [run_once() for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "import_ms_median": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "ready_ms_median": round(statistics.median(s["ready_ms"] for s in samples), 1),
+        "ready_ms_max": round(max(s["ready_ms"] for s in samples), 1),
+        "budget_ms": args.budget_ms,
+    }
+    report["within_budget"] = report["ready_ms_median"] <= args.budget_ms
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps({"samples": samples, **report}, indent=2))
+    return 0 if report["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MongoSettings:
+    """MongoDB connection and pool settings read from the environment"""
+    url: str = field(repr=False)  # may embed credentials; log `redacted_url` instead
+    db_name: str
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    max_idle_time_ms: Optional[int] = None
+    wait_queue_timeout_ms: Optional[int] = None
+    server_selection_timeout_ms: int = 30000
+
+    @classmethod
+    def from_env(cls) -> "MongoSettings":
+        max_idle = env_int("MONGO_MAX_IDLE_TIME_MS", 0)
+        wait_queue = env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0)
+        return cls(
+            url=os.environ["MONGO_URL"],
+            db_name=os.environ["DB_NAME"],
+            max_pool_size=env_int("MONGO_MAX_POOL_SIZE", cls.max_pool_size),
+            min_pool_size=env_int("MONGO_MIN_POOL_SIZE", cls.min_pool_size),
+            max_idle_time_ms=max_idle or None,
+            wait_queue_timeout_ms=wait_queue or None,
+            server_selection_timeout_ms=env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", cls.server_selection_timeout_ms),
+        )
+
+    @property
+    def redacted_url(self) -> str:
+        """`url` with the password and any secret-looking query parameters masked"""
+        return redact_url(self.url)
+
+    def client_options(self) -> dict:
+        """Keyword arguments for AsyncIOMotorClient"""
+        options = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+        }
+        if self.max_idle_time_ms is not None:
+            options["maxIdleTimeMS"] = self.max_idle_time_ms
+        if self.wait_queue_timeout_ms is not None:
+            options["waitQueueTimeoutMS"] = self.wait_queue_timeout_ms
+        return options
+
+
+def redact_url(url: str) -> str:
+    """Mask the password in a connection string's userinfo and password/secret/key query parameters"""
+    scheme, separator, rest = url.partition("://")
+    if not separator:
+        return url
+    location, _, query = rest.partition("?")
+    userinfo, at, hosts = location.rpartition("@")
+    if at:
+        user, colon, _ = userinfo.partition(":")
+        location = f"{user}{':***' if colon else ''}@{hosts}"
+    if query:
+        params = [
+            (name, "***" if any(word in name.lower() for word in ("password", "secret", "key")) else value)
+            for name, value in parse_qsl(query, keep_blank_values=True)
+        ]
+        location = f"{location}?{urlencode(params, safe='*/,:')}"
+    return f"{scheme}://{location}"
+
+
+def create_client(settings: MongoSettings, event_listeners: Optional[List] = None) -> AsyncIOMotorClient:
+    """Build the Motor client with the configured pool options"""
+    return AsyncIOMotorClient(
+        settings.url,
+        event_listeners=event_listeners or [],
+        **settings.client_options()
+    )
+
+
+async def warm_up_pool(db: AsyncIOMotorDatabase, size: int) -> int:
+    """
+    Open `size` pooled connections up front by running that many pings
+    concurrently, so connection setup and TLS handshakes happen during
+    startup instead of inside the first user requests. Returns the number
+    of pings that succeeded.
+    """
+    if size <= 0:
+        return 0
+    results = await asyncio.gather(*(db.command("ping") for _ in range(size)), return_exceptions=True)
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        logger.warning("Connection pool warm-up: %s/%s pings failed: %s", len(failures), size, failures[0])
+    return size - len(failures)
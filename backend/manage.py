@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Management commands for the portfolio API
+
+    python manage.py migrate              # build indexes and run data migrations
+    python manage.py rebuild-stats        # recompute contact stats rollups from scratch
+    python manage.py serve --workers 4    # migrate once, then start N uvicorn workers
+    python manage.py archive              # apply the retention policy now (cron-friendly)
+    python manage.py restore-archive archive/contact_messages/dt=2024-01-05
+    python manage.py import-portfolio portfolio.json   # for PORTFOLIO_SOURCE=mongo
+
+migrate and rebuild-stats only apply to the Mongo storage backend.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("manage")
+
+
+async def migrate() -> "MigrationResult":
+    """Run index creation and data migrations against the configured database"""
+    from database import MongoSettings, create_client
+    from migrations import run_migrations
+
+    settings = MongoSettings.from_env()
+    client = create_client(settings)
+    try:
+        return await run_migrations(client[settings.db_name])
+    finally:
+        client.close()
+
+
+async def rebuild_stats() -> int:
+    """Recompute the contact stats rollups with a single aggregation over all messages"""
+    from database import MongoSettings, create_client
+    from migrations import INDEXES
+    from services.stats import STATS_COLLECTION, rebuild_stats as rebuild
+
+    settings = MongoSettings.from_env()
+    client = create_client(settings)
+    try:
+        db = client[settings.db_name]
+        rollups = await rebuild(db)
+        # $out creates the collection without indexes the first time
+        await db[STATS_COLLECTION].create_indexes(INDEXES[STATS_COLLECTION])
+        return rollups
+    finally:
+        client.close()
+
+
+async def open_configured_storage():
+    """(storage, db, client) for the configured backend; client and db are None for embedded ones"""
+    from database import MongoSettings, create_client
+    from storage import StorageSettings, open_storage
+
+    storage_settings = StorageSettings.from_env()
+    client = db = None
+    if storage_settings.backend == "mongo":
+        settings = MongoSettings.from_env()
+        client = create_client(settings)
+        db = client[settings.db_name]
+    return await open_storage(storage_settings, db), db, client
+
+
+async def archive() -> int:
+    """Expire status checks and archive contact messages per the retention settings; returns messages archived"""
+    from services.retention import RetentionJob, RetentionSettings, ensure_status_check_ttl
+
+    settings = RetentionSettings.from_env()
+    storage, db, client = await open_configured_storage()
+    try:
+        if db is not None:
+            await ensure_status_check_ttl(db, settings.status_check_days)
+        job = RetentionJob(storage, settings, db)
+        await job.run_once()
+        return job.archived
+    finally:
+        await storage.close()
+        if client is not None:
+            client.close()
+
+
+async def restore(paths) -> tuple:
+    """Insert archived contact messages back; returns (restored, skipped as already present)"""
+    from services.retention import RetentionSettings, restore_archive
+
+    storage, _, client = await open_configured_storage()
+    try:
+        return await restore_archive(storage.contacts, paths, RetentionSettings.from_env().batch_size)
+    finally:
+        await storage.close()
+        if client is not None:
+            client.close()
+
+
+async def import_portfolio(path: str) -> int:
+    """Replace the portfolio_content collection with the sections of a JSON file; returns the section count"""
+    from datetime import datetime
+
+    from database import MongoSettings, create_client
+    from services.portfolio import PORTFOLIO_COLLECTION, PortfolioSnapshot
+
+    with open(path, encoding="utf-8") as file:
+        content = json.load(file)
+    PortfolioSnapshot.build(content)  # same validation the server applies
+    settings = MongoSettings.from_env()
+    client = create_client(settings)
+    try:
+        collection = client[settings.db_name][PORTFOLIO_COLLECTION]
+        now = datetime.utcnow()
+        for section, data in content.items():
+            await collection.replace_one({"_id": section}, {"data": data, "updated_at": now}, upsert=True)
+        await collection.delete_many({"_id": {"$nin": list(content)}})
+        return len(content)
+    finally:
+        client.close()
+
+
+def serve(host: str, port: int, workers: int, migrate_first: bool) -> None:
+    """
+    Start uvicorn with one app instance (and Mongo client) per worker process.
+    Migrations run once here, before workers fork, so workers skip them.
+    """
+    import uvicorn
+
+    if migrate_first:
+        asyncio.run(migrate())
+    os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+    # Lets each worker know it has siblings, to bound per-worker caches (see server.bound_worker_staleness)
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    # Open event streams never end on their own; give them a bounded grace period on shutdown
+    uvicorn.run(
+        "server:create_app", factory=True, host=host, port=port, workers=workers, timeout_graceful_shutdown=10
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("migrate", help="Build indexes and run data migrations")
+    commands.add_parser("rebuild-stats", help="Recompute contact stats rollups from contact_messages")
+
+    commands.add_parser("archive", help="Apply the retention policy: archive old contact messages now")
+    restore_parser = commands.add_parser("restore-archive", help="Load archived contact messages back into storage")
+    restore_parser.add_argument("paths", nargs="+", help="Archive files or directories containing them")
+
+    portfolio_parser = commands.add_parser("import-portfolio", help="Load portfolio content from a JSON file into MongoDB")
+    portfolio_parser.add_argument("path", help="JSON object of sections (skills, projects, ...)")
+
+    serve_parser = commands.add_parser("serve", help="Run the API with multiple worker processes")
+    serve_parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    serve_parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8001")))
+    serve_parser.add_argument(
+        "--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        help="Worker processes (default: WEB_CONCURRENCY or CPU count)"
+    )
+    serve_parser.add_argument("--skip-migrations", action="store_true", help="Do not migrate before starting")
+
+    args = parser.parse_args(argv)
+    if args.command == "migrate":
+        from migrations import MigrationResult
+
+        result = asyncio.run(migrate())
+        if result == MigrationResult.LOCKED:
+            logger.info("Migrations skipped: lock held by another process")
+        elif result == MigrationResult.UP_TO_DATE:
+            logger.info("Schema already up to date")
+        else:
+            logger.info("Migrations complete")
+        return 0
+    if args.command == "rebuild-stats":
+        rollups = asyncio.run(rebuild_stats())
+        logger.info("Contact stats rebuilt (%s rollup documents)", rollups)
+        return 0
+    if args.command == "archive":
+        archived = asyncio.run(archive())
+        logger.info("Retention applied (%s contact messages archived)", archived)
+        return 0
+    if args.command == "restore-archive":
+        restored, skipped = asyncio.run(restore(args.paths))
+        logger.info("Restored %s contact messages (%s already present)", restored, skipped)
+        return 0
+    if args.command == "import-portfolio":
+        sections = asyncio.run(import_portfolio(args.path))
+        logger.info(
+            "Portfolio content imported (%s sections); running servers pick it up on their next check", sections
+        )
+        return 0
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers, not args.skip_migrations)
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
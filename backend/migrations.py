@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from repositories.base import MESSAGE_LIST_FIELDS
+from services.search import SEARCH_WEIGHTS
+from services.stats import STATS_COLLECTION, rebuild_stats
+
+logger = logging.getLogger(__name__)
+
+# Indexes made redundant by a later one, dropped once the replacement exists
+RETIRED_INDEXES = {
+    "contact_messages": [
+        "timestamp_-1_id_-1",  # prefix of contact_listing (version 5)
+        "timestamp_-1",  # also a prefix of contact_listing (version 9)
+    ],
+}
+
+# Collection holding the migration lock and schema version documents
+MIGRATIONS_COLLECTION = "schema_migrations"
+LOCK_ID = "lock"
+VERSION_ID = "version"
+
+# Bump whenever INDEXES or the data migrations below change, so existing
+# deployments pick the change up on their next boot
+SCHEMA_VERSION = 9
+
+
+class MigrationResult(str, Enum):
+    """Outcome of `run_migrations`"""
+    APPLIED = "applied"
+    UP_TO_DATE = "up_to_date"  # schema already at SCHEMA_VERSION; nothing to do
+    LOCKED = "locked"  # another process holds the migration lock
+
+INDEXES = {
+    "contact_messages": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)]),
+        # Keyset pagination; the trailing fields make summary listings covered queries
+        IndexModel(
+            [("timestamp", DESCENDING), ("id", DESCENDING)]
+            + [(field, ASCENDING) for field in MESSAGE_LIST_FIELDS if field not in ("timestamp", "id")],
+            name="contact_listing"
+        ),
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("content_hash", ASCENDING), ("timestamp", DESCENDING)]),  # Duplicate suppression
+        IndexModel(
+            [(field, TEXT) for field in SEARCH_WEIGHTS],
+            weights=SEARCH_WEIGHTS, name="contact_text_search"
+        ),
+    ],
+    "status_checks": [
+        IndexModel([("timestamp", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("client_name", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)]),
+    ],
+    STATS_COLLECTION: [
+        IndexModel([("kind", ASCENDING), ("total", DESCENDING)]),  # Top sender domains
+    ],
+    "rate_limits": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "idempotency_keys": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "notification_outbox": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)]),  # Due entries, oldest first
+    ],
+}
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """
+    Create the indexes every collection relies on: one `create_indexes` call
+    per collection (built together by the server), all collections concurrently
+    """
+    await asyncio.gather(*(
+        db[collection].create_indexes(models) for collection, models in INDEXES.items()
+    ))
+
+
+async def drop_retired_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Drop the indexes listed in RETIRED_INDEXES, ignoring ones already gone"""
+    for collection, names in RETIRED_INDEXES.items():
+        existing = await db[collection].index_information()
+        for name in names:
+            if name in existing:
+                await db[collection].drop_index(name)
+                logger.info("✓ Dropped retired index %s.%s", collection, name)
+
+
+async def get_schema_version(db: AsyncIOMotorDatabase) -> int:
+    doc = await db[MIGRATIONS_COLLECTION].find_one({"_id": VERSION_ID})
+    return doc["version"] if doc else 0
+
+
+async def acquire_lock(db: AsyncIOMotorDatabase, owner: str, lease_seconds: float, lock_id: str = LOCK_ID) -> bool:
+    """
+    Take the migration lock (or another named lock kept in the same
+    collection) unless another process holds an unexpired lease.
+    The lock document has a fixed _id, so a concurrent upsert loses with a
+    duplicate key error instead of creating a second lock.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        await db[MIGRATIONS_COLLECTION].find_one_and_update(
+            {"_id": lock_id, "$or": [{"locked_until": None}, {"locked_until": {"$lt": now}}]},
+            {"$set": {"owner": owner, "locked_until": now + timedelta(seconds=lease_seconds)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+async def release_lock(db: AsyncIOMotorDatabase, owner: str, lock_id: str = LOCK_ID) -> None:
+    await db[MIGRATIONS_COLLECTION].update_one(
+        {"_id": lock_id, "owner": owner},
+        {"$set": {"locked_until": None, "completed_at": datetime.now(timezone.utc)}}
+    )
+
+
+async def run_migrations(db: AsyncIOMotorDatabase, lease_seconds: float = 600) -> MigrationResult:
+    """
+    Bring indexes and data up to SCHEMA_VERSION. Boots with nothing to do cost
+    a single read of the version document. Otherwise the work runs under a
+    database lock so that only one worker does it when several start at once.
+    """
+    if await get_schema_version(db) >= SCHEMA_VERSION:
+        return MigrationResult.UP_TO_DATE
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    if not await acquire_lock(db, owner, lease_seconds):
+        logger.info("Migrations already running in another process, skipping")
+        return MigrationResult.LOCKED
+    try:
+        # Another process may have finished while we waited for the lock
+        current = await get_schema_version(db)
+        if current >= SCHEMA_VERSION:
+            return MigrationResult.UP_TO_DATE
+        
+        await ensure_indexes(db)
+        await drop_retired_indexes(db)
+        
+        # Convert legacy ISO-string status check timestamps to native datetimes
+        migrated = await migrate_status_check_timestamps(db)
+        
+        # Seed the contact stats rollups from existing messages (version 4)
+        if current < 4:
+            rollups = await rebuild_stats(db)
+            logger.info("✓ Contact stats rollups built (%s documents)", rollups)
+        
+        # Let the contact event stream report which message was deleted (version 6)
+        if current < 6:
+            await enable_change_stream_pre_images(db)
+        
+        await db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": VERSION_ID},
+            {"$set": {"version": SCHEMA_VERSION, "applied_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        logger.info(
+            "✓ Schema migrated from version %s to %s (%s status check timestamps converted)",
+            current, SCHEMA_VERSION, migrated
+        )
+        return MigrationResult.APPLIED
+    finally:
+        await release_lock(db, owner)
+
+
+async def enable_change_stream_pre_images(db: AsyncIOMotorDatabase) -> bool:
+    """
+    Record pre-images for contact_messages so change stream deletes carry the
+    deleted document. Needs MongoDB 6.0+ on a replica set; elsewhere this is a
+    no-op and the event stream falls back to `reset` events for deletes.
+    """
+    try:
+        await db.command("collMod", "contact_messages", changeStreamPreAndPostImages={"enabled": True})
+        return True
+    except OperationFailure as e:
+        logger.info("Change stream pre-images not enabled: %s", e)
+        return False
+
+
+async def migrate_status_check_timestamps(db: AsyncIOMotorDatabase, batch_size: int = 1000) -> int:
+    """
+    Convert status_checks rows whose timestamp was stored as an ISO string
+    into native BSON datetimes. Safe to run repeatedly.
+    """
+    migrated = 0
+    operations = []
+    cursor = db.status_checks.find(
+        {"timestamp": {"$type": "string"}}, {"_id": 1, "timestamp": 1}, batch_size=batch_size
+    )
+    async for doc in cursor:
+        try:
+            timestamp = datetime.fromisoformat(doc["timestamp"])
+        except ValueError:
+            logger.warning("Skipping status check %s with unparseable timestamp", doc["_id"])
+            continue
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"timestamp": timestamp}}))
+        if len(operations) >= batch_size:
+            result = await db.status_checks.bulk_write(operations, ordered=False)
+            migrated += result.modified_count
+            operations = []
+    if operations:
+        result = await db.status_checks.bulk_write(operations, ordered=False)
+        migrated += result.modified_count
+    return migrated
@@ -1,9 +1,16 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 import uuid
 
 
+# Workflow states a contact message can be in
+MessageStatus = Literal["unread", "read", "archived"]
+
+# Upper bound on items accepted by a single bulk request
+MAX_BULK_ITEMS = 1000
+
+
 class ContactMessageCreate(BaseModel):
     """Schema for creating a new contact message"""
     name: str = Field(..., min_length=1, max_length=100)
@@ -24,11 +31,6 @@ class ContactMessage(BaseModel):
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 
 class ContactMessageResponse(BaseModel):
     """API response schema for contact message"""
@@ -42,3 +44,84 @@ class ContactMessagesListResponse(BaseModel):
     success: bool
     count: int
     data: list[ContactMessage]
+    next_cursor: Optional[str] = None
+
+
+class ContactSearchResult(ContactMessage):
+    """A contact message matched by full-text search"""
+    score: float
+    highlights: Dict[str, str] = Field(default_factory=dict)
+
+
+class ContactSearchResponse(BaseModel):
+    """API response schema for full-text search results"""
+    success: bool
+    count: int
+    data: list[ContactSearchResult]
+    next_cursor: Optional[str] = None
+
+
+class DailyContactStats(BaseModel):
+    """Message counts for one UTC day"""
+    day: str
+    total: int
+    by_status: Dict[str, int]
+
+
+class SenderDomainCount(BaseModel):
+    """Messages received from one sender email domain"""
+    domain: str
+    count: int
+
+
+class ContactStats(BaseModel):
+    """Contact traffic rollups for the dashboard"""
+    total: int
+    by_status: Dict[str, int]
+    daily: List[DailyContactStats]
+    top_domains: List[SenderDomainCount]
+
+
+class ContactStatsResponse(BaseModel):
+    """API response schema for contact traffic stats"""
+    success: bool
+    data: ContactStats
+
+
+class ContactMessageImport(ContactMessageCreate):
+    """Schema for importing a message, optionally preserving its original metadata"""
+    id: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    status: MessageStatus = "unread"
+
+
+class ContactBatchCreateRequest(BaseModel):
+    """Request schema for batch import of contact messages"""
+    messages: List[ContactMessageImport] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class ContactBulkDeleteRequest(BaseModel):
+    """Request schema for deleting many contact messages"""
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class ContactStatusUpdateRequest(BaseModel):
+    """Request schema for changing the status of many contact messages"""
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+    status: MessageStatus
+
+
+class BulkItemResult(BaseModel):
+    """Outcome of a bulk operation for a single message"""
+    id: str
+    success: bool
+    result: str  # created | duplicate | deleted | updated | unchanged | not_found | failed
+    error: Optional[str] = None
+
+
+class BulkOperationResponse(BaseModel):
+    """API response schema for bulk operations"""
+    success: bool
+    message: str
+    processed: int
+    results: List[BulkItemResult]
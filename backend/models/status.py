@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+from datetime import datetime, timezone
+import uuid
+
+
+class StatusCheck(BaseModel):
+    """Schema for a status check"""
+    model_config = ConfigDict(extra="ignore")  # Ignore MongoDB's _id field
+    
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    client_name: str
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @field_validator("timestamp")
+    @classmethod
+    def assume_utc(cls, value: datetime) -> datetime:
+        # MongoDB hands back naive datetimes that are already in UTC
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class StatusCheckCreate(BaseModel):
+    """Schema for creating a status check"""
+    client_name: str
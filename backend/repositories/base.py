@@ -0,0 +1,184 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from models.contact import ContactMessage
+
+# Public contact message fields, in schema order; stored documents may also
+# carry internal fields (e.g. content_hash) that are never returned
+MESSAGE_FIELDS = list(ContactMessage.model_fields)
+
+# Fields the stats and cache bookkeeping need about a message being changed
+MESSAGE_SUMMARY_FIELDS = ["id", "timestamp", "email", "status"]
+
+# Fields returned by the inbox list view (GET /api/contact?view=summary); the
+# listing index covers exactly these, so the list query never reads documents
+MESSAGE_LIST_FIELDS = ["id", "name", "email", "subject", "timestamp", "status"]
+
+
+class DuplicateMessageError(Exception):
+    """Raised when a message with the same id is already stored"""
+
+
+def utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Normalize to a naive UTC datetime, the form MongoDB hands back, so every
+    backend compares and returns timestamps the same way
+    """
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class ContactRepository(ABC):
+    """
+    Storage for contact messages. Documents returned by read methods contain
+    the public message fields only (see MESSAGE_FIELDS), timestamps as naive
+    UTC datetimes, and lists are ordered newest first by (timestamp, id).
+    """
+
+    @abstractmethod
+    async def insert(self, doc: dict) -> None:
+        """Store one message; raises DuplicateMessageError if its id exists"""
+
+    @abstractmethod
+    async def insert_many(self, docs: List[dict]) -> Dict[int, Exception]:
+        """
+        Store many messages, continuing past failures. Returns the errors by
+        index into `docs` (DuplicateMessageError for existing ids).
+        """
+
+    @abstractmethod
+    async def get(self, message_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def list_page(
+        self, cursor: Optional[str], limit: int, skip: int = 0, fields: Optional[List[str]] = None
+    ) -> List[dict]:
+        """
+        One page after `cursor` (raises InvalidCursorError); `skip` is the
+        deprecated offset. `fields` limits each document to those public
+        fields and must include id and timestamp; all of them by default.
+        """
+
+    @abstractmethod
+    def iter_all(self, batch_size: int) -> AsyncIterator[dict]:
+        """Every message, newest first, fetched `batch_size` at a time"""
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "relevance",
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[dict]:
+        """
+        Full-text search over name, subject and message using MongoDB $text
+        query syntax. Results carry a `score` and are ordered by (score,
+        timestamp, id) or, with sort="newest", by (timestamp, id).
+        """
+
+    @abstractmethod
+    async def find_by_content_hash(self, digest: str, since: datetime) -> Optional[dict]:
+        """Newest message with this content hash stored at or after `since`"""
+
+    @abstractmethod
+    async def find_many(self, ids: Iterable[str]) -> Dict[str, dict]:
+        """MESSAGE_SUMMARY_FIELDS of the existing messages among `ids`, keyed by id"""
+
+    @abstractmethod
+    async def delete(self, message_id: str) -> Optional[dict]:
+        """Delete one message; returns its MESSAGE_SUMMARY_FIELDS, or None if missing"""
+
+    @abstractmethod
+    async def delete_many(self, messages: Dict[str, dict]) -> int:
+        """Delete messages previously returned by `find_many`; returns the number deleted"""
+
+    @abstractmethod
+    async def update_status(self, messages: Dict[str, dict], status: str) -> int:
+        """Set the status of messages returned by `find_many`; returns the number changed"""
+
+    @abstractmethod
+    async def list_expired(self, before: datetime, handled_before: Optional[datetime], limit: int) -> List[dict]:
+        """
+        Up to `limit` messages stored before `before`, or with status
+        "archived" stored before `handled_before`, oldest first (retention)
+        """
+
+    @abstractmethod
+    async def stats(self, days: int, top_domains: int) -> dict:
+        """Counts per day and status plus top sender domains (see services.stats.read_stats)"""
+
+
+class StatusCheckRepository(ABC):
+    """Storage for status checks, listed newest first by (timestamp, id)"""
+
+    @abstractmethod
+    async def insert(self, doc: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def list(
+        self,
+        client_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[dict]:
+        """One page of status checks after `cursor` (raises InvalidCursorError)"""
+
+    @abstractmethod
+    async def delete_before(self, before: datetime) -> int:
+        """Delete status checks older than `before`; returns the number deleted"""
+
+
+class NotificationOutboxRepository(ABC):
+    """
+    Notifications waiting to be delivered, one entry per message and
+    destination. Entries are deleted once delivered; ones that exhaust their
+    retries stay behind with status "failed". Timestamps are naive UTC.
+    """
+
+    @abstractmethod
+    async def enqueue(self, entries: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    async def claim_due(self, now: datetime, lease_until: datetime, limit: int) -> List[dict]:
+        """
+        Up to `limit` pending entries due by `now`, oldest first. Their
+        `next_attempt_at` moves to `lease_until`, so no other worker claims
+        them meanwhile and a crashed worker's claims come due again.
+        """
+
+    @abstractmethod
+    async def delete(self, entry_ids: List[str]) -> int:
+        ...
+
+    @abstractmethod
+    async def record_failure(
+        self, entry_id: str, attempts: int, error: str, next_attempt_at: Optional[datetime]
+    ) -> None:
+        """Schedule another attempt at `next_attempt_at`, or give up (status "failed") when it is None"""
+
+
+class Storage(ABC):
+    """A storage backend: one repository per collection plus lifecycle hooks"""
+
+    name: str
+    contacts: ContactRepository
+    status_checks: StatusCheckRepository
+    notifications: NotificationOutboxRepository
+
+    @abstractmethod
+    async def ping(self) -> None:
+        """Raise if the backend cannot serve requests"""
+
+    async def close(self) -> None:
+        pass
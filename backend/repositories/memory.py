@@ -0,0 +1,309 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from repositories.base import (
+    MESSAGE_FIELDS,
+    MESSAGE_SUMMARY_FIELDS,
+    ContactRepository,
+    DuplicateMessageError,
+    NotificationOutboxRepository,
+    StatusCheckRepository,
+    Storage,
+    utc_naive,
+)
+from services.search import parse_query, text_score
+from services.stats import assemble_stats, sender_domain, stats_day, stats_window
+from utils.pagination import decode_cursor, decode_score_cursor
+
+
+class _KeysetIndex:
+    """(timestamp, id) keys kept sorted, the in-memory equivalent of the keyset index"""
+
+    def __init__(self):
+        self.keys: List[Tuple[datetime, str]] = []
+
+    def add(self, doc: dict) -> None:
+        insort(self.keys, (doc["timestamp"], doc["id"]))
+
+    def remove(self, doc: dict) -> None:
+        key = (doc["timestamp"], doc["id"])
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+
+    def newest_first(self, cursor: Optional[str], until: Optional[datetime] = None) -> Iterator[str]:
+        """Ids strictly after the cursor (and before `until`), newest first"""
+        end = len(self.keys)
+        if cursor:
+            timestamp, doc_id = decode_cursor(cursor)
+            end = bisect_left(self.keys, (utc_naive(timestamp), doc_id))
+        if until is not None:
+            end = min(end, bisect_left(self.keys, (until, "")))
+        for position in range(end - 1, -1, -1):
+            yield self.keys[position][1]
+
+
+def _public(doc: dict, fields: List[str] = MESSAGE_FIELDS) -> dict:
+    return {field: doc[field] for field in fields if field in doc}
+
+
+class MemoryContactRepository(ContactRepository):
+    """
+    Contact messages held in process memory, indexed by id, by
+    (timestamp, id) and by content hash. Every method runs without
+    awaiting, so each call is atomic with respect to other requests.
+    """
+
+    def __init__(self):
+        self._docs: Dict[str, dict] = {}
+        self._keyset = _KeysetIndex()
+        self._by_hash: Dict[str, set] = {}
+
+    def _add(self, doc: dict) -> None:
+        if doc["id"] in self._docs:
+            raise DuplicateMessageError(f"Message {doc['id']} already exists")
+        doc = {**doc, "timestamp": utc_naive(doc["timestamp"])}
+        self._docs[doc["id"]] = doc
+        self._keyset.add(doc)
+        if doc.get("content_hash"):
+            self._by_hash.setdefault(doc["content_hash"], set()).add(doc["id"])
+
+    def _remove(self, message_id: str) -> Optional[dict]:
+        doc = self._docs.pop(message_id, None)
+        if doc is None:
+            return None
+        self._keyset.remove(doc)
+        if doc.get("content_hash"):
+            self._by_hash.get(doc["content_hash"], set()).discard(message_id)
+        return doc
+
+    async def insert(self, doc: dict) -> None:
+        self._add(doc)
+
+    async def insert_many(self, docs: List[dict]) -> Dict[int, Exception]:
+        errors = {}
+        for index, doc in enumerate(docs):
+            try:
+                self._add(doc)
+            except DuplicateMessageError as e:
+                errors[index] = e
+        return errors
+
+    async def get(self, message_id: str) -> Optional[dict]:
+        doc = self._docs.get(message_id)
+        return _public(doc) if doc is not None else None
+
+    async def list_page(
+        self, cursor: Optional[str], limit: int, skip: int = 0, fields: Optional[List[str]] = None
+    ) -> List[dict]:
+        if cursor:
+            skip = 0
+        page = []
+        for position, message_id in enumerate(self._keyset.newest_first(cursor)):
+            if position < skip:
+                continue
+            page.append(_public(self._docs[message_id], fields or MESSAGE_FIELDS))
+            if len(page) >= limit:
+                break
+        return page
+
+    async def iter_all(self, batch_size: int) -> AsyncIterator[dict]:
+        for message_id in list(self._keyset.newest_first(None)):
+            doc = self._docs.get(message_id)
+            if doc is not None:
+                yield _public(doc)
+
+    async def search(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "relevance",
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[dict]:
+        words, phrases, excluded = parse_query(query)
+        since, until = utc_naive(since), utc_naive(until)
+        after = None
+        if cursor and sort == "newest":
+            timestamp, doc_id = decode_cursor(cursor)
+            after = (utc_naive(timestamp), doc_id)
+        elif cursor:
+            score, timestamp, doc_id = decode_score_cursor(cursor)
+            after = (score, utc_naive(timestamp), doc_id)
+
+        hits = []
+        for doc in self._docs.values():
+            if status is not None and doc.get("status") != status:
+                continue
+            if (since is not None and doc["timestamp"] < since) or (until is not None and doc["timestamp"] >= until):
+                continue
+            score = text_score(doc, words, phrases, excluded)
+            if score is None:
+                continue
+            key = (doc["timestamp"], doc["id"]) if sort == "newest" else (score, doc["timestamp"], doc["id"])
+            if after is not None and key >= after:
+                continue
+            hits.append((key, score, doc))
+
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [{**_public(doc), "score": score} for _, score, doc in hits[:limit]]
+
+    async def find_by_content_hash(self, digest: str, since: datetime) -> Optional[dict]:
+        since = utc_naive(since)
+        matches = [self._docs[message_id] for message_id in self._by_hash.get(digest, ())]
+        matches = [doc for doc in matches if doc["timestamp"] >= since]
+        if not matches:
+            return None
+        return _public(max(matches, key=lambda doc: doc["timestamp"]))
+
+    async def find_many(self, ids: Iterable[str]) -> Dict[str, dict]:
+        return {
+            message_id: _public(self._docs[message_id], MESSAGE_SUMMARY_FIELDS)
+            for message_id in ids
+            if message_id in self._docs
+        }
+
+    async def delete(self, message_id: str) -> Optional[dict]:
+        doc = self._remove(message_id)
+        return _public(doc, MESSAGE_SUMMARY_FIELDS) if doc is not None else None
+
+    async def delete_many(self, messages: Dict[str, dict]) -> int:
+        return sum(1 for message_id in messages if self._remove(message_id) is not None)
+
+    async def update_status(self, messages: Dict[str, dict], status: str) -> int:
+        modified = 0
+        for message_id in messages:
+            doc = self._docs.get(message_id)
+            if doc is not None and doc.get("status") != status:
+                doc["status"] = status
+                modified += 1
+        return modified
+
+    async def list_expired(self, before: datetime, handled_before: Optional[datetime], limit: int) -> List[dict]:
+        before, handled_before = utc_naive(before), utc_naive(handled_before)
+        stop = max(before, handled_before) if handled_before is not None else before
+        expired = []
+        for timestamp, message_id in self._keyset.keys:
+            if timestamp >= stop:
+                break
+            doc = self._docs[message_id]
+            if timestamp < before or doc.get("status") == "archived":
+                expired.append(_public(doc))
+                if len(expired) >= limit:
+                    break
+        return expired
+
+    async def stats(self, days: int, top_domains: int) -> dict:
+        # Counted on demand; a single-node store is small enough to scan
+        window = stats_window(days)
+        first_day = window[0]
+        day_counts: Dict[str, Counter] = {}
+        totals, domains = Counter(), Counter()
+        for doc in self._docs.values():
+            status = doc.get("status", "unread")
+            totals[status] += 1
+            domains[sender_domain(doc["email"])] += 1
+            day = stats_day(doc["timestamp"])
+            if day >= first_day:
+                day_counts.setdefault(day, Counter())[status] += 1
+        return assemble_stats(window, day_counts, totals, domains.most_common(top_domains))
+
+
+class MemoryStatusCheckRepository(StatusCheckRepository):
+    """Status checks held in process memory, indexed by (timestamp, id)"""
+
+    def __init__(self):
+        self._docs: Dict[str, dict] = {}
+        self._keyset = _KeysetIndex()
+
+    async def insert(self, doc: dict) -> None:
+        doc = {**doc, "timestamp": utc_naive(doc["timestamp"])}
+        self._docs[doc["id"]] = doc
+        self._keyset.add(doc)
+
+    async def list(
+        self,
+        client_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[dict]:
+        since = utc_naive(since)
+        page = []
+        for check_id in self._keyset.newest_first(cursor, until=utc_naive(until)):
+            doc = self._docs[check_id]
+            if since is not None and doc["timestamp"] < since:
+                break
+            if client_name is not None and doc["client_name"] != client_name:
+                continue
+            page.append(dict(doc))
+            if len(page) >= limit:
+                break
+        return page
+
+    async def delete_before(self, before: datetime) -> int:
+        before = utc_naive(before)
+        expired = []
+        for timestamp, check_id in self._keyset.keys:
+            if timestamp >= before:
+                break
+            expired.append(self._docs[check_id])
+        for doc in expired:
+            del self._docs[doc["id"]]
+            self._keyset.remove(doc)
+        return len(expired)
+
+
+class MemoryNotificationOutboxRepository(NotificationOutboxRepository):
+    """Notification outbox held in process memory"""
+
+    def __init__(self):
+        self._entries: Dict[str, dict] = {}
+
+    async def enqueue(self, entries: List[dict]) -> None:
+        for entry in entries:
+            self._entries[entry["id"]] = dict(entry)
+
+    async def claim_due(self, now: datetime, lease_until: datetime, limit: int) -> List[dict]:
+        due = sorted(
+            (entry for entry in self._entries.values()
+             if entry["status"] == "pending" and entry["next_attempt_at"] <= now),
+            key=lambda entry: entry["next_attempt_at"],
+        )[:limit]
+        for entry in due:
+            entry["next_attempt_at"] = lease_until
+        return [dict(entry) for entry in due]
+
+    async def delete(self, entry_ids: List[str]) -> int:
+        return sum(self._entries.pop(entry_id, None) is not None for entry_id in entry_ids)
+
+    async def record_failure(
+        self, entry_id: str, attempts: int, error: str, next_attempt_at: Optional[datetime]
+    ) -> None:
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            return
+        entry.update(attempts=attempts, last_error=error)
+        if next_attempt_at is None:
+            entry["status"] = "failed"
+        else:
+            entry["next_attempt_at"] = next_attempt_at
+
+
+class MemoryStorage(Storage):
+    """Process-local storage with no external service; contents are lost on restart"""
+
+    name = "memory"
+
+    def __init__(self):
+        self.contacts = MemoryContactRepository()
+        self.status_checks = MemoryStatusCheckRepository()
+        self.notifications = MemoryNotificationOutboxRepository()
+
+    async def ping(self) -> None:
+        pass
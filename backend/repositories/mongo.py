@@ -0,0 +1,245 @@
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from repositories.base import (
+    MESSAGE_FIELDS,
+    MESSAGE_SUMMARY_FIELDS,
+    ContactRepository,
+    DuplicateMessageError,
+    NotificationOutboxRepository,
+    StatusCheckRepository,
+    Storage,
+    utc_naive,
+)
+from services.search import build_search_pipeline
+from services.stats import read_stats, record_created, record_deleted, record_status_changed
+from utils.pagination import KEYSET_SORT, keyset_filter
+
+# Public message fields; keeps internal fields such as content_hash out of responses
+MESSAGE_PROJECTION = {"_id": 0, **{field: 1 for field in MESSAGE_FIELDS}}
+SUMMARY_PROJECTION = {"_id": 0, **{field: 1 for field in MESSAGE_SUMMARY_FIELDS}}
+
+
+class MongoContactRepository(ContactRepository):
+    """
+    Contact messages in the `contact_messages` collection. Writes also keep
+    the `contact_stats` rollups up to date.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db.contact_messages
+
+    async def insert(self, doc: dict) -> None:
+        # Stored and counted by UTC day, like everything read back from MongoDB
+        doc = {**doc, "timestamp": utc_naive(doc["timestamp"])}
+        try:
+            await self.collection.insert_one(doc)
+        except DuplicateKeyError as e:
+            raise DuplicateMessageError(str(e)) from e
+        await record_created(self.db, [doc])
+
+    async def insert_many(self, docs: List[dict]) -> Dict[int, Exception]:
+        # One unordered insert_many; failures are reported per item
+        docs = [{**doc, "timestamp": utc_naive(doc["timestamp"])} for doc in docs]
+        errors = {}
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                message = error.get("errmsg", "Write failed")
+                errors[error["index"]] = (
+                    DuplicateMessageError(message) if error.get("code") == 11000 else Exception(message)
+                )
+        await record_created(self.db, [doc for index, doc in enumerate(docs) if index not in errors])
+        return errors
+
+    async def get(self, message_id: str) -> Optional[dict]:
+        return await self.collection.find_one({"id": message_id}, MESSAGE_PROJECTION)
+
+    async def list_page(
+        self, cursor: Optional[str], limit: int, skip: int = 0, fields: Optional[List[str]] = None
+    ) -> List[dict]:
+        # Keyset pagination on (timestamp, id), newest first. The cursor
+        # seeks straight into the index, so deep pages cost the same as page 1.
+        # Projections within MESSAGE_LIST_FIELDS are covered by the listing index.
+        projection = MESSAGE_PROJECTION if fields is None else {"_id": 0, **{field: 1 for field in fields}}
+        find = self.collection.find(keyset_filter(cursor), projection).sort(KEYSET_SORT)
+        if skip and not cursor:
+            find = find.skip(skip)
+        return await find.limit(limit).to_list(length=limit)
+
+    async def iter_all(self, batch_size: int) -> AsyncIterator[dict]:
+        cursor = self.collection.find({}, MESSAGE_PROJECTION, batch_size=batch_size).sort(KEYSET_SORT)
+        try:
+            async for doc in cursor:
+                yield doc
+        finally:
+            await cursor.close()
+
+    async def search(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "relevance",
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[dict]:
+        pipeline = build_search_pipeline(
+            query, MESSAGE_PROJECTION, status=status, since=since, until=until,
+            sort=sort, cursor=cursor, limit=limit
+        )
+        return await self.collection.aggregate(pipeline).to_list(length=limit)
+
+    async def find_by_content_hash(self, digest: str, since: datetime) -> Optional[dict]:
+        return await self.collection.find_one(
+            {"content_hash": digest, "timestamp": {"$gte": since}},
+            MESSAGE_PROJECTION,
+            sort=[("timestamp", -1)]
+        )
+
+    async def find_many(self, ids: Iterable[str]) -> Dict[str, dict]:
+        return {
+            doc["id"]: doc
+            async for doc in self.collection.find({"id": {"$in": list(ids)}}, SUMMARY_PROJECTION)
+        }
+
+    async def delete(self, message_id: str) -> Optional[dict]:
+        deleted = await self.collection.find_one_and_delete({"id": message_id}, SUMMARY_PROJECTION)
+        if deleted is not None:
+            await record_deleted(self.db, [deleted])
+        return deleted
+
+    async def delete_many(self, messages: Dict[str, dict]) -> int:
+        result = await self.collection.delete_many({"id": {"$in": list(messages)}})
+        await record_deleted(self.db, messages.values())
+        return result.deleted_count
+
+    async def update_status(self, messages: Dict[str, dict], status: str) -> int:
+        result = await self.collection.update_many(
+            {"id": {"$in": list(messages)}, "status": {"$ne": status}},
+            {"$set": {"status": status}}
+        )
+        await record_status_changed(self.db, messages.values(), status)
+        return result.modified_count
+
+    async def list_expired(self, before: datetime, handled_before: Optional[datetime], limit: int) -> List[dict]:
+        query = {"timestamp": {"$lt": before}}
+        if handled_before is not None and handled_before > before:
+            query = {"$or": [query, {"status": "archived", "timestamp": {"$lt": handled_before}}]}
+        return await (
+            self.collection.find(query, MESSAGE_PROJECTION).sort("timestamp", 1).limit(limit).to_list(length=limit)
+        )
+
+    async def stats(self, days: int, top_domains: int) -> dict:
+        # Reads only the pre-aggregated rollups
+        return await read_stats(self.db, days, top_domains)
+
+
+class MongoStatusCheckRepository(StatusCheckRepository):
+    """Status checks in the `status_checks` collection"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.status_checks
+
+    async def insert(self, doc: dict) -> None:
+        # Stored as a native BSON datetime so range queries and sorting use the index
+        await self.collection.insert_one(dict(doc))
+
+    async def list(
+        self,
+        client_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[dict]:
+        conditions = []
+        if client_name is not None:
+            conditions.append({"client_name": client_name})
+        if since is not None or until is not None:
+            timestamp_range = {}
+            if since is not None:
+                timestamp_range["$gte"] = since
+            if until is not None:
+                timestamp_range["$lt"] = until
+            conditions.append({"timestamp": timestamp_range})
+        keyset = keyset_filter(cursor)
+        if keyset:
+            conditions.append(keyset)
+
+        query = {"$and": conditions} if conditions else {}
+        return await (
+            self.collection
+            .find(query, {"_id": 0})
+            .sort(KEYSET_SORT)
+            .limit(limit)
+            .to_list(length=limit)
+        )
+
+    async def delete_before(self, before: datetime) -> int:
+        # The TTL index (STATUS_CHECK_RETENTION_DAYS) normally does this in the background
+        result = await self.collection.delete_many({"timestamp": {"$lt": before}})
+        return result.deleted_count
+
+
+class MongoNotificationOutboxRepository(NotificationOutboxRepository):
+    """Notification outbox in the `notification_outbox` collection"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.notification_outbox
+
+    async def enqueue(self, entries: List[dict]) -> None:
+        if entries:
+            await self.collection.insert_many([dict(entry) for entry in entries], ordered=False)
+
+    async def claim_due(self, now: datetime, lease_until: datetime, limit: int) -> List[dict]:
+        # One atomic find-and-modify per entry, so concurrent workers never claim the same one
+        claimed = []
+        for _ in range(limit):
+            entry = await self.collection.find_one_and_update(
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"$set": {"next_attempt_at": lease_until}},
+                sort=[("next_attempt_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if entry is None:
+                break
+            entry.pop("_id")
+            claimed.append(entry)
+        return claimed
+
+    async def delete(self, entry_ids: List[str]) -> int:
+        result = await self.collection.delete_many({"id": {"$in": list(entry_ids)}})
+        return result.deleted_count
+
+    async def record_failure(
+        self, entry_id: str, attempts: int, error: str, next_attempt_at: Optional[datetime]
+    ) -> None:
+        update = {"attempts": attempts, "last_error": error}
+        if next_attempt_at is None:
+            update["status"] = "failed"
+        else:
+            update["next_attempt_at"] = next_attempt_at
+        await self.collection.update_one({"id": entry_id}, {"$set": update})
+
+
+class MongoStorage(Storage):
+    """MongoDB through Motor; the client's lifecycle is managed by the app lifespan"""
+
+    name = "mongo"
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.contacts = MongoContactRepository(db)
+        self.status_checks = MongoStatusCheckRepository(db)
+        self.notifications = MongoNotificationOutboxRepository(db)
+
+    async def ping(self) -> None:
+        await self.db.command("ping")
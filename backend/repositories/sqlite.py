@@ -0,0 +1,553 @@
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from repositories.base import (
+    MESSAGE_FIELDS,
+    MESSAGE_SUMMARY_FIELDS,
+    ContactRepository,
+    DuplicateMessageError,
+    NotificationOutboxRepository,
+    StatusCheckRepository,
+    Storage,
+    utc_naive,
+)
+from services.search import SEARCH_WEIGHTS, parse_query
+from services.stats import assemble_stats, stats_window
+from utils.pagination import decode_cursor, decode_score_cursor
+from utils.serialization import dumps
+
+T = TypeVar("T")
+
+# Columns indexed for full-text search, in SEARCH_WEIGHTS order so bm25()
+# weights line up with them
+FTS_COLUMNS = list(SEARCH_WEIGHTS)
+
+# Same access paths as the Mongo indexes in migrations.INDEXES, plus an
+# FTS5 table (porter stemming, like $text) kept in sync by triggers
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS contact_messages (
+    id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    message TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'unread',
+    ip_address TEXT,
+    user_agent TEXT,
+    content_hash TEXT
+);
+-- Keyset order plus MESSAGE_LIST_FIELDS, so summary listings are index-only;
+-- replaces the plain (timestamp, id) index of earlier versions
+DROP INDEX IF EXISTS contact_messages_keyset;
+CREATE INDEX IF NOT EXISTS contact_messages_listing
+    ON contact_messages (timestamp DESC, id DESC, name, email, subject, status);
+CREATE INDEX IF NOT EXISTS contact_messages_email ON contact_messages (email);
+CREATE INDEX IF NOT EXISTS contact_messages_status ON contact_messages (status, timestamp);
+CREATE INDEX IF NOT EXISTS contact_messages_content_hash ON contact_messages (content_hash, timestamp DESC);
+CREATE INDEX IF NOT EXISTS contact_messages_domain
+    ON contact_messages (lower(substr(email, instr(email, '@') + 1)));
+
+CREATE VIRTUAL TABLE IF NOT EXISTS contact_messages_fts USING fts5(
+    {", ".join(FTS_COLUMNS)},
+    content='contact_messages', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS contact_messages_fts_insert AFTER INSERT ON contact_messages BEGIN
+    INSERT INTO contact_messages_fts (rowid, {", ".join(FTS_COLUMNS)})
+    VALUES (new.rowid, {", ".join(f"new.{column}" for column in FTS_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS contact_messages_fts_delete AFTER DELETE ON contact_messages BEGIN
+    INSERT INTO contact_messages_fts (contact_messages_fts, rowid, {", ".join(FTS_COLUMNS)})
+    VALUES ('delete', old.rowid, {", ".join(f"old.{column}" for column in FTS_COLUMNS)});
+END;
+
+CREATE TABLE IF NOT EXISTS status_checks (
+    id TEXT NOT NULL UNIQUE,
+    client_name TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS status_checks_keyset ON status_checks (timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS status_checks_client ON status_checks (client_name, timestamp DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id TEXT NOT NULL UNIQUE,
+    channel TEXT NOT NULL,
+    target TEXT NOT NULL,
+    message TEXT NOT NULL,  -- JSON
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS notification_outbox_due ON notification_outbox (status, next_attempt_at);
+"""
+
+MESSAGE_COLUMNS = MESSAGE_FIELDS + ["content_hash"]
+MESSAGE_SELECT = ", ".join(MESSAGE_FIELDS)
+SUMMARY_SELECT = ", ".join(MESSAGE_SUMMARY_FIELDS)
+
+
+def _timestamp(value: datetime) -> str:
+    """Fixed-width naive UTC ISO text, so string order is time order"""
+    return utc_naive(value).isoformat(timespec="microseconds")
+
+
+def _row_to_doc(row: sqlite3.Row) -> dict:
+    doc = dict(row)
+    doc["timestamp"] = datetime.fromisoformat(doc["timestamp"])
+    return doc
+
+
+def _message_row(doc: dict) -> tuple:
+    return tuple(
+        _timestamp(doc["timestamp"]) if column == "timestamp" else doc.get(column)
+        for column in MESSAGE_COLUMNS
+    )
+
+
+def _placeholders(values: list) -> str:
+    return ", ".join("?" for _ in values)
+
+
+def _fts_query(query: str) -> Optional[str]:
+    """Translate Mongo $text syntax into an FTS5 query (None if nothing can match)"""
+    words, phrases, excluded = parse_query(query)
+
+    def quote(term: str) -> str:
+        return '"' + term.replace('"', '""') + '"'
+
+    # As with $text, phrases are all required and words only matter without them
+    if phrases:
+        match = " AND ".join(quote(phrase) for phrase in phrases)
+    elif words:
+        match = " OR ".join(quote(word) for word in words)
+    else:
+        return None
+    return f"({match})" + "".join(f" NOT {quote(word)}" for word in excluded)
+
+
+class SQLiteDatabase:
+    """
+    One sqlite3 connection driven from a dedicated worker thread, so queries
+    never block the event loop and the connection is only used by one thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._connection: Optional[sqlite3.Connection] = None
+
+    async def run(self, operation: Callable[[sqlite3.Connection], T]) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, operation, self._connection)
+
+    async def open(self) -> None:
+        def connect(_):
+            # Autocommit: single statements commit on their own, batches use BEGIN/COMMIT
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            if self.path != ":memory:":
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            return connection
+
+        self._connection = await self.run(connect)
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self.run(lambda connection: connection.close())
+            self._connection = None
+        self._executor.shutdown(wait=False)
+
+
+class SQLiteContactRepository(ContactRepository):
+    """Contact messages in the `contact_messages` table"""
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def insert(self, doc: dict) -> None:
+        def insert(connection):
+            try:
+                connection.execute(
+                    f"INSERT INTO contact_messages ({', '.join(MESSAGE_COLUMNS)}) "
+                    f"VALUES ({_placeholders(MESSAGE_COLUMNS)})",
+                    _message_row(doc)
+                )
+            except sqlite3.IntegrityError as e:
+                if "UNIQUE" in str(e):
+                    raise DuplicateMessageError(str(e)) from e
+                raise
+
+        await self.database.run(insert)
+
+    async def insert_many(self, docs: List[dict]) -> Dict[int, Exception]:
+        def insert_many(connection):
+            # One transaction; a savepoint per row lets the others commit
+            # when one fails, like an unordered insert_many
+            errors = {}
+            sql = (
+                f"INSERT INTO contact_messages ({', '.join(MESSAGE_COLUMNS)}) "
+                f"VALUES ({_placeholders(MESSAGE_COLUMNS)})"
+            )
+            connection.execute("BEGIN")
+            try:
+                for index, doc in enumerate(docs):
+                    connection.execute("SAVEPOINT row")
+                    try:
+                        connection.execute(sql, _message_row(doc))
+                    except sqlite3.Error as e:
+                        connection.execute("ROLLBACK TO row")
+                        errors[index] = DuplicateMessageError(str(e)) if "UNIQUE" in str(e) else e
+                    connection.execute("RELEASE row")
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            return errors
+
+        return await self.database.run(insert_many)
+
+    async def get(self, message_id: str) -> Optional[dict]:
+        def get(connection):
+            row = connection.execute(
+                f"SELECT {MESSAGE_SELECT} FROM contact_messages WHERE id = ?", (message_id,)
+            ).fetchone()
+            return _row_to_doc(row) if row is not None else None
+
+        return await self.database.run(get)
+
+    def _page(
+        self, connection, after: Optional[tuple], limit: int, skip: int = 0, fields: Optional[List[str]] = None
+    ) -> List[dict]:
+        select = MESSAGE_SELECT if fields is None else ", ".join(fields)
+        sql = f"SELECT {select} FROM contact_messages"
+        params: list = []
+        if after is not None:
+            sql += " WHERE (timestamp, id) < (?, ?)"
+            params += [_timestamp(after[0]), after[1]]
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+        return [_row_to_doc(row) for row in connection.execute(sql, params + [limit, skip])]
+
+    async def list_page(
+        self, cursor: Optional[str], limit: int, skip: int = 0, fields: Optional[List[str]] = None
+    ) -> List[dict]:
+        after = decode_cursor(cursor) if cursor else None
+        return await self.database.run(
+            lambda connection: self._page(connection, after, limit, 0 if cursor else skip, fields)
+        )
+
+    async def iter_all(self, batch_size: int) -> AsyncIterator[dict]:
+        after = None
+        while True:
+            batch = await self.database.run(lambda connection: self._page(connection, after, batch_size))
+            for doc in batch:
+                yield doc
+            if len(batch) < batch_size:
+                return
+            after = (batch[-1]["timestamp"], batch[-1]["id"])
+
+    async def search(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "relevance",
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[dict]:
+        match = _fts_query(query)
+        if match is None:
+            return []
+        weights = ", ".join(str(float(SEARCH_WEIGHTS[column])) for column in FTS_COLUMNS)
+        conditions, params = ["contact_messages_fts MATCH ?"], [match]
+        if status is not None:
+            conditions.append("m.status = ?")
+            params.append(status)
+        if since is not None:
+            conditions.append("m.timestamp >= ?")
+            params.append(_timestamp(since))
+        if until is not None:
+            conditions.append("m.timestamp < ?")
+            params.append(_timestamp(until))
+
+        # bm25() is lower-is-better; negate it so scores sort like textScore
+        sql = (
+            f"WITH hits AS MATERIALIZED ("
+            f"SELECT {', '.join(f'm.{field}' for field in MESSAGE_FIELDS)}, "
+            f"-bm25(contact_messages_fts, {weights}) AS score "
+            f"FROM contact_messages_fts JOIN contact_messages m ON m.rowid = contact_messages_fts.rowid "
+            f"WHERE {' AND '.join(conditions)}) "
+            f"SELECT * FROM hits"
+        )
+        if sort == "newest":
+            if cursor:
+                timestamp, doc_id = decode_cursor(cursor)
+                sql += " WHERE (timestamp, id) < (?, ?)"
+                params += [_timestamp(timestamp), doc_id]
+            sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        else:
+            if cursor:
+                score, timestamp, doc_id = decode_score_cursor(cursor)
+                sql += " WHERE (score, timestamp, id) < (?, ?, ?)"
+                params += [score, _timestamp(timestamp), doc_id]
+            sql += " ORDER BY score DESC, timestamp DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        return await self.database.run(lambda connection: [_row_to_doc(row) for row in connection.execute(sql, params)])
+
+    async def find_by_content_hash(self, digest: str, since: datetime) -> Optional[dict]:
+        def find(connection):
+            row = connection.execute(
+                f"SELECT {MESSAGE_SELECT} FROM contact_messages WHERE content_hash = ? AND timestamp >= ? "
+                f"ORDER BY timestamp DESC LIMIT 1",
+                (digest, _timestamp(since))
+            ).fetchone()
+            return _row_to_doc(row) if row is not None else None
+
+        return await self.database.run(find)
+
+    async def find_many(self, ids: Iterable[str]) -> Dict[str, dict]:
+        ids = list(ids)
+
+        def find_many(connection):
+            rows = connection.execute(
+                f"SELECT {SUMMARY_SELECT} FROM contact_messages WHERE id IN ({_placeholders(ids)})", ids
+            )
+            return {row["id"]: _row_to_doc(row) for row in rows}
+
+        return await self.database.run(find_many) if ids else {}
+
+    async def delete(self, message_id: str) -> Optional[dict]:
+        def delete(connection):
+            rows = connection.execute(
+                f"DELETE FROM contact_messages WHERE id = ? RETURNING {SUMMARY_SELECT}", (message_id,)
+            ).fetchall()
+            return _row_to_doc(rows[0]) if rows else None
+
+        return await self.database.run(delete)
+
+    async def delete_many(self, messages: Dict[str, dict]) -> int:
+        ids = list(messages)
+
+        def delete_many(connection):
+            return connection.execute(
+                f"DELETE FROM contact_messages WHERE id IN ({_placeholders(ids)})", ids
+            ).rowcount
+
+        return await self.database.run(delete_many) if ids else 0
+
+    async def update_status(self, messages: Dict[str, dict], status: str) -> int:
+        ids = list(messages)
+
+        def update_status(connection):
+            return connection.execute(
+                f"UPDATE contact_messages SET status = ? WHERE id IN ({_placeholders(ids)}) AND status != ?",
+                [status, *ids, status]
+            ).rowcount
+
+        return await self.database.run(update_status) if ids else 0
+
+    async def list_expired(self, before: datetime, handled_before: Optional[datetime], limit: int) -> List[dict]:
+        sql = f"SELECT {MESSAGE_SELECT} FROM contact_messages WHERE timestamp < ?"
+        params = [_timestamp(before)]
+        if handled_before is not None and handled_before > before:
+            sql += " OR (status = 'archived' AND timestamp < ?)"
+            params.append(_timestamp(handled_before))
+        sql += " ORDER BY timestamp LIMIT ?"
+        params.append(limit)
+        return await self.database.run(lambda connection: [_row_to_doc(row) for row in connection.execute(sql, params)])
+
+    async def stats(self, days: int, top_domains: int) -> dict:
+        window = stats_window(days)
+
+        def stats(connection):
+            day_counts: Dict[str, Dict[str, int]] = {}
+            for day, status, count in connection.execute(
+                "SELECT substr(timestamp, 1, 10), status, count(*) FROM contact_messages "
+                "WHERE timestamp >= ? GROUP BY 1, 2",
+                (window[0],)
+            ):
+                day_counts.setdefault(day, {})[status] = count
+            totals = dict(connection.execute("SELECT status, count(*) FROM contact_messages GROUP BY status").fetchall())
+            domains = connection.execute(
+                "SELECT lower(substr(email, instr(email, '@') + 1)) AS domain, count(*) AS total "
+                "FROM contact_messages GROUP BY domain ORDER BY total DESC LIMIT ?",
+                (top_domains,)
+            ).fetchall()
+            return day_counts, totals, [tuple(row) for row in domains]
+
+        day_counts, totals, domains = await self.database.run(stats)
+        return assemble_stats(window, day_counts, totals, domains)
+
+
+class SQLiteStatusCheckRepository(StatusCheckRepository):
+    """Status checks in the `status_checks` table"""
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def insert(self, doc: dict) -> None:
+        def insert(connection):
+            connection.execute(
+                "INSERT INTO status_checks (id, client_name, timestamp) VALUES (?, ?, ?)",
+                (doc["id"], doc["client_name"], _timestamp(doc["timestamp"]))
+            )
+
+        await self.database.run(insert)
+
+    async def list(
+        self,
+        client_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[dict]:
+        conditions, params = [], []
+        if client_name is not None:
+            conditions.append("client_name = ?")
+            params.append(client_name)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(_timestamp(since))
+        if until is not None:
+            conditions.append("timestamp < ?")
+            params.append(_timestamp(until))
+        if cursor:
+            timestamp, doc_id = decode_cursor(cursor)
+            conditions.append("(timestamp, id) < (?, ?)")
+            params += [_timestamp(timestamp), doc_id]
+
+        sql = "SELECT id, client_name, timestamp FROM status_checks"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        return await self.database.run(lambda connection: [_row_to_doc(row) for row in connection.execute(sql, params)])
+
+    async def delete_before(self, before: datetime) -> int:
+        return await self.database.run(
+            lambda connection: connection.execute(
+                "DELETE FROM status_checks WHERE timestamp < ?", (_timestamp(before),)
+            ).rowcount
+        )
+
+
+OUTBOX_COLUMNS = ["id", "channel", "target", "message", "status", "attempts", "next_attempt_at", "created_at"]
+
+
+def _outbox_entry(row: sqlite3.Row) -> dict:
+    entry = dict(row)
+    entry["message"] = json.loads(entry["message"])
+    entry["next_attempt_at"] = datetime.fromisoformat(entry["next_attempt_at"])
+    entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+    return entry
+
+
+class SQLiteNotificationOutboxRepository(NotificationOutboxRepository):
+    """Notification outbox in the `notification_outbox` table"""
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def enqueue(self, entries: List[dict]) -> None:
+        rows = [
+            (entry["id"], entry["channel"], entry["target"], dumps(entry["message"]).decode(), entry["status"],
+             entry["attempts"], _timestamp(entry["next_attempt_at"]), _timestamp(entry["created_at"]))
+            for entry in entries
+        ]
+
+        def enqueue(connection):
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(
+                    f"INSERT INTO notification_outbox ({', '.join(OUTBOX_COLUMNS)}) "
+                    f"VALUES ({_placeholders(OUTBOX_COLUMNS)})",
+                    rows
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        await self.database.run(enqueue)
+
+    async def claim_due(self, now: datetime, lease_until: datetime, limit: int) -> List[dict]:
+        def claim(connection):
+            # IMMEDIATE takes the write lock up front, so other processes on the file wait their turn
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = connection.execute(
+                    "SELECT * FROM notification_outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                    "ORDER BY next_attempt_at LIMIT ?",
+                    (_timestamp(now), limit)
+                ).fetchall()
+                entries = [_outbox_entry(row) for row in rows]
+                ids = [entry["id"] for entry in entries]
+                if ids:
+                    connection.execute(
+                        f"UPDATE notification_outbox SET next_attempt_at = ? WHERE id IN ({_placeholders(ids)})",
+                        [_timestamp(lease_until), *ids]
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            for entry in entries:
+                entry["next_attempt_at"] = lease_until
+            return entries
+
+        return await self.database.run(claim)
+
+    async def delete(self, entry_ids: List[str]) -> int:
+        ids = list(entry_ids)
+        if not ids:
+            return 0
+        return await self.database.run(
+            lambda connection: connection.execute(
+                f"DELETE FROM notification_outbox WHERE id IN ({_placeholders(ids)})", ids
+            ).rowcount
+        )
+
+    async def record_failure(
+        self, entry_id: str, attempts: int, error: str, next_attempt_at: Optional[datetime]
+    ) -> None:
+        if next_attempt_at is None:
+            sql = "UPDATE notification_outbox SET attempts = ?, last_error = ?, status = 'failed' WHERE id = ?"
+            params = (attempts, error, entry_id)
+        else:
+            sql = "UPDATE notification_outbox SET attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?"
+            params = (attempts, error, _timestamp(next_attempt_at), entry_id)
+        await self.database.run(lambda connection: connection.execute(sql, params))
+
+
+class SQLiteStorage(Storage):
+    """
+    Embedded SQLite file (or ":memory:"); a single-node deployment needs no
+    external service. Each worker process opens its own connection.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.database = SQLiteDatabase(path)
+        self.contacts = SQLiteContactRepository(self.database)
+        self.status_checks = SQLiteStatusCheckRepository(self.database)
+        self.notifications = SQLiteNotificationOutboxRepository(self.database)
+
+    async def open(self) -> None:
+        await self.database.open()
+
+    async def ping(self) -> None:
+        await self.database.run(lambda connection: connection.execute("SELECT 1").fetchone())
+
+    async def close(self) -> None:
+        await self.database.close()
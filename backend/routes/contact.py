@@ -1,26 +1,113 @@
-from fastapi import APIRouter, HTTPException, Request
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from models.contact import (
+    BulkItemResult,
+    BulkOperationResponse,
+    ContactBatchCreateRequest,
+    ContactBulkDeleteRequest,
     ContactMessage,
     ContactMessageCreate,
     ContactMessageResponse,
-    ContactMessagesListResponse
+    ContactMessagesListResponse,
+    ContactSearchResponse,
+    ContactStats,
+    ContactStatsResponse,
+    ContactStatusUpdateRequest,
+    MessageStatus
 )
+from repositories.base import MESSAGE_FIELDS, MESSAGE_LIST_FIELDS, ContactRepository, DuplicateMessageError
+from services.cache import LRUCache
+from services.dedup import content_hash
+from services.events import EventBus, TooManySubscribersError, created_event
+from services.ingestion import IngestionUnavailableError
+from services.notifications import Notifier
+from services.search import highlight, next_search_cursor, search_terms
+from services.versions import CollectionVersions
+from utils.pagination import InvalidCursorError, next_cursor
+from utils.serialization import FastJSONResponse, dumps
 from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional
+import csv
+import io
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/contact", tags=["contact"])
 
+# Column order for CSV exports, matching the ContactMessage schema
+EXPORT_FIELDS = MESSAGE_FIELDS
 
-def get_db(request: Request) -> AsyncIOMotorDatabase:
-    """Get database from app state"""
-    return request.app.state.db
+# Values for optional fields that older documents may lack, filled in on the
+# read paths that return stored documents without re-validating them
+MESSAGE_DEFAULTS = {
+    name: field.default
+    for name, field in ContactMessage.model_fields.items()
+    if not field.is_required() and field.default_factory is None
+}
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def get_contacts(request: Request) -> ContactRepository:
+    """Get the contact message repository from app state"""
+    return request.app.state.storage.contacts
+
+
+def get_message_cache(request: Request) -> LRUCache:
+    """Get the per-message response cache from app state"""
+    return request.app.state.contact_message_cache
+
+
+def get_versions(request: Request) -> CollectionVersions:
+    """Get the per-collection version counters behind list ETags from app state"""
+    return request.app.state.collection_versions
+
+
+def get_events(request: Request) -> EventBus:
+    """Get the live contact message feed from app state"""
+    return request.app.state.contact_events
+
+
+def get_notifier(request: Request) -> Optional[Notifier]:
+    """Get the new-message notifier from app state (None when notifications are off)"""
+    return request.app.state.notifier
+
+
+def _message_document(doc: dict, fields: Optional[List[str]] = None) -> dict:
+    """A stored message in ContactMessage shape (or its `fields`), without building the model"""
+    for name, value in MESSAGE_DEFAULTS.items():
+        if fields is None or name in fields:
+            doc.setdefault(name, value)
+    return doc
+
+
+def _list_fields(view: str, fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Fields to return from a listing, in schema order, or None for all of them.
+    id and timestamp are always included because the next cursor is built from them.
+    """
+    if not fields:
+        return MESSAGE_LIST_FIELDS if view == "summary" else None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = sorted(requested - set(MESSAGE_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    requested |= {"id", "timestamp"}
+    return [field for field in MESSAGE_FIELDS if field in requested]
+
+
+def _unique_ids(ids: list) -> list:
+    """De-duplicate ids while keeping request order"""
+    return list(dict.fromkeys(ids))
 
 
 @router.post("", response_model=ContactMessageResponse, status_code=201)
-async def create_contact_message(message_data: ContactMessageCreate, request: Request):
+async def create_contact_message(message_data: ContactMessageCreate, request: Request, response: Response):
     """
     Create a new contact message
     
@@ -28,9 +115,28 @@ async def create_contact_message(message_data: ContactMessageCreate, request: Re
     - **email**: Sender's email (required, valid email format)
     - **subject**: Message subject (required, max 200 chars)
     - **message**: Message content (required, max 2000 chars)
+    
+    Re-submitting identical content within the dedup window returns the
+    original message with status 200 instead of storing a copy.
     """
+    digest = None
+    dedup = request.app.state.contact_dedup
     try:
-        db = get_db(request)
+        contacts = get_contacts(request)
+        
+        # Suppress duplicate submissions (double clicks, client retries, bots)
+        digest = content_hash(message_data.name, message_data.email, message_data.subject, message_data.message)
+        original = await dedup.find_original(contacts, digest)
+        if original is not None:
+            logger.info(
+                "Duplicate contact message suppressed: %s", original["id"], extra={"message_id": original["id"]}
+            )
+            response.status_code = 200
+            return ContactMessageResponse(
+                success=True,
+                message="Message already received! I'll get back to you soon.",
+                data=ContactMessage(**original)
+            )
         
         # Get client info
         client_ip = request.client.host if request.client else None
@@ -45,54 +151,271 @@ async def create_contact_message(message_data: ContactMessageCreate, request: Re
             user_agent=user_agent
         )
         
-        # Insert into database
-        result = await db.contact_messages.insert_one(contact_message.dict())
+        # Remember the hash before writing so concurrent duplicates are caught too
+        doc = contact_message.dict()
+        dedup.remember(digest, dict(doc))
+        doc["content_hash"] = digest
         
-        if result.inserted_id:
-            logger.info(f"Contact message created: {contact_message.id} from {contact_message.email}")
-            return ContactMessageResponse(
-                success=True,
-                message="Message sent successfully! I'll get back to you soon.",
-                data=contact_message
-            )
+        # Store it, either directly or through the write-behind queue (which publishes on flush)
+        ingestion = getattr(request.app.state, "contact_ingestion", None)
+        if ingestion is not None:
+            await ingestion.submit(doc)
         else:
-            raise HTTPException(status_code=500, detail="Failed to create message")
+            with get_versions(request).bumping("contact_messages"):
+                await contacts.insert(doc)
+            get_events(request).publish_local("created", created_event([doc]))
+            # Written to the outbox now; delivery happens in the background
+            notifier = get_notifier(request)
+            if notifier is not None:
+                await notifier.submit([doc])
+        
+        logger.info(
+            "Contact message created: %s from %s", contact_message.id, contact_message.email,
+            extra={"message_id": contact_message.id}
+        )
+        return ContactMessageResponse(
+            success=True,
+            message="Message sent successfully! I'll get back to you soon.",
+            data=contact_message
+        )
             
+    except IngestionUnavailableError as e:
+        dedup.forget(digest)
+        logger.warning("Rejected contact message: %s", e)
+        raise HTTPException(status_code=503, detail="Service busy, please retry shortly", headers={"Retry-After": "1"})
+    except HTTPException:
+        if digest:
+            dedup.forget(digest)
+        raise
     except Exception as e:
-        logger.error(f"Error creating contact message: {str(e)}")
+        if digest:
+            dedup.forget(digest)
+        logger.error("Error creating contact message: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("", response_model=ContactMessagesListResponse)
-async def get_all_contact_messages(request: Request, limit: int = 100, skip: int = 0):
+async def get_all_contact_messages(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    view: Literal["full", "summary"] = "full",
+    fields: Optional[str] = None,
+):
     """
     Get all contact messages (admin endpoint)
     
     - **limit**: Maximum number of messages to return (default: 100)
-    - **skip**: Number of messages to skip (for pagination)
+    - **cursor**: Opaque cursor from a previous page's `next_cursor`
+    - **skip**: Deprecated offset pagination, ignored when `cursor` is given
+    - **view**: `summary` returns only id, name, email, subject, timestamp and status
+    - **fields**: Comma-separated fields to return instead (id and timestamp are always included)
     """
     try:
-        db = get_db(request)
+        selected = _list_fields(view, fields)
         
-        # Fetch messages sorted by timestamp (newest first)
-        # Exclude MongoDB's _id field from results
-        cursor = db.contact_messages.find({}, {"_id": 0}).sort("timestamp", -1).skip(skip).limit(limit)
-        messages = await cursor.to_list(length=limit)
+        # Polls that already hold the current page cost a version lookup, no query
+        versions = get_versions(request)
+        etag = versions.etag("contact_messages", request.url.query)
+        if versions.is_fresh(request, etag):
+            return Response(status_code=304, headers=versions.headers(etag))
         
-        # Convert to ContactMessage objects
-        contact_messages = [ContactMessage(**msg) for msg in messages]
+        # Keyset pagination on (timestamp, id), newest first. The cursor
+        # seeks straight into the index, so deep pages cost the same as page 1.
+        # The projection is applied by the storage query, not after the fact.
+        messages = await get_contacts(request).list_page(cursor, limit, skip=skip, fields=selected)
         
-        return ContactMessagesListResponse(
-            success=True,
-            count=len(contact_messages),
-            data=contact_messages
+        # Documents were validated on write, so they are encoded as-is
+        # instead of being rebuilt as models and re-validated per row
+        return FastJSONResponse({
+            "success": True,
+            "count": len(messages),
+            "data": [_message_document(msg, selected) for msg in messages],
+            "next_cursor": next_cursor(messages, limit)
+        }, headers=versions.headers(etag))
+        
+    except HTTPException:
+        raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error fetching contact messages: %s", e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+def _export_value(value):
+    """Render a stored field value for export"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def _export_rows(contacts: ContactRepository, export_format: str, batch_size: int) -> AsyncIterator[str]:
+    """
+    Stream contact messages straight from the storage cursor, one chunk per batch.
+    Only a single batch is held in memory at a time regardless of collection size.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    if export_format == "csv":
+        writer.writeheader()
+    rows = 0
+    try:
+        async for doc in contacts.iter_all(batch_size):
+            if export_format == "csv":
+                writer.writerow({field: _export_value(doc.get(field)) for field in EXPORT_FIELDS})
+            else:
+                buffer.write(json.dumps(doc, default=_export_value))
+                buffer.write("\n")
+            rows += 1
+            # Flush once per driver batch so the response starts immediately
+            if rows % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+        logger.info("Exported %d contact messages as %s", rows, export_format)
+    except Exception as e:
+        logger.error("Error exporting contact messages after %s rows: %s", rows, e)
+        raise
+
+
+@router.get("/export")
+async def export_contact_messages(
+    request: Request,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Stream every contact message as NDJSON or CSV (admin endpoint)
+    
+    - **format**: `ndjson` (default) or `csv`
+    - **batch_size**: Documents fetched per database round trip (default: 1000)
+    """
+    filename = f"contact_messages.{export_format}"
+    return StreamingResponse(
+        _export_rows(get_contacts(request), export_format, batch_size),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/search", response_model=ContactSearchResponse)
+async def search_contact_messages(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    status: Optional[MessageStatus] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    sort: str = Query("relevance", pattern="^(relevance|newest)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    """
+    Full-text search over sender name, subject and message (admin endpoint)
+    
+    - **q**: Search terms; `"quoted phrases"` and `-excluded` words are supported
+    - **status**: Only messages with this status
+    - **since** / **until**: Inclusive / exclusive timestamp bounds
+    - **sort**: `relevance` (default, subject > name > message) or `newest`
+    - **limit**: Maximum number of results to return (default: 20)
+    - **cursor**: Opaque cursor from a previous page's `next_cursor`
+    """
+    try:
+        versions = get_versions(request)
+        etag = versions.etag("contact_messages", request.url.query)
+        if versions.is_fresh(request, etag):
+            return Response(status_code=304, headers=versions.headers(etag))
+        
+        docs = await get_contacts(request).search(
+            q, status=status, since=since, until=until, sort=sort, cursor=cursor, limit=limit
         )
         
+        terms = search_terms(q)
+        results = [{**_message_document(doc), "highlights": highlight(doc, terms)} for doc in docs]
+        
+        return FastJSONResponse({
+            "success": True,
+            "count": len(results),
+            "data": results,
+            "next_cursor": next_search_cursor(docs, limit, sort)
+        }, headers=versions.headers(etag))
+        
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error fetching contact messages: {str(e)}")
+        logger.error("Error searching contact messages: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/stats", response_model=ContactStatsResponse)
+async def get_contact_stats(
+    request: Request,
+    response: Response,
+    days: int = Query(30, ge=1, le=366),
+    top_domains: int = Query(10, ge=1, le=100),
+):
+    """
+    Contact traffic per day, per status and by sender domain (admin endpoint)
+    
+    With MongoDB this reads only the pre-aggregated rollups, so the cost does
+    not grow with the number of stored messages.
+    
+    - **days**: Number of most recent UTC days to include (default: 30)
+    - **top_domains**: Number of sender domains to list (default: 10)
+    """
+    try:
+        # The day window moves at midnight UTC even without writes
+        versions = get_versions(request)
+        etag = versions.etag("contact_messages", f"{request.url.query}|{datetime.utcnow().date()}")
+        if versions.is_fresh(request, etag):
+            return Response(status_code=304, headers=versions.headers(etag))
+        
+        stats = await get_contacts(request).stats(days, top_domains)
+        response.headers.update(versions.headers(etag))
+        return ContactStatsResponse(success=True, data=ContactStats(**stats))
+        
+    except Exception as e:
+        logger.error("Error fetching contact stats: %s", e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/stream")
+async def stream_contact_events(request: Request, last_event_id: Optional[str] = Header(None)):
+    """
+    Live feed of contact message changes as Server-Sent Events (admin endpoint)
+    
+    Events: `created` (`messages` with list-view fields), `status_changed`
+    (`ids`, `status`), `deleted` (`ids`) and `reset` (missed events cannot be
+    replayed; reload the list). Comment lines are sent as heartbeats.
+    
+    - **Last-Event-ID**: Resume after this event; EventSource sends it on reconnect
+    """
+    try:
+        subscription = get_events(request).subscribe(last_event_id)
+    except TooManySubscribersError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return StreamingResponse(
+        subscription.frames(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering or caching the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/cache/stats")
+async def get_contact_cache_stats(request: Request):
+    """
+    Hit/miss/eviction counters for the per-message response cache (admin endpoint)
+    """
+    return {
+        "success": True,
+        "data": get_message_cache(request).stats()
+    }
+
+
 @router.get("/{message_id}", response_model=ContactMessageResponse)
 async def get_contact_message(message_id: str, request: Request):
     """
@@ -101,26 +424,32 @@ async def get_contact_message(message_id: str, request: Request):
     - **message_id**: The unique ID of the message
     """
     try:
-        db = get_db(request)
+        # Serve the serialized response straight from the cache when possible
+        cache = get_message_cache(request)
+        cached = cache.get(message_id)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+        generation = cache.generation
         
-        # Find message by ID, exclude MongoDB's _id field
-        message = await db.contact_messages.find_one({"id": message_id}, {"_id": 0})
+        # Find message by ID, public fields only
+        message = await get_contacts(request).get(message_id)
         
         if not message:
             raise HTTPException(status_code=404, detail="Message not found")
         
-        contact_message = ContactMessage(**message)
+        body = dumps({
+            "success": True,
+            "message": "Message retrieved successfully",
+            "data": _message_document(message)
+        })
+        cache.set(message_id, body, generation=generation)
         
-        return ContactMessageResponse(
-            success=True,
-            message="Message retrieved successfully",
-            data=contact_message
-        )
+        return Response(content=body, media_type="application/json")
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching contact message {message_id}: {str(e)}")
+        logger.error("Error fetching contact message %s: %s", message_id, e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
@@ -132,15 +461,17 @@ async def delete_contact_message(message_id: str, request: Request):
     - **message_id**: The unique ID of the message to delete
     """
     try:
-        db = get_db(request)
-        
         # Delete message
-        result = await db.contact_messages.delete_one({"id": message_id})
+        with get_versions(request).bumping("contact_messages"):
+            deleted = await get_contacts(request).delete(message_id)
+        get_message_cache(request).invalidate(message_id)
+        request.app.state.contact_dedup.forget_messages([message_id])
         
-        if result.deleted_count == 0:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Message not found")
         
-        logger.info(f"Contact message deleted: {message_id}")
+        get_events(request).publish_local("deleted", {"ids": [message_id]})
+        logger.info("Contact message deleted: %s", message_id, extra={"message_id": message_id})
         
         return {
             "success": True,
@@ -150,5 +481,138 @@ async def delete_contact_message(message_id: str, request: Request):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting contact message {message_id}: {str(e)}")
+        logger.error("Error deleting contact message %s: %s", message_id, e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/batch", response_model=BulkOperationResponse, status_code=201)
+async def batch_create_contact_messages(batch: ContactBatchCreateRequest, request: Request):
+    """
+    Import many contact messages in one write (admin endpoint)
+    
+    - **messages**: Messages to import; `id`, `timestamp` and `status` are optional
+    """
+    try:
+        now = datetime.utcnow()
+        
+        docs = []
+        for item in batch.messages:
+            fields = item.dict(exclude_none=True)
+            fields.setdefault("timestamp", now)
+            docs.append(ContactMessage(**fields).dict())
+        
+        # One write for the whole batch; failures are reported per item
+        with get_versions(request).bumping("contact_messages"):
+            errors = await get_contacts(request).insert_many(docs)
+        
+        results = []
+        for index, doc in enumerate(docs):
+            error = errors.get(index)
+            if error is None:
+                results.append(BulkItemResult(id=doc["id"], success=True, result="created"))
+            elif isinstance(error, DuplicateMessageError):
+                results.append(BulkItemResult(id=doc["id"], success=False, result="duplicate"))
+            else:
+                results.append(BulkItemResult(id=doc["id"], success=False, result="failed", error=str(error)))
+        
+        created = len(docs) - len(errors)
+        if created:
+            get_events(request).publish_local(
+                "created", created_event(doc for index, doc in enumerate(docs) if index not in errors)
+            )
+        logger.info("Contact messages imported: %d/%d", created, len(docs))
+        
+        return BulkOperationResponse(
+            success=not errors,
+            message=f"Imported {created} of {len(docs)} messages",
+            processed=created,
+            results=results
+        )
+        
+    except Exception as e:
+        logger.error("Error importing contact messages: %s", e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/bulk-delete", response_model=BulkOperationResponse)
+async def bulk_delete_contact_messages(payload: ContactBulkDeleteRequest, request: Request):
+    """
+    Delete many contact messages in one request (admin endpoint)
+    
+    - **ids**: Unique IDs of the messages to delete
+    """
+    try:
+        contacts = get_contacts(request)
+        ids = _unique_ids(payload.ids)
+        
+        # Resolve which ids exist so each item can be reported, then delete in one call
+        existing = await contacts.find_many(ids)
+        with get_versions(request).bumping("contact_messages"):
+            deleted_count = await contacts.delete_many(existing)
+        get_message_cache(request).invalidate_many(existing)
+        request.app.state.contact_dedup.forget_messages(existing)
+        if existing:
+            get_events(request).publish_local("deleted", {"ids": list(existing)})
+        
+        results = [
+            BulkItemResult(id=message_id, success=True, result="deleted")
+            if message_id in existing
+            else BulkItemResult(id=message_id, success=False, result="not_found")
+            for message_id in ids
+        ]
+        
+        logger.info("Contact messages bulk deleted: %d/%d", deleted_count, len(ids))
+        
+        return BulkOperationResponse(
+            success=True,
+            message=f"Deleted {deleted_count} of {len(ids)} messages",
+            processed=deleted_count,
+            results=results
+        )
+        
+    except Exception as e:
+        logger.error("Error bulk deleting contact messages: %s", e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.patch("/status", response_model=BulkOperationResponse)
+async def update_contact_message_status(payload: ContactStatusUpdateRequest, request: Request):
+    """
+    Mark many contact messages as read, unread or archived (admin endpoint)
+    
+    - **ids**: Unique IDs of the messages to update
+    - **status**: New status (`unread`, `read` or `archived`)
+    """
+    try:
+        contacts = get_contacts(request)
+        ids = _unique_ids(payload.ids)
+        
+        current = await contacts.find_many(ids)
+        with get_versions(request).bumping("contact_messages"):
+            modified_count = await contacts.update_status(current, payload.status)
+        get_message_cache(request).invalidate_many(current)
+        changed = [message_id for message_id, doc in current.items() if doc.get("status") != payload.status]
+        if changed:
+            get_events(request).publish_local("status_changed", {"ids": changed, "status": payload.status})
+        
+        results = []
+        for message_id in ids:
+            if message_id not in current:
+                results.append(BulkItemResult(id=message_id, success=False, result="not_found"))
+            elif current[message_id].get("status") == payload.status:
+                results.append(BulkItemResult(id=message_id, success=True, result="unchanged"))
+            else:
+                results.append(BulkItemResult(id=message_id, success=True, result="updated"))
+        
+        logger.info("Contact messages marked %s: %d/%d", payload.status, modified_count, len(ids))
+        
+        return BulkOperationResponse(
+            success=True,
+            message=f"Updated {modified_count} of {len(ids)} messages",
+            processed=modified_count,
+            results=results
+        )
+        
+    except Exception as e:
+        logger.error("Error updating contact message status: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from services.compression import choose_encoding
+from services.portfolio import ALL_SECTIONS, PortfolioContent, SnapshotEntry
+from typing import Dict
+
+router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
+
+
+def get_portfolio(request: Request) -> PortfolioContent:
+    """Get the portfolio content snapshot holder from app state"""
+    return request.app.state.portfolio
+
+
+def _if_none_match(request: Request, entry: SnapshotEntry) -> bool:
+    """Whether the client holds any variant of `entry` (weak comparison, as If-None-Match requires)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return any(
+        candidate == "*" or candidate in entry.etags.values()
+        for candidate in (candidate.strip().removeprefix("W/") for candidate in header.split(","))
+    )
+
+
+def _serve(request: Request, section: str) -> Response:
+    """
+    Write a prebuilt snapshot entry: a dict lookup, header checks and the
+    stored bytes (precompressed when the client accepts it). No database
+    access or serialization happens per request.
+    """
+    portfolio = get_portfolio(request)
+    entry: SnapshotEntry = portfolio.snapshot.entries.get(section)
+    if entry is None:
+        if not portfolio.snapshot.entries:
+            raise HTTPException(
+                status_code=404,
+                detail="Portfolio content is not loaded: provide PORTFOLIO_PATH (default backend/portfolio.json) "
+                       "or PORTFOLIO_SOURCE=mongo with `manage.py import-portfolio`"
+            )
+        raise HTTPException(status_code=404, detail=f"Unknown portfolio section: {section}")
+
+    max_age = int(portfolio.settings.max_age_seconds)
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""), entry.encoded)
+    headers: Dict[str, str] = {
+        "ETag": entry.etags[encoding],
+        "Cache-Control": f"public, max-age={max_age}" if max_age > 0 else "public, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if _if_none_match(request, entry):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is None:
+        body = entry.body
+    else:
+        body = entry.encoded[encoding]
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("")
+async def get_portfolio_content(request: Request):
+    """
+    All portfolio content (personal info, about, skills, experience,
+    projects, education, certifications, articles), keyed by section
+    """
+    return _serve(request, ALL_SECTIONS)
+
+
+@router.get("/{section}")
+async def get_portfolio_section(section: str, request: Request):
+    """
+    One section of the portfolio content
+
+    - **section**: Section name, e.g. `skills` or `projects`
+    """
+    return _serve(request, section)
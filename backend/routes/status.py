@@ -0,0 +1,76 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from models.status import StatusCheck, StatusCheckCreate
+from repositories.base import StatusCheckRepository
+from services.versions import CollectionVersions
+from utils.pagination import InvalidCursorError, next_cursor
+from utils.serialization import FastJSONResponse
+from datetime import datetime
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/status", tags=["status"])
+
+
+def get_status_checks_repository(request: Request) -> StatusCheckRepository:
+    """Get the status check repository from app state"""
+    return request.app.state.storage.status_checks
+
+
+def get_versions(request: Request) -> CollectionVersions:
+    """Get the per-collection version counters behind list ETags from app state"""
+    return request.app.state.collection_versions
+
+
+@router.post("", response_model=StatusCheck)
+async def create_status_check(input: StatusCheckCreate, request: Request):
+    """
+    Record a status check
+    
+    - **client_name**: Name of the reporting client
+    """
+    status_obj = StatusCheck(**input.model_dump())
+    with get_versions(request).bumping("status_checks"):
+        await get_status_checks_repository(request).insert(status_obj.model_dump())
+    return status_obj
+
+
+@router.get("", response_model=List[StatusCheck])
+async def get_status_checks(
+    request: Request,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    """
+    List status checks, newest first
+    
+    - **client_name**: Only checks from this client
+    - **since** / **until**: Inclusive / exclusive timestamp bounds
+    - **limit**: Maximum number of checks to return (default: 1000)
+    - **cursor**: Value of the `X-Next-Cursor` header from the previous page
+    """
+    # Unchanged since the client's copy: answer from the version counter alone
+    versions = get_versions(request)
+    etag = versions.etag("status_checks", request.url.query)
+    if versions.is_fresh(request, etag):
+        return Response(status_code=304, headers=versions.headers(etag))
+    
+    try:
+        status_checks = await get_status_checks_repository(request).list(
+            client_name=client_name, since=since, until=until, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # More rows are available; clients follow the cursor instead of being truncated
+    cursor_value = next_cursor(status_checks, limit)
+    headers = versions.headers(etag)
+    if cursor_value:
+        headers["X-Next-Cursor"] = cursor_value
+    
+    # Stored timestamps are naive UTC; encode them as StatusCheck would, without re-validating
+    return FastJSONResponse(status_checks, naive_utc=True, headers=headers)
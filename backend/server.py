@@ -1,154 +1,508 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import asynccontextmanager
+from typing import Optional
 import os
 import logging
+from dataclasses import replace
+import time
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List
-import uuid
-from datetime import datetime, timezone
 
-# Import contact routes
+# Import contact and status routes
 from routes.contact import router as contact_router
+from routes.portfolio import router as portfolio_router
+from routes.status import router as status_router
+from migrations import run_migrations
+from database import MongoSettings, create_client, warm_up_pool
+from repositories.base import Storage
+from storage import StorageSettings, open_storage
+from services.cache import CacheSettings, LRUCache
+from services.compression import CompressionMiddleware, CompressionSettings
+from services.dedup import DedupSettings, DuplicateSuppressor
+from services.events import ChangeStreamRelay, EventBus, EventSettings, change_streams_supported, created_event
+from services.health import DatabaseHealthMonitor, HealthSettings
+from services.idempotency import IdempotencyKeys, IdempotencyMiddleware, IdempotencySettings, MongoIdempotencyStore
+from services.ingestion import ContactIngestionQueue, IngestionSettings
+from services.metrics import MetricsMiddleware, MongoCommandMetrics, MongoPoolMetrics, create_registry
+from services.notifications import Notifier, NotificationSettings, build_transports
+from services.portfolio import (
+    PORTFOLIO_COLLECTION,
+    FilePortfolioSource,
+    MongoPortfolioSource,
+    PortfolioContent,
+    PortfolioSettings,
+)
+from services.ratelimit import MongoWindowLimiter, RateLimitMiddleware, RateLimitSettings, TokenBucketLimiter
+from services.retention import RetentionJob, RetentionSettings, ensure_status_check_ttl
+from services.versions import (
+    MULTI_WORKER_STALENESS_SECONDS,
+    CollectionVersions,
+    ETagSettings,
+    running_multiple_workers,
+)
+from utils.env import env_bool
+from utils.logs import LogSettings, configure_logging
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
-# Create the main app without a prefix
-app = FastAPI(title="Charan's Portfolio API", version="1.0.0")
-
-# Store db in app state for access in routes
-app.state.db = db
+# Configure logging; by default records are written by a background thread, off the event loop
+log_pipeline = configure_logging(LogSettings.from_env())
+logger = logging.getLogger(__name__)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 
-# Define Models
-class StatusCheck(BaseModel):
-    model_config = ConfigDict(extra="ignore")  # Ignore MongoDB's _id field
-    
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    client_name: str
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class StatusCheckCreate(BaseModel):
-    client_name: str
-
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Hello World"}
 
 @api_router.get("/health")
-async def health_check():
-    """Health check endpoint to verify API and database connectivity"""
-    try:
-        # Test MongoDB connection
-        await db.command("ping")
-        return {
-            "status": "healthy",
-            "api": "running",
-            "database": "connected",
-            "version": "1.0.0"
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "api": "running",
-            "database": "disconnected",
-            "error": str(e)
-        }
-
-@api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.model_dump()
-    status_obj = StatusCheck(**status_dict)
-    
-    # Convert to dict and serialize datetime to ISO string for MongoDB
-    doc = status_obj.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
-    
-    _ = await db.status_checks.insert_one(doc)
-    return status_obj
-
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    # Exclude MongoDB's _id field from the query results
-    status_checks = await db.status_checks.find({}, {"_id": 0}).to_list(1000)
-    
-    # Convert ISO string timestamps back to datetime objects
-    for check in status_checks:
-        if isinstance(check['timestamp'], str):
-            check['timestamp'] = datetime.fromisoformat(check['timestamp'])
-    
-    return status_checks
-
-# Include the router in the main app
-app.include_router(api_router)
-
-# Include contact router
-app.include_router(contact_router)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+async def health_check(request: Request):
+    """Health check endpoint reporting API and database connectivity (no I/O)"""
+    monitor = request.app.state.health_monitor
+    return {
+        "status": "healthy" if monitor.ready else "unhealthy",
+        "api": "running",
+        "version": "1.0.0",
+        **monitor.snapshot()
+    }
+
+@api_router.get("/health/live")
+async def liveness_probe():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+@api_router.get("/health/pool")
+async def pool_stats(request: Request):
+    """Live MongoDB connection pool occupancy for this worker"""
+    settings = request.app.state.mongo_settings
+    if settings is None:
+        return {"storage": request.app.state.storage_settings.backend, "pools": []}
+    return {
+        "max_pool_size": settings.max_pool_size,
+        "min_pool_size": settings.min_pool_size,
+        "pools": request.app.state.pool_metrics.pool_stats()
+    }
+
+@api_router.get("/health/ready")
+async def readiness_probe(request: Request):
+    """Readiness probe: 503 unless the background pinger recently reached the database"""
+    monitor = request.app.state.health_monitor
+    return JSONResponse(
+        status_code=200 if monitor.ready else 503,
+        content={"status": "ready" if monitor.ready else "not_ready", **monitor.snapshot()}
+    )
+
+async def metrics_endpoint(request: Request):
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(request.app.state.metrics.render(), media_type="text/plain; version=0.0.4")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
 
-@app.on_event("startup")
-async def startup_db_indexes():
-    """Create MongoDB indexes on startup"""
+def service_gauge_collector(app: FastAPI):
+    """Gauges read from in-process services at scrape time"""
+    def collect():
+        cache_stats = app.state.contact_message_cache.stats()
+        for key in ("size", "hits", "misses", "evictions", "expirations", "invalidations"):
+            yield (f"contact_cache_{key}", f"Contact message cache {key}", {}, cache_stats[key])
+        yield ("http_not_modified_total", "List requests answered 304 from the collection versions", {},
+               app.state.collection_versions.not_modified)
+        log_stats = log_pipeline.stats()
+        yield ("log_records_queued", "Log records waiting for the writer thread", {}, log_stats["queued"])
+        yield ("log_records_dropped_total", "Log records dropped because the queue was full", {},
+               log_stats["dropped"])
+        yield ("log_records_sampled_out_total", "INFO log records skipped by LOG_SAMPLE", {},
+               log_stats["sampled_out"])
+        events = app.state.contact_events
+        yield ("contact_event_subscribers", "Open contact event streams", {}, events.subscribers)
+        yield ("contact_events_published_total", "Contact events published", {}, events.published)
+        yield ("contact_event_slow_consumers_total", "Event streams closed for falling behind", {},
+               events.slow_consumers)
+        ingestion = app.state.contact_ingestion
+        yield ("contact_ingestion_queue_depth", "Messages waiting in the write-behind queue", {},
+               ingestion.depth if ingestion is not None else 0)
+        portfolio = app.state.portfolio
+        yield ("portfolio_reloads_total", "Portfolio content snapshots built", {}, portfolio.reloads)
+        yield ("portfolio_reload_errors_total", "Portfolio content loads that failed", {}, portfolio.errors)
+        notifier = app.state.notifier
+        if notifier is not None:
+            yield ("notifications_delivered_total", "Contact notifications delivered", {}, notifier.delivered)
+            yield ("notifications_retried_total", "Contact notification deliveries scheduled for retry", {},
+                   notifier.retried)
+            yield ("notifications_failed_total", "Contact notifications given up on", {}, notifier.failed)
+            yield ("notifications_buffered", "Notifications not yet written to the outbox", {}, notifier.buffered)
+            yield ("notifications_dropped_total", "Notifications dropped while the outbox was unavailable", {},
+                   notifier.dropped)
+        idempotency = app.state.idempotency_keys
+        if idempotency is not None:
+            yield ("idempotent_replays_total", "Retried creates answered with the recorded response", {},
+                   idempotency.replayed)
+            yield ("idempotent_coalesced_total", "Repeats that waited for the original request in flight", {},
+                   idempotency.coalesced)
+            yield ("idempotent_conflicts_total", "Repeats rejected because the original was still running", {},
+                   idempotency.conflicts)
+        retention = app.state.retention_job
+        if retention is not None:
+            yield ("contact_messages_archived_total", "Contact messages moved to the archive", {}, retention.archived)
+            yield ("retention_failures_total", "Retention runs that raised an error", {}, retention.failures)
+        monitor = app.state.health_monitor
+        if monitor is None:
+            return
+        yield ("database_up", "1 if the background pinger reached the database recently", {}, int(monitor.ready))
+        if monitor.last_latency_ms is not None:
+            yield ("database_ping_latency_seconds", "Latency of the last database ping", {},
+                   monitor.last_latency_ms / 1000)
+    return collect
+
+
+def on_contacts_inserted(app: FastAPI):
+    """Flush hook for the ingestion queue: messages written in the background count as writes"""
+    async def inserted(docs):
+        app.state.collection_versions.bump("contact_messages")
+        if docs:
+            app.state.contact_events.publish_local("created", created_event(docs))
+            if app.state.notifier is not None:
+                await app.state.notifier.submit(docs)
+    return inserted
+
+
+def on_contacts_changed(app: FastAPI):
+    """Change stream hook: follow writes made by any worker in this worker's caches"""
+    def changed(ids):
+        app.state.collection_versions.bump("contact_messages")
+        cache = app.state.contact_message_cache
+        if ids is None:
+            cache.clear()
+            app.state.contact_dedup.recent.clear()
+        else:
+            cache.invalidate_many(ids)
+            # Deletes by other workers; the content_hash index answers for anything dropped here
+            app.state.contact_dedup.forget_messages(ids)
+    return changed
+
+
+def bound_worker_staleness(app: FastAPI) -> None:
+    """
+    List ETag versions and the GET-by-id cache live in each worker. With
+    several workers and no change stream relaying the others' writes, a
+    worker could answer 304 or serve a deleted message for the full cache
+    TTL; bound both to MULTI_WORKER_STALENESS_SECONDS unless set explicitly.
+    """
+    state = app.state
+    bound = MULTI_WORKER_STALENESS_SECONDS
+    versions = state.collection_versions
+    if "ETAG_MAX_STALENESS_SECONDS" not in os.environ and versions.settings.max_staleness_seconds <= 0:
+        versions.settings = replace(versions.settings, max_staleness_seconds=bound)
+    cache = state.contact_message_cache
+    if "CONTACT_CACHE_TTL_SECONDS" not in os.environ and cache.settings.ttl_seconds > bound:
+        cache.settings = replace(cache.settings, ttl_seconds=bound)
+    if versions.settings.max_staleness_seconds <= 0 or cache.settings.ttl_seconds > bound:
+        logger.warning(
+            "Several workers without a change stream: other workers' writes may show up only after "
+            "ETAG_MAX_STALENESS_SECONDS=%g (0 = never) and CONTACT_CACHE_TTL_SECONDS=%g",
+            versions.settings.max_staleness_seconds, cache.settings.ttl_seconds
+        )
+    else:
+        logger.info("✓ Several workers without a change stream: caches and ETags lag at most %gs", bound)
+
+
+def on_contacts_archived(app: FastAPI):
+    """Retention hook: archived messages are deletes as far as caches and the live feed are concerned"""
+    def archived(ids):
+        app.state.collection_versions.bump("contact_messages")
+        app.state.contact_message_cache.invalidate_many(ids)
+        app.state.contact_dedup.forget_messages(ids)
+        app.state.contact_events.publish_local("deleted", {"ids": ids})
+    return archived
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker startup and shutdown. The Mongo client (or embedded store) is
+    opened here rather than at import time so every worker process opens its
+    own connections after forking.
+    """
+    state = app.state
+    settings = state.mongo_settings
+    client = db = None
+    if state.storage is None:
+        if state.storage_settings.backend == "mongo":
+            client = state.mongo_client
+            if client is None:
+                client = create_client(
+                    settings,
+                    event_listeners=[MongoCommandMetrics(state.metrics), state.pool_metrics]
+                )
+            db = client[settings.db_name]
+            state.mongo_client = client
+            state.db = db
+        state.storage = await open_storage(state.storage_settings, db)
+    storage = state.storage
+
+    # Shared rate limit counters need the database, so that backend is built here
+    rate_limit = state.rate_limit_settings
+    if rate_limit.enabled and rate_limit.backend == "mongo":
+        if db is not None:
+            state.rate_limiter = MongoWindowLimiter(db.rate_limits, rate_limit)
+        else:
+            logger.warning("RATE_LIMIT_BACKEND=mongo needs MongoDB storage; using per-worker limits")
+            state.rate_limiter = TokenBucketLimiter(rate_limit)
+
+    # Idempotency keys are shared through MongoDB when it is the store; per worker otherwise
+    idempotency = state.idempotency_settings
+    if idempotency.enabled:
+        store = MongoIdempotencyStore(db.idempotency_keys, idempotency) if db is not None else None
+        state.idempotency_keys = IdempotencyKeys(idempotency, store)
+
+    state.health_monitor = DatabaseHealthMonitor(storage, HealthSettings.from_env())
+    state.health_monitor.start()
+    started = time.perf_counter()
     try:
-        logger.info("=" * 50)
-        logger.info("Starting Charan's Portfolio API")
-        logger.info(f"Database: {os.environ.get('DB_NAME', 'test_database')}")
-        logger.info(f"MongoDB URL: {mongo_url}")
-        logger.info("=" * 50)
-        
-        # Test database connection
-        await db.command("ping")
-        logger.info("✓ MongoDB connection successful")
-        
-        # Create indexes for contact_messages collection
-        await db.contact_messages.create_index("id", unique=True)
-        await db.contact_messages.create_index("email")
-        await db.contact_messages.create_index([("timestamp", -1)])  # Descending for sorting
-        await db.contact_messages.create_index("status")
-        logger.info("✓ MongoDB indexes created successfully")
-        
-        # Log available routes
-        logger.info("✓ API Routes registered:")
-        logger.info("  - GET  /api/")
-        logger.info("  - GET  /api/health")
-        logger.info("  - POST /api/contact")
-        logger.info("  - GET  /api/contact")
-        logger.info("  - GET  /api/contact/{id}")
-        logger.info("  - DELETE /api/contact/{id}")
-        logger.info("=" * 50)
-        logger.info("Portfolio API is ready!")
-        logger.info("=" * 50)
+        if db is not None:
+            logger.info(
+                "Starting Charan's Portfolio API (database=%s, mongo=%s)", settings.db_name, settings.redacted_url
+            )
+        else:
+            logger.info("Starting Charan's Portfolio API (storage=%s)", storage.name)
+
+        if db is not None:
+            # Open minPoolSize connections now rather than inside the first requests
+            if settings.min_pool_size:
+                warmed = await warm_up_pool(db, settings.min_pool_size)
+                logger.info("✓ Connection pool warmed (%s/%s)", warmed, settings.min_pool_size)
+
+            # Indexes and data migrations run once across workers (guarded by a lock),
+            # or not at all when a separate `python manage.py migrate` step handles them.
+            # Boots with an up-to-date schema version skip index work entirely.
+            if env_bool("RUN_MIGRATIONS_ON_STARTUP", True):
+                await run_migrations(db)
+
+        # Feed the live event stream from a change stream when the deployment supports one,
+        # so every worker reports every write; otherwise each worker reports its own
+        event_settings = state.contact_events.settings
+        if db is not None and event_settings.source != "local":
+            supported, pre_images = await change_streams_supported(db)
+            if supported:
+                relay = ChangeStreamRelay(
+                    db.contact_messages, state.contact_events, pre_images, on_contacts_changed(app)
+                )
+                relay.start()
+                state.change_stream_relay = relay
+                logger.info("✓ Contact events follow the change stream (delete ids: %s)", pre_images)
+            elif event_settings.source == "change_stream":
+                logger.warning("CONTACT_EVENTS_SOURCE=change_stream needs a replica set; using local events")
+        if state.change_stream_relay is None and running_multiple_workers():
+            bound_worker_staleness(app)
+
+        # Expire status checks with a TTL index on Mongo; archive old contact messages
+        # (and sweep status checks on embedded backends) from a periodic job if enabled
+        retention = state.retention_settings
+        if db is not None:
+            await ensure_status_check_ttl(db, retention.status_check_days)
+        if retention.interval_hours > 0:
+            job = RetentionJob(
+                storage, retention, db,
+                on_archived=on_contacts_archived(app),
+                on_expired=lambda: state.collection_versions.bump("status_checks"),
+            )
+            job.start()
+            state.retention_job = job
+            logger.info("✓ Retention job runs every %g hours", retention.interval_hours)
+
+        # Portfolio content: built into an in-memory snapshot now, swapped when the source changes
+        portfolio_settings = PortfolioSettings.from_env()
+        if portfolio_settings.source == "mongo" and db is not None:
+            source = MongoPortfolioSource(db[PORTFOLIO_COLLECTION])
+        else:
+            if portfolio_settings.source == "mongo":
+                logger.warning("PORTFOLIO_SOURCE=mongo needs MongoDB storage; reading PORTFOLIO_PATH")
+            source = FilePortfolioSource(ROOT_DIR / portfolio_settings.path)
+        portfolio = PortfolioContent(source, portfolio_settings)
+        if not await portfolio.reload() and not portfolio.snapshot.entries:
+            logger.warning("Portfolio content not found at %s; /api/portfolio returns 404 until it appears", source)
+        portfolio.start()
+        state.portfolio = portfolio
+
+        # Deliver new-message notifications from the outbox in the background
+        notification_settings = NotificationSettings.from_env()
+        if notification_settings.enabled:
+            transports = build_transports(notification_settings)
+            if transports:
+                notifier = Notifier(storage.notifications, notification_settings, transports)
+                notifier.start()
+                state.notifier = notifier
+                logger.info(
+                    "✓ Contact notifications via %s (%s)", ", ".join(transports), notification_settings.mode
+                )
+
+        # Start batched contact ingestion if configured
+        ingestion_settings = state.ingestion_settings
+        if ingestion_settings.enabled:
+            ingestion = ContactIngestionQueue(storage.contacts, ingestion_settings, on_contacts_inserted(app))
+            ingestion.start()
+            state.contact_ingestion = ingestion
+            logger.info(
+                "✓ Batched contact ingestion enabled (batch=%s, ack=%s)",
+                ingestion_settings.batch_size, ingestion_settings.ack
+            )
+
+        logger.info("Portfolio API is ready (%.0f ms)", (time.perf_counter() - started) * 1000)
     except Exception as e:
-        logger.error(f"Startup error: {str(e)}")
+        logger.error("Startup error: %s", e)
         logger.warning("API may not function correctly")
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    yield
+
+    await state.health_monitor.stop()
+    await state.portfolio.stop()
+    if state.retention_job is not None:
+        await state.retention_job.stop()
+        state.retention_job = None
+    # End open event streams, then stop following the change stream
+    state.contact_events.close()
+    if state.change_stream_relay is not None:
+        await state.change_stream_relay.stop()
+        state.change_stream_relay = None
+    # Flush queued contact messages before the client goes away
+    ingestion = state.contact_ingestion
+    if ingestion is not None:
+        state.contact_ingestion = None
+        await ingestion.stop()
+        logger.info("✓ Contact ingestion queue flushed")
+    # After the ingestion flush, which may still submit notifications; undelivered ones stay in the outbox
+    notifier = state.notifier
+    if notifier is not None:
+        state.notifier = None
+        await notifier.stop()
+    await storage.close()
+    if client is not None:
+        client.close()
+
+
+def create_app(
+    mongo_client: Optional[AsyncIOMotorClient] = None,
+    storage: Optional[Storage] = None,
+) -> FastAPI:
+    """
+    Build the FastAPI application.
+
+    - **mongo_client**: Use this client instead of creating one on startup
+      (benchmarks and tests); it is still closed on shutdown
+    - **storage**: Use this storage backend instead of the one selected by
+      STORAGE_BACKEND; it is closed on shutdown
+    """
+    # Create the main app without a prefix
+    app = FastAPI(title="Charan's Portfolio API", version="1.0.0", lifespan=lifespan)
+
+    # Request and database metrics, exposed at /metrics
+    metrics = create_registry()
+    app.state.metrics = metrics
+    app.state.pool_metrics = MongoPoolMetrics(metrics)
+    metrics.add_collector(service_gauge_collector(app))
+    metrics.add_collector(app.state.pool_metrics.collect)
+
+    # Storage is opened per worker in `lifespan`; MongoDB unless STORAGE_BACKEND says otherwise
+    storage_settings = StorageSettings.from_env()
+    app.state.storage_settings = storage_settings
+    # Read here rather than in `lifespan` so unknown modes fail the build instead of being logged
+    app.state.ingestion_settings = IngestionSettings.from_env()
+    app.state.storage = storage
+    app.state.mongo_settings = (
+        MongoSettings.from_env() if storage is None and storage_settings.backend == "mongo" else None
+    )
+    app.state.mongo_client = mongo_client
+    app.state.db = None
+
+    # Serialized GET /api/contact/{id} responses, invalidated on delete and status change
+    app.state.contact_message_cache = LRUCache(CacheSettings.from_env("CONTACT_CACHE"))
+
+    # Write counters per collection; list endpoints derive ETags from them
+    app.state.collection_versions = CollectionVersions(ETagSettings.from_env())
+
+    # Live feed behind GET /api/contact/stream; the change stream relay is started in `lifespan`
+    app.state.contact_events = EventBus(EventSettings.from_env())
+    app.state.change_stream_relay = None
+
+    # Duplicate submission suppression for POST /api/contact
+    app.state.contact_dedup = DuplicateSuppressor(DedupSettings.from_env())
+
+    # Per-IP limiter for write endpoints; the shared Mongo backend is set up in `lifespan`
+    rate_limit = RateLimitSettings.from_env()
+    app.state.rate_limit_settings = rate_limit
+    app.state.rate_limiter = (
+        TokenBucketLimiter(rate_limit) if rate_limit.enabled and rate_limit.backend == "memory" else None
+    )
+
+    # Recorded responses for Idempotency-Key retries (built in `lifespan`, once storage is known)
+    app.state.idempotency_settings = IdempotencySettings.from_env()
+    app.state.idempotency_keys = None
+
+    # Background database pinger read by the health probes (started in `lifespan`)
+    app.state.health_monitor = None
+
+    # Write-behind ingestion queue for POST /api/contact (started in `lifespan` when enabled)
+    app.state.contact_ingestion = None
+
+    # Portfolio content snapshot behind /api/portfolio (loaded in `lifespan`)
+    app.state.portfolio = PortfolioContent(None, PortfolioSettings())
+
+    # New-message notifications (started in `lifespan` when NOTIFY_CHANNELS is set)
+    app.state.notifier = None
+
+    # Status check expiry and contact message archiving (job started in `lifespan` when scheduled)
+    app.state.retention_settings = RetentionSettings.from_env()
+    app.state.retention_job = None
+
+    # Include the router in the main app
+    app.include_router(api_router)
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+
+    # Include contact and status routers
+    app.include_router(contact_router)
+    app.include_router(status_router)
+    app.include_router(portfolio_router)
+
+    # Replay recorded responses to retried creates (replays run inside the limiter but cost no
+    # budget: only responses the route produced are charged)
+    app.add_middleware(
+        IdempotencyMiddleware,
+        routes=[("POST", "/api/contact"), ("POST", "/api/status")],
+        max_body_bytes=app.state.idempotency_settings.max_body_bytes
+    )
+
+    # Outside idempotency, so over-limit clients are rejected before any body is read or key
+    # claimed (only accepted submissions count); inside CORS so 429s carry CORS headers
+    app.add_middleware(
+        RateLimitMiddleware,
+        routes=[("POST", "/api/contact")],
+        trust_proxy=rate_limit.trust_proxy
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "Idempotent-Replayed"],
+    )
+
+    # gzip/brotli for large bodies and exports; outside CORS so its headers are compressed along
+    app.add_middleware(CompressionMiddleware, settings=CompressionSettings.from_env())
+
+    # Outermost middleware so recorded latency covers the whole stack
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
+    return app
+
+
+# Module-level app for `uvicorn server:app`; multi-worker deployments use
+# `python manage.py serve --workers N` (or `uvicorn server:create_app --factory`)
+app = create_app()
@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from utils.env import env_float, env_int
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """Sizing for an in-process response cache; `max_entries=0` disables it"""
+    max_entries: int = 1024
+    ttl_seconds: float = 300.0
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "CacheSettings":
+        return cls(
+            max_entries=env_int(f"{prefix}_MAX_ENTRIES", cls.max_entries),
+            ttl_seconds=env_float(f"{prefix}_TTL_SECONDS", cls.ttl_seconds),
+        )
+
+
+class LRUCache:
+    """
+    Bounded LRU cache with a per-entry TTL and hit/miss/eviction counters.
+
+    Writers that read from the database before calling `set` should capture
+    `generation` first and pass it back, so a value fetched before a
+    concurrent invalidation is never stored.
+    """
+
+    def __init__(self, settings: CacheSettings):
+        self.settings = settings
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.settings.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.settings.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self.invalidate_many((key,))
+
+    def invalidate_many(self, keys: Iterable[Hashable]) -> None:
+        self.generation += 1
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> None:
+        """Drop every entry whose value matches `predicate` (a scan; for rare events such as deletes)"""
+        self.invalidate_many([key for key, (_, value) in self._entries.items() if predicate(value)])
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.settings.max_entries,
+            "ttl_seconds": self.settings.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,162 @@
+import zlib
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from utils.env import env_bool, env_int
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+# Already compressed or must reach the client unbuffered
+SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "audio/", "video/", "application/gzip", "application/zip")
+
+
+@dataclass(frozen=True)
+class CompressionSettings:
+    """Response compression; bodies below `minimum_size` bytes are sent as-is"""
+    enabled: bool = True
+    minimum_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4  # brotli's fast range; 11 is far too slow per request
+
+    @classmethod
+    def from_env(cls) -> "CompressionSettings":
+        return cls(
+            enabled=env_bool("COMPRESSION_ENABLED", cls.enabled),
+            minimum_size=env_int("COMPRESSION_MIN_SIZE", cls.minimum_size),
+            gzip_level=env_int("COMPRESSION_GZIP_LEVEL", cls.gzip_level),
+            brotli_quality=env_int("COMPRESSION_BROTLI_QUALITY", cls.brotli_quality),
+        )
+
+
+def choose_encoding(accept_encoding: str, available: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    Best coding from an Accept-Encoding header among `available` (default:
+    what this process can compress with), br before gzip at equal quality
+    """
+    offered = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        offered[coding.strip().lower()] = quality
+    if available is None:
+        candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    else:
+        candidates = [coding for coding in ("br", "gzip") if coding in available]
+    best = None
+    for coding in candidates:
+        quality = offered.get(coding, offered.get("*", 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (coding, quality)
+    return best[0] if best else None
+
+
+class _Compressor:
+    """Incremental gzip or brotli encoder"""
+
+    def __init__(self, encoding: str, settings: CompressionSettings):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(settings.gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush, so streamed chunks reach the client without waiting for more data"""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli (when installed) or
+    gzip, as negotiated by Accept-Encoding.
+
+    Complete bodies smaller than `minimum_size` are left alone. Streamed
+    bodies (exports) are compressed chunk by chunk and flushed as they go.
+    Event streams, already-encoded responses and bodyless statuses are
+    passed through untouched.
+    """
+
+    def __init__(self, app, settings: CompressionSettings):
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.settings.enabled:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or content_type.startswith(SKIP_CONTENT_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message  # held until the first body chunk decides
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                # Routes that negotiate encodings themselves already vary on it
+                if "accept-encoding" not in (value.strip().lower() for value in headers.get("vary", "").split(",")):
+                    headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.settings.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.settings)
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    del headers["Content-Length"]
+                    body = compressor.chunk(body)
+                else:
+                    body = compressor.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+                start_message = None
+            else:
+                body = compressor.chunk(body) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,72 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from repositories.base import ContactRepository
+from services.cache import CacheSettings, LRUCache
+from utils.env import env_float, env_int
+
+
+def content_hash(name: str, email: str, subject: str, message: str) -> str:
+    """Stable hash of a submission's content, ignoring surrounding whitespace and email case"""
+    payload = json.dumps(
+        [name.strip(), email.strip().lower(), subject.strip(), message.strip()],
+        ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class DedupSettings:
+    """Duplicate-submission suppression for POST /api/contact; `window_seconds=0` disables it"""
+    window_seconds: float = 600.0
+    max_entries: int = 10000
+
+    @classmethod
+    def from_env(cls) -> "DedupSettings":
+        return cls(
+            window_seconds=env_float("CONTACT_DEDUP_WINDOW_SECONDS", cls.window_seconds),
+            max_entries=env_int("CONTACT_DEDUP_MAX_ENTRIES", cls.max_entries),
+        )
+
+
+class DuplicateSuppressor:
+    """
+    Finds an earlier message with the same content hash inside the window.
+
+    Recent submissions are remembered in memory (which also covers messages
+    still waiting in the write-behind queue); older ones, or ones accepted by
+    another worker, are found through the `content_hash` index.
+    """
+
+    def __init__(self, settings: DedupSettings):
+        self.settings = settings
+        self.recent = LRUCache(CacheSettings(max_entries=settings.max_entries, ttl_seconds=settings.window_seconds))
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.window_seconds > 0
+
+    async def find_original(self, contacts: ContactRepository, digest: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        original = self.recent.get(digest)
+        if original is not None:
+            return original
+        since = datetime.utcnow() - timedelta(seconds=self.settings.window_seconds)
+        return await contacts.find_by_content_hash(digest, since)
+
+    def remember(self, digest: str, doc: dict) -> None:
+        if self.enabled:
+            self.recent.set(digest, doc)
+
+    def forget(self, digest: str) -> None:
+        self.recent.invalidate(digest)
+
+    def forget_messages(self, ids: Iterable[str]) -> None:
+        """Drop remembered submissions whose message was deleted, so resending them stores them again"""
+        ids = set(ids)
+        if ids:
+            self.recent.invalidate_where(lambda doc: doc.get("id") in ids)
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Iterable, List, Optional, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+
+from repositories.base import MESSAGE_LIST_FIELDS
+from utils.env import env_float, env_int, env_str
+from utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Pushed into a subscriber's queue to end its stream
+_CLOSE = object()
+
+# Change stream events the relay turns into feed events
+CHANGE_STREAM_PIPELINE = [{"$match": {"operationType": {"$in": ["insert", "update", "delete", "drop", "invalidate"]}}}]
+
+# InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost: the stream must start over
+UNRESUMABLE_ERROR_CODES = (260, 280, 286)
+
+# First wire version of MongoDB 6.0, which can return pre-images of deleted documents
+PRE_IMAGES_WIRE_VERSION = 17
+
+
+@dataclass(frozen=True)
+class EventSettings:
+    """Live contact message feed (GET /api/contact/stream)"""
+    source: str = "auto"  # "auto" (change streams when the deployment has them), "local" or "change_stream"
+    history_size: int = 1000  # events kept for Last-Event-ID resume
+    buffer_size: int = 512  # undelivered events per subscriber before it is disconnected
+    max_subscribers: int = 100
+    heartbeat_seconds: float = 15.0
+    retry_ms: int = 3000  # reconnect delay suggested to EventSource clients
+
+    @classmethod
+    def from_env(cls) -> "EventSettings":
+        return cls(
+            source=env_str("CONTACT_EVENTS_SOURCE", cls.source),
+            history_size=env_int("CONTACT_EVENTS_HISTORY", cls.history_size),
+            buffer_size=env_int("CONTACT_EVENTS_BUFFER", cls.buffer_size),
+            max_subscribers=env_int("CONTACT_EVENTS_MAX_SUBSCRIBERS", cls.max_subscribers),
+            heartbeat_seconds=env_float("CONTACT_EVENTS_HEARTBEAT_SECONDS", cls.heartbeat_seconds),
+            retry_ms=env_int("CONTACT_EVENTS_RETRY_MS", cls.retry_ms),
+        )
+
+
+class TooManySubscribersError(Exception):
+    """Raised when the feed already has `max_subscribers` open streams"""
+
+
+def created_event(docs: Iterable[dict]) -> dict:
+    """`created` payload: the list-view fields of each new message"""
+    return {"messages": [{field: doc.get(field) for field in MESSAGE_LIST_FIELDS} for doc in docs]}
+
+
+def _frame(event_type: str, data: dict, event_id: Optional[str] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event_type}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+
+class Subscription:
+    """One connected client: a bounded queue of encoded frames plus its replay backlog"""
+
+    def __init__(self, bus: "EventBus", backlog: List[bytes]):
+        self.bus = bus
+        self.backlog = backlog
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=bus.settings.buffer_size)
+
+    def close(self) -> None:
+        # Drop what is still buffered so the close marker always fits; the
+        # client reconnects with its Last-Event-ID and replays from history
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_CLOSE)
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        """SSE body: retry hint, replayed backlog, then live frames with heartbeat comments"""
+        settings = self.bus.settings
+        try:
+            yield f"retry: {settings.retry_ms}\n\n".encode()
+            for frame in self.backlog:
+                yield frame
+            self.backlog = []
+            while True:
+                try:
+                    frame = await asyncio.wait_for(self.queue.get(), settings.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if frame is _CLOSE:
+                    return
+                yield frame
+        finally:
+            self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process fan-out of contact message changes to SSE subscribers.
+
+    Each event is encoded once and the same bytes are queued for every
+    subscriber. A subscriber whose queue is full is disconnected instead of
+    buffering without bound. The last `history_size` events are kept so a
+    reconnecting client can resume from its Last-Event-ID; if that id is no
+    longer known, it gets a `reset` event telling it to reload.
+
+    Writers in this process publish with `publish_local`. While a change
+    stream relay feeds the bus, those calls are ignored and every worker
+    publishes the same events, with the change stream's resume tokens as ids.
+    """
+
+    def __init__(self, settings: EventSettings):
+        self.settings = settings
+        self.epoch = uuid.uuid4().hex[:8]
+        self.local = True
+        self._sequence = 0
+        self._history: Deque[Tuple[str, bytes]] = deque(maxlen=settings.history_size)
+        self._subscribers: Set[Subscription] = set()
+        self.published = 0
+        self.slow_consumers = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish_local(self, event_type: str, data: dict) -> None:
+        """Publish a change made by this process, unless a change stream already reports it"""
+        if self.local:
+            self.publish(event_type, data)
+
+    def publish(self, event_type: str, data: dict, event_id: Optional[str] = None) -> str:
+        if event_id is None:
+            self._sequence += 1
+            event_id = f"{self.epoch}-{self._sequence}"
+        frame = _frame(event_type, data, event_id)
+        self._history.append((event_id, frame))
+        self.published += 1
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self.slow_consumers += 1
+                self._subscribers.discard(subscription)
+                subscription.close()
+                logger.warning("Disconnected a slow contact event subscriber")
+        return event_id
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        if len(self._subscribers) >= self.settings.max_subscribers:
+            raise TooManySubscribersError("Too many open event streams")
+        # Backlog and registration happen without awaiting, so no event is missed or repeated
+        subscription = Subscription(self, self._replay(last_event_id))
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def _replay(self, last_event_id: Optional[str]) -> List[bytes]:
+        if not last_event_id:
+            return []
+        history = list(self._history)
+        for position, (event_id, _) in enumerate(history):
+            if event_id == last_event_id:
+                return [frame for _, frame in history[position + 1:]]
+        latest = history[-1][0] if history else None
+        return [_frame("reset", {"reason": "history_unavailable"}, latest)]
+
+    def close(self) -> None:
+        """End every open stream (shutdown)"""
+        for subscription in list(self._subscribers):
+            subscription.close()
+        self._subscribers.clear()
+
+
+async def change_streams_supported(db: AsyncIOMotorDatabase) -> Tuple[bool, bool]:
+    """(change streams available, deleted documents' pre-images available) for this deployment"""
+    try:
+        hello = await db.command("hello")
+    except Exception:
+        return False, False
+    supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return supported, supported and hello.get("maxWireVersion", 0) >= PRE_IMAGES_WIRE_VERSION
+
+
+class ChangeStreamRelay:
+    """
+    Feeds an EventBus from a change stream on contact_messages, so every
+    worker publishes every write, whichever worker made it.
+
+    `on_change(ids)` is called for each change with the affected message
+    ids, or None when they are unknown, so per-process caches can follow
+    writes made elsewhere. Deletes carry the message id only when the
+    collection records pre-images (MongoDB 6.0+, enabled by migration 6);
+    otherwise subscribers get a `reset`.
+    """
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        bus: EventBus,
+        pre_images: bool = False,
+        on_change: Optional[Callable[[Optional[List[str]]], None]] = None,
+    ):
+        self.collection = collection
+        self.bus = bus
+        self.pre_images = pre_images
+        self.on_change = on_change
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.bus.local = False
+        self._task = asyncio.create_task(self._run(), name="contact-change-stream")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.bus.local = True
+
+    async def _run(self) -> None:
+        resume_token = None
+        backoff = 1.0
+        while True:
+            try:
+                stream = self.collection.watch(
+                    CHANGE_STREAM_PIPELINE,
+                    full_document="updateLookup",
+                    full_document_before_change="whenAvailable" if self.pre_images else None,
+                    resume_after=resume_token,
+                )
+                async with stream:
+                    backoff = 1.0
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self._relay(change)
+                # Only an invalidate (collection dropped) ends the stream; it cannot be resumed
+                resume_token = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Contact change stream interrupted, retrying in %.0fs: %s", backoff, e)
+                if isinstance(e, OperationFailure) and e.code in UNRESUMABLE_ERROR_CODES:
+                    # Changes since the token are gone; start fresh and tell clients to reload
+                    resume_token = None
+                    self.bus.publish("reset", {"reason": "change_stream_restarted"})
+                    self._changed(None)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _relay(self, change: dict) -> None:
+        event_id = change["_id"]["_data"]
+        operation = change["operationType"]
+        if operation == "insert":
+            doc = change["fullDocument"]
+            self.bus.publish("created", created_event([doc]), event_id)
+            self._changed([doc["id"]])
+        elif operation == "update":
+            doc = change.get("fullDocument")
+            status = change.get("updateDescription", {}).get("updatedFields", {}).get("status")
+            if doc is None:
+                self._changed(None)
+                return
+            if status is not None:
+                self.bus.publish("status_changed", {"ids": [doc["id"]], "status": status}, event_id)
+            self._changed([doc["id"]])
+        elif operation == "delete" and change.get("fullDocumentBeforeChange"):
+            message_id = change["fullDocumentBeforeChange"]["id"]
+            self.bus.publish("deleted", {"ids": [message_id]}, event_id)
+            self._changed([message_id])
+        else:
+            self.bus.publish("reset", {"reason": operation}, event_id)
+            self._changed(None)
+
+    def _changed(self, ids: Optional[List[str]]) -> None:
+        if self.on_change is not None:
+            self.on_change(ids)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from repositories.base import Storage
+from utils.env import env_float
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HealthSettings:
+    """Background database pinger settings"""
+    interval: float = 5.0  # seconds between pings
+    timeout: float = 2.0  # hard limit on a single ping
+    max_staleness: float = 15.0  # not ready if the last success is older than this
+
+    @classmethod
+    def from_env(cls) -> "HealthSettings":
+        return cls(
+            interval=env_float("HEALTH_PING_INTERVAL_SECONDS", cls.interval),
+            timeout=env_float("HEALTH_PING_TIMEOUT_SECONDS", cls.timeout),
+            max_staleness=env_float("HEALTH_MAX_STALENESS_SECONDS", cls.max_staleness),
+        )
+
+
+class DatabaseHealthMonitor:
+    """
+    Pings the storage backend on a fixed interval and keeps the result in memory.
+
+    Probes read `snapshot()` instead of talking to the database, so probe
+    traffic never reaches Mongo and a hung server cannot hang a probe.
+    """
+
+    def __init__(self, storage: Storage, settings: HealthSettings):
+        self.storage = storage
+        self.settings = settings
+        self.last_latency_ms: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_check_ok = False
+        self.consecutive_failures = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = asyncio.Event()
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._run(), name="db-health-pinger")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        # The event ends the loop even if the cancellation is swallowed by a
+        # wait_for whose ping finished at the same moment
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def check(self) -> bool:
+        """Ping the database once, bounded by the configured timeout"""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.storage.ping(), self.settings.timeout)
+        except asyncio.TimeoutError:
+            self._record_failure(f"ping timed out after {self.settings.timeout}s")
+        except Exception as e:
+            self._record_failure(str(e))
+        else:
+            self.last_latency_ms = (time.perf_counter() - started) * 1000
+            self.last_success = time.monotonic()
+            self.last_error = None
+            self.last_check_ok = True
+            self.consecutive_failures = 0
+        return self.last_check_ok
+
+    def _record_failure(self, error: str) -> None:
+        if self.last_check_ok or self.consecutive_failures == 0:
+            logger.warning("Database health check failed: %s", error)
+        self.last_error = error
+        self.last_check_ok = False
+        self.consecutive_failures += 1
+
+    async def _run(self) -> None:
+        while not self._stopped.is_set():
+            await self.check()
+            try:
+                await asyncio.wait_for(self._stopped.wait(), self.settings.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    @property
+    def seconds_since_success(self) -> Optional[float]:
+        if self.last_success is None:
+            return None
+        return time.monotonic() - self.last_success
+
+    @property
+    def ready(self) -> bool:
+        since = self.seconds_since_success
+        return self.last_check_ok and since is not None and since <= self.settings.max_staleness
+
+    def snapshot(self) -> dict:
+        since = self.seconds_since_success
+        return {
+            "database": "connected" if self.ready else "disconnected",
+            "last_ping_latency_ms": round(self.last_latency_ms, 2) if self.last_latency_ms is not None else None,
+            "seconds_since_last_success": round(since, 2) if since is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,363 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
+
+from services.cache import CacheSettings, LRUCache
+from utils.env import env_bool, env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+# Outcomes that are not final: a retry should run the request again rather than replay them
+RETRYABLE_STATUSES = frozenset({408, 409, 425, 429})
+
+
+@dataclass(frozen=True)
+class IdempotencySettings:
+    """
+    Idempotency-Key handling for create endpoints. The first response for a
+    key is kept for `ttl_seconds`; repeats with the same key and body get it
+    back without running the request again.
+    """
+    enabled: bool = True
+    ttl_seconds: float = 86400.0
+    max_entries: int = 10000  # responses kept in memory in front of the shared store
+    wait_seconds: float = 10.0  # how long a repeat waits for the original still in flight
+    lease_seconds: float = 15.0  # claim lease in the shared store; renewed while the original runs
+    max_body_bytes: int = 65536  # larger bodies with a key are rejected with 413 before anything is stored
+
+    @classmethod
+    def from_env(cls) -> "IdempotencySettings":
+        return cls(
+            enabled=env_bool("IDEMPOTENCY_ENABLED", cls.enabled),
+            ttl_seconds=env_float("IDEMPOTENCY_TTL_SECONDS", cls.ttl_seconds),
+            max_entries=env_int("IDEMPOTENCY_MAX_ENTRIES", cls.max_entries),
+            wait_seconds=env_float("IDEMPOTENCY_WAIT_SECONDS", cls.wait_seconds),
+            lease_seconds=env_float("IDEMPOTENCY_LEASE_SECONDS", cls.lease_seconds),
+            max_body_bytes=env_int("IDEMPOTENCY_MAX_BODY_BYTES", cls.max_body_bytes),
+        )
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """A completed response recorded for an idempotency key"""
+    fingerprint: str
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+    def to_document(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "status": self.status,
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in self.headers],
+            "body": self.body,
+        }
+
+    @classmethod
+    def from_document(cls, doc: dict) -> "StoredResponse":
+        return cls(
+            fingerprint=doc["fingerprint"],
+            status=doc["status"],
+            headers=[(name.encode("latin-1"), value.encode("latin-1")) for name, value in doc["headers"]],
+            body=bytes(doc["body"]),
+        )
+
+
+class KeyInFlightError(Exception):
+    """Raised when the original request for a key is still running after `wait_seconds`"""
+
+
+class MongoIdempotencyStore:
+    """
+    Keys shared by every worker, one document per key. A request claims its
+    key by inserting a pending document (the unique _id makes that atomic);
+    completion replaces it with the response. Documents expire through a TTL
+    index on `expires_at`. A pending claim carries a short lease that the
+    owner renews while the request runs (however slow the database is), so
+    only a worker that died mid-request lets another one take the key over.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection, settings: IdempotencySettings):
+        self.collection = collection
+        self.settings = settings
+
+    async def claim(self, key: str, fingerprint: str) -> Tuple[bool, Optional[dict]]:
+        """(claimed, existing document); claimed means this request should run"""
+        now = datetime.now(timezone.utc)
+        locked_until = now + timedelta(seconds=self.settings.lease_seconds)
+        try:
+            await self.collection.insert_one({
+                "_id": key, "state": "pending", "fingerprint": fingerprint,
+                "locked_until": locked_until, "expires_at": now + timedelta(seconds=self.settings.ttl_seconds),
+            })
+            return True, None
+        except DuplicateKeyError:
+            pass
+        doc = await self.collection.find_one({"_id": key})
+        if doc is None:
+            # Expired or released between the insert and the read
+            return await self.claim(key, fingerprint)
+        if doc["state"] == "pending" and doc["locked_until"].replace(tzinfo=timezone.utc) < now:
+            # Lease ran out: the original worker is gone; take the key over
+            taken = await self.collection.update_one(
+                {"_id": key, "state": "pending", "locked_until": doc["locked_until"]},
+                {"$set": {"fingerprint": fingerprint, "locked_until": locked_until}},
+            )
+            if taken.modified_count:
+                return True, None
+        return False, doc
+
+    async def renew(self, key: str, fingerprint: str) -> bool:
+        """Extend the lease of a pending claim this request owns; False once it is no longer ours"""
+        renewed = await self.collection.update_one(
+            {"_id": key, "state": "pending", "fingerprint": fingerprint},
+            {"$set": {"locked_until": datetime.now(timezone.utc) + timedelta(seconds=self.settings.lease_seconds)}},
+        )
+        return renewed.matched_count > 0
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {
+                "state": "done", **response.to_document(),
+                "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.settings.ttl_seconds),
+            }, "$unset": {"locked_until": ""}},
+        )
+
+    async def release(self, key: str) -> None:
+        await self.collection.delete_one({"_id": key, "state": "pending"})
+
+    async def wait(self, key: str, deadline: float) -> Optional[dict]:
+        """Poll a key claimed by another worker until it completes, is released or `deadline` passes"""
+        delay = 0.05
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+            doc = await self.collection.find_one({"_id": key})
+            if doc is None or doc["state"] == "done":
+                return doc
+        raise KeyInFlightError(key)
+
+
+class IdempotencyKeys:
+    """
+    Recorded responses per idempotency key: an in-process LRU in front of
+    the optional shared store, plus a map of keys currently running in this
+    worker so concurrent repeats wait for the original instead of writing.
+    """
+
+    def __init__(self, settings: IdempotencySettings, store: Optional[MongoIdempotencyStore] = None):
+        self.settings = settings
+        self.store = store
+        self.recent = LRUCache(CacheSettings(max_entries=settings.max_entries, ttl_seconds=settings.ttl_seconds))
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._heartbeats: Dict[str, asyncio.Task] = {}
+        self.replayed = 0
+        self.coalesced = 0
+        self.conflicts = 0
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        The recorded response for `key`, or None once this request owns the
+        key and should run (it must then call `finish`). Raises
+        KeyInFlightError if the original is still running after the wait.
+        """
+        deadline = time.monotonic() + self.settings.wait_seconds
+        while True:
+            stored = self.recent.get(key)
+            if stored is not None:
+                self.replayed += 1
+                return stored
+            running = self._in_flight.get(key)
+            if running is not None:
+                self.coalesced += 1
+                try:
+                    stored = await asyncio.wait_for(asyncio.shield(running), deadline - time.monotonic())
+                except asyncio.TimeoutError:
+                    self.conflicts += 1
+                    raise KeyInFlightError(key)
+                if stored is not None:
+                    self.replayed += 1
+                    return stored
+                continue  # the original was not recorded (error); run again
+            self._in_flight[key] = asyncio.get_running_loop().create_future()
+            if self.store is None:
+                return None
+            try:
+                stored = await self._claim(key, fingerprint, deadline)
+            except BaseException:
+                self._settle(key, None)
+                raise
+            if stored is None:
+                self._heartbeats[key] = asyncio.create_task(self._heartbeat(key, fingerprint))
+                return None
+            self._settle(key, stored)
+            self.replayed += 1
+            return stored
+
+    async def _claim(self, key: str, fingerprint: str, deadline: float) -> Optional[StoredResponse]:
+        while True:
+            claimed, doc = await self.store.claim(key, fingerprint)
+            if claimed:
+                return None
+            if doc["state"] == "pending":
+                try:
+                    doc = await self.store.wait(key, deadline)
+                except KeyInFlightError:
+                    self.conflicts += 1
+                    raise
+                if doc is None:
+                    continue
+            stored = StoredResponse.from_document(doc)
+            self.recent.set(key, stored)
+            return stored
+
+    async def _heartbeat(self, key: str, fingerprint: str) -> None:
+        """Keep renewing the owner's lease until `finish`, so a slow request is never taken over"""
+        interval = self.settings.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.store.renew(key, fingerprint):
+                    return
+            except Exception as e:
+                logger.error("Could not renew idempotency key lease: %s", e)
+
+    async def finish(self, key: str, response: Optional[StoredResponse]) -> None:
+        """Record the owner's response, or release the key when it should not be replayed"""
+        heartbeat = self._heartbeats.pop(key, None)
+        if heartbeat is not None:
+            heartbeat.cancel()
+        try:
+            if response is not None:
+                self.recent.set(key, response)
+            if self.store is not None:
+                if response is not None:
+                    await self.store.complete(key, response)
+                else:
+                    await self.store.release(key)
+        except Exception as e:
+            logger.error("Could not record idempotency key: %s", e)
+        finally:
+            self._settle(key, response)
+
+    def _settle(self, key: str, response: Optional[StoredResponse]) -> None:
+        running = self._in_flight.pop(key, None)
+        if running is not None and not running.done():
+            running.set_result(response)
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware honoring the Idempotency-Key header on selected routes.
+
+    The first request with a key runs normally and its response is recorded.
+    Repeats (client retries after a timeout) get the recorded response with
+    `Idempotent-Replayed: true` and never reach the route, so they write
+    nothing. A repeat arriving while the original is still running waits for
+    it. Reusing a key with a different body is rejected with 422; a repeat
+    whose original is still running after the wait gets 409. Server errors
+    and retryable statuses are not recorded, so retrying them runs again.
+    Bodies over `max_body_bytes` are rejected with 413 while being read.
+    """
+
+    def __init__(self, app, routes: Iterable[Tuple[str, str]], max_body_bytes: int = IdempotencySettings.max_body_bytes):
+        self.app = app
+        self.routes = frozenset(routes)
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"].rstrip("/")) not in self.routes:
+            await self.app(scope, receive, send)
+            return
+        keys: Optional[IdempotencyKeys] = scope["app"].state.idempotency_keys
+        raw_key = next((value for name, value in scope["headers"] if name == IDEMPOTENCY_HEADER), None)
+        if keys is None or raw_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not raw_key.strip() or len(raw_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, {"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"})
+            return
+
+        # The body is part of the request's identity, so it is read up front and replayed to the app
+        too_large = {"detail": f"Requests with an Idempotency-Key are limited to {self.max_body_bytes} bytes"}
+        length = next((value for name, value in scope["headers"] if name == b"content-length"), b"")
+        if length.isdigit() and int(length) > self.max_body_bytes:
+            await _send_json(send, 413, too_large)
+            return
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return  # client went away
+            body += message.get("body", b"")
+            if len(body) > self.max_body_bytes:
+                await _send_json(send, 413, too_large)
+                return
+            if not message.get("more_body", False):
+                break
+        fingerprint = hashlib.blake2b(bytes(body), digest_size=16).hexdigest()
+        key = f"{scope['method']} {scope['path'].rstrip('/')} {raw_key.decode('latin-1').strip()}"
+
+        try:
+            stored = await keys.begin(key, fingerprint)
+        except KeyInFlightError:
+            await _send_json(send, 409, {"detail": "A request with this Idempotency-Key is still being processed"})
+            return
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                await _send_json(send, 422, {"detail": "Idempotency-Key was already used with a different request"})
+                return
+            await send({"type": "http.response.start", "status": stored.status,
+                        "headers": stored.headers + [(REPLAYED_HEADER, b"true")]})
+            await send({"type": "http.response.body", "body": stored.body})
+            return
+
+        delivered = False
+
+        async def receive_body():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": bytes(body), "more_body": False}
+            return await receive()
+
+        status, headers, chunks = 500, [], []
+
+        async def send_recording(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status, headers = message["status"], list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        response = None
+        try:
+            await self.app(scope, receive_body, send_recording)
+            if 200 <= status < 500 and status not in RETRYABLE_STATUSES:
+                response = StoredResponse(fingerprint, status, headers, b"".join(chunks))
+        finally:
+            await keys.finish(key, response)
+
+
+async def _send_json(send, status: int, content: dict) -> None:
+    body = json.dumps(content).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,172 @@
+import asyncio
+import inspect
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from repositories.base import ContactRepository
+from utils.env import env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+INGEST_MODES = ("direct", "batched")
+ACK_MODES = ("flush", "enqueue")
+
+# Sentinel telling the flush loop to drain what it has and exit
+_STOP = object()
+
+
+class IngestionUnavailableError(Exception):
+    """Raised when the ingestion queue is full or shutting down"""
+
+
+@dataclass(frozen=True)
+class IngestionSettings:
+    """Write-behind ingestion settings for POST /api/contact"""
+    mode: str = "direct"  # "direct" (insert_one per request) or "batched"
+    ack: str = "flush"  # "flush" (ack after insert_many) or "enqueue" (ack when queued)
+    batch_size: int = 100
+    flush_interval: float = 0.05  # seconds
+    max_queue: int = 10000
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode == "batched"
+
+    @classmethod
+    def from_env(cls) -> "IngestionSettings":
+        settings = cls(
+            mode=env_str("CONTACT_INGEST_MODE", cls.mode),
+            ack=env_str("CONTACT_INGEST_ACK", cls.ack),
+            batch_size=env_int("CONTACT_INGEST_BATCH_SIZE", cls.batch_size),
+            flush_interval=env_int("CONTACT_INGEST_FLUSH_MS", int(cls.flush_interval * 1000)) / 1000,
+            max_queue=env_int("CONTACT_INGEST_QUEUE_SIZE", cls.max_queue),
+        )
+        if settings.mode not in INGEST_MODES:
+            raise ValueError(f"CONTACT_INGEST_MODE must be one of {', '.join(INGEST_MODES)}")
+        if settings.ack not in ACK_MODES:
+            raise ValueError(f"CONTACT_INGEST_ACK must be one of {', '.join(ACK_MODES)}")
+        return settings
+
+
+class ContactIngestionQueue:
+    """
+    Bounded in-process queue that batches contact message inserts.
+
+    Documents are flushed with a single repository `insert_many` once
+    `batch_size` documents are waiting or `flush_interval` has passed since
+    the first one arrived. When the queue is full, `submit` fails fast so the
+    caller can shed load instead of piling up writes. `on_inserted` is
+    called (and awaited, if it returns an awaitable) after every flush with
+    the documents that were written, once the waiting submitters have been
+    answered; its errors are logged, not raised.
+    """
+
+    def __init__(
+        self,
+        contacts: ContactRepository,
+        settings: IngestionSettings,
+        on_inserted: Optional[Callable[[List[dict]], Optional[Awaitable[None]]]] = None,
+    ):
+        self.contacts = contacts
+        self.settings = settings
+        self.on_inserted = on_inserted
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="contact-ingestion")
+
+    async def stop(self) -> None:
+        """Stop accepting documents and flush everything still queued"""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def submit(self, doc: dict) -> None:
+        """
+        Queue a document for insertion.
+
+        With `ack="flush"` this waits until the batch containing the document
+        has been written and re-raises its write error, if any.
+        """
+        if self._closing:
+            raise IngestionUnavailableError("Ingestion queue is shutting down")
+        future = None
+        if self.settings.ack == "flush":
+            future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((doc, future))
+        except asyncio.QueueFull:
+            raise IngestionUnavailableError("Ingestion queue is full")
+        if future is not None:
+            await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.settings.flush_interval
+            while len(batch) < self.settings.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+        # Anything queued behind the stop sentinel still gets written
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.settings.batch_size):
+            await self._flush(remaining[start:start + self.settings.batch_size])
+
+    async def _flush(self, batch: List[Tuple[dict, Optional[asyncio.Future]]]) -> None:
+        docs = [doc for doc, _ in batch]
+        try:
+            failed = await self.contacts.insert_many(docs)
+            if failed:
+                logger.error("Batched insert wrote %s/%s contact messages", len(docs) - len(failed), len(docs))
+        except Exception as e:
+            failed = {index: e for index in range(len(docs))}
+            logger.error("Batched insert of %s contact messages failed: %s", len(docs), e)
+        for index, (_, future) in enumerate(batch):
+            if future is None or future.done():
+                continue
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(None)
+
+        # After the callers are answered, and guarded: a failing hook must not kill the writer task
+        if self.on_inserted is not None:
+            try:
+                result = self.on_inserted([doc for index, doc in enumerate(docs) if index not in failed])
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error("Post-insert hook failed for %s contact messages: %s", len(docs) - len(failed), e)
@@ -0,0 +1,327 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from pymongo import monitoring
+
+# Latency buckets in seconds, shared by request and database histograms
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# A gauge collector returns (name, help, labels, value) samples at scrape time
+GaugeSample = Tuple[str, str, Dict[str, str], float]
+GaugeCollector = Callable[[], Iterable[GaugeSample]]
+
+
+class Histogram:
+    """Pre-bucketed histogram; `observe` is a bisect plus three increments"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Family:
+    __slots__ = ("name", "help", "kind", "label_names", "series")
+
+    def __init__(self, name: str, help: str, kind: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = label_names
+        self.series: dict = {}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus-style registry for counters and histograms.
+
+    Series are keyed by a tuple of label values and created on first use, so
+    the hot path is a dict lookup and a few integer increments under a lock
+    (database listeners report from driver threads).
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._families: Dict[str, _Family] = {}
+        self._collectors: List[GaugeCollector] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, label_names: Tuple[str, ...] = ()) -> None:
+        self._families[name] = _Family(name, help, "counter", label_names)
+
+    def histogram(self, name: str, help: str, label_names: Tuple[str, ...] = ()) -> None:
+        self._families[name] = _Family(name, help, "histogram", label_names)
+
+    def add_collector(self, collector: GaugeCollector) -> None:
+        """Register a callback that reports gauge samples at scrape time"""
+        self._collectors.append(collector)
+
+    def inc(self, name: str, labels: tuple = (), amount: float = 1) -> None:
+        series = self._families[name].series
+        with self._lock:
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name: str, labels: tuple, value: float) -> None:
+        series = self._families[name].series
+        with self._lock:
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            snapshots = [
+                (family, [(labels, self._copy(value)) for labels, value in family.series.items()])
+                for family in self._families.values()
+            ]
+        for family, series in snapshots:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, value in series:
+                if family.kind == "counter":
+                    label_text = _format_labels(family.label_names, labels)
+                    lines.append(f"{family.name}{label_text} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), value.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    label_text = _format_labels(family.label_names + ("le",), labels + (le,))
+                    lines.append(f"{family.name}_bucket{label_text} {cumulative}")
+                label_text = _format_labels(family.label_names, labels)
+                lines.append(f"{family.name}_sum{label_text} {repr(value.sum)}")
+                lines.append(f"{family.name}_count{label_text} {value.count}")
+
+        seen = set()
+        for collector in self._collectors:
+            for name, help, labels, value in collector():
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# HELP {name} {help}")
+                    lines.append(f"# TYPE {name} gauge")
+                label_text = _format_labels(labels.keys(), labels.values())
+                lines.append(f"{name}{label_text} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _copy(value):
+        if isinstance(value, Histogram):
+            copy = Histogram(value.buckets)
+            copy.counts = list(value.counts)
+            copy.sum = value.sum
+            copy.count = value.count
+            return copy
+        return value
+
+
+def create_registry() -> MetricsRegistry:
+    """Registry with the HTTP and MongoDB metric families used by the API"""
+    registry = MetricsRegistry()
+    registry.counter(
+        "http_requests_total", "HTTP requests by method, route and status code",
+        ("method", "route", "status"),
+    )
+    registry.counter(
+        "http_rate_limited_total", "Requests rejected by the per-IP rate limiter",
+        ("method", "route"),
+    )
+    registry.histogram(
+        "http_request_duration_seconds", "HTTP request latency by method and route",
+        ("method", "route"),
+    )
+    registry.histogram(
+        "mongodb_command_duration_seconds", "MongoDB command latency by collection and command",
+        ("collection", "command", "outcome"),
+    )
+    registry.histogram(
+        "mongodb_pool_checkout_wait_seconds", "Time spent waiting for a pooled MongoDB connection",
+        ("outcome",),
+    )
+    return registry
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count, status and latency per route.
+
+    Routes are labelled by their path template (e.g. `/api/contact/{message_id}`)
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            self.registry.inc("http_requests_total", (method, path, str(status_code)))
+            self.registry.observe("http_request_duration_seconds", (method, path), time.perf_counter() - started)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener recording per-collection, per-command durations"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._collections: dict = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        if len(self._collections) > 10000:
+            # Guard against leaking entries if completion events never arrive
+            self._collections.clear()
+        self._collections[(event.request_id, event.connection_id)] = (
+            collection if isinstance(collection, str) else ""
+        )
+
+    def _record(self, event, outcome: str) -> None:
+        collection = self._collections.pop((event.request_id, event.connection_id), "")
+        self.registry.observe(
+            "mongodb_command_duration_seconds",
+            (collection, event.command_name, outcome),
+            event.duration_micros / 1_000_000,
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._record(event, "ok")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._record(event, "error")
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    pymongo pool listener recording how long operations wait to check out
+    a connection, plus live per-server pool occupancy. Check-out start and
+    finish fire on the same driver thread.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # address -> [open connections, checked out, waiting for checkout]
+        self._pools: Dict[str, List[int]] = {}
+
+    def _adjust(self, event, index: int, delta: int) -> None:
+        address = "%s:%s" % event.address
+        with self._lock:
+            pool = self._pools.setdefault(address, [0, 0, 0])
+            pool[index] = max(pool[index] + delta, 0)
+
+    def pool_stats(self) -> List[dict]:
+        """Open, in-use, available and waiting connection counts per server"""
+        with self._lock:
+            pools = {address: list(counts) for address, counts in self._pools.items()}
+        return [
+            {
+                "address": address,
+                "total": total,
+                "in_use": in_use,
+                "available": max(total - in_use, 0),
+                "wait_queue_depth": waiting,
+            }
+            for address, (total, in_use, waiting) in sorted(pools.items())
+        ]
+
+    def collect(self):
+        """Gauge collector for the metrics registry"""
+        for pool in self.pool_stats():
+            labels = {"address": pool["address"]}
+            yield ("mongodb_pool_connections", "Open pooled MongoDB connections", labels, pool["total"])
+            yield ("mongodb_pool_in_use", "MongoDB connections checked out", labels, pool["in_use"])
+            yield ("mongodb_pool_available", "Idle pooled MongoDB connections", labels, pool["available"])
+            yield ("mongodb_pool_wait_queue_depth", "Operations waiting for a MongoDB connection", labels,
+                   pool["wait_queue_depth"])
+
+    def connection_check_out_started(self, event) -> None:
+        self._local.started = time.perf_counter()
+        self._adjust(event, 2, 1)
+
+    def _record_wait(self, outcome: str) -> None:
+        started = getattr(self._local, "started", None)
+        if started is None:
+            return
+        self._local.started = None
+        self.registry.observe("mongodb_pool_checkout_wait_seconds", (outcome,), time.perf_counter() - started)
+
+    def connection_checked_out(self, event) -> None:
+        self._record_wait("ok")
+        self._adjust(event, 2, -1)
+        self._adjust(event, 1, 1)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._record_wait("failed")
+        self._adjust(event, 2, -1)
+
+    def connection_checked_in(self, event) -> None:
+        self._adjust(event, 1, -1)
+
+    def connection_created(self, event) -> None:
+        self._adjust(event, 0, 1)
+
+    def connection_closed(self, event) -> None:
+        self._adjust(event, 0, -1)
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        with self._lock:
+            self._pools.pop("%s:%s" % event.address, None)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
@@ -0,0 +1,418 @@
+import asyncio
+import logging
+import os
+import random
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from repositories.base import MESSAGE_LIST_FIELDS, NotificationOutboxRepository
+from utils.env import env_float, env_int, env_str
+from utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Contact message fields carried in a notification: the list view plus the text itself
+NOTIFICATION_FIELDS = MESSAGE_LIST_FIELDS + ["message"]
+
+# SES errors that will fail again however often they are retried
+SES_PERMANENT_ERRORS = frozenset({"MessageRejected", "MailFromDomainNotVerifiedException", "InvalidParameterValue"})
+
+
+def _split(value: str) -> Tuple[str, ...]:
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+@dataclass(frozen=True)
+class NotificationSettings:
+    """
+    Notifications about new contact messages. `channels` lists the
+    transports to use ("ses", "webhook", "stub"); none disables them. In
+    "digest" mode, messages are collected and sent together every
+    `digest_seconds` instead of one notification per message.
+    """
+    channels: Tuple[str, ...] = ()
+    mode: str = "immediate"  # "immediate" or "digest"
+    digest_seconds: float = 300.0
+    concurrency: int = 4  # deliveries in flight per worker
+    batch_size: int = 50  # outbox entries claimed per round; also the largest digest
+    max_attempts: int = 8
+    backoff_seconds: float = 5.0  # first retry delay, doubled per attempt
+    max_backoff_seconds: float = 3600.0
+    timeout_seconds: float = 10.0  # per delivery
+    poll_seconds: float = 30.0  # how often retries and other workers' entries are picked up
+    lease_seconds: float = 300.0  # claimed entries come due again after this if the worker dies
+    max_buffered: int = 10000  # entries held in memory while the outbox cannot be written; oldest dropped
+    email_from: str = ""
+    email_to: Tuple[str, ...] = ()
+    aws_region: Optional[str] = None
+    webhook_urls: Tuple[str, ...] = ()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.channels)
+
+    @classmethod
+    def from_env(cls) -> "NotificationSettings":
+        return cls(
+            channels=_split(env_str("NOTIFY_CHANNELS", "")),
+            mode=env_str("NOTIFY_MODE", cls.mode),
+            digest_seconds=env_float("NOTIFY_DIGEST_SECONDS", cls.digest_seconds),
+            concurrency=env_int("NOTIFY_CONCURRENCY", cls.concurrency),
+            batch_size=env_int("NOTIFY_BATCH_SIZE", cls.batch_size),
+            max_attempts=env_int("NOTIFY_MAX_ATTEMPTS", cls.max_attempts),
+            backoff_seconds=env_float("NOTIFY_BACKOFF_SECONDS", cls.backoff_seconds),
+            max_backoff_seconds=env_float("NOTIFY_MAX_BACKOFF_SECONDS", cls.max_backoff_seconds),
+            timeout_seconds=env_float("NOTIFY_TIMEOUT_SECONDS", cls.timeout_seconds),
+            poll_seconds=env_float("NOTIFY_POLL_SECONDS", cls.poll_seconds),
+            lease_seconds=env_float("NOTIFY_LEASE_SECONDS", cls.lease_seconds),
+            max_buffered=env_int("NOTIFY_MAX_BUFFERED", cls.max_buffered),
+            # Addresses, URLs and regions keep their case
+            email_from=os.environ.get("NOTIFY_EMAIL_FROM", "").strip(),
+            email_to=_split(os.environ.get("NOTIFY_EMAIL_TO", "")),
+            aws_region=os.environ.get("AWS_REGION") or None,
+            webhook_urls=_split(os.environ.get("NOTIFY_WEBHOOK_URLS", "")),
+        )
+
+
+class DeliveryError(Exception):
+    """A failed delivery; `retryable=False` gives up on the entries at once"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def render_text(messages: List[dict]) -> Tuple[str, str]:
+    """(subject, plain text body) for one message or a digest of several"""
+    if len(messages) == 1:
+        message = messages[0]
+        subject = f"New contact message: {message['subject']}"
+    else:
+        subject = f"{len(messages)} new contact messages"
+    blocks = [
+        f"From: {message['name']} <{message['email']}>\n"
+        f"Subject: {message['subject']}\n"
+        f"Received: {message['timestamp']}\n\n"
+        f"{message['message']}"
+        for message in messages
+    ]
+    return subject, "\n\n---\n\n".join(blocks)
+
+
+class Transport(ABC):
+    """Delivers a list of messages (one, or a digest) to one target of a channel"""
+
+    name: str
+
+    def targets(self) -> List[str]:
+        return [self.name]
+
+    @abstractmethod
+    async def deliver(self, target: str, messages: List[dict]) -> None:
+        """Send `messages` to `target`; raise DeliveryError when it fails"""
+
+    async def close(self) -> None:
+        pass
+
+
+class StubTransport(Transport):
+    """
+    Network-free transport for development and tests: logs each delivery
+    and keeps the most recent ones in `sent`. `fail_first` makes that many
+    deliveries fail first, to exercise retries.
+    """
+
+    name = "stub"
+
+    def __init__(self, keep: int = 100, fail_first: int = 0):
+        self.sent: Deque[Tuple[str, List[dict]]] = deque(maxlen=keep)
+        self.fail_first = fail_first
+
+    async def deliver(self, target: str, messages: List[dict]) -> None:
+        if self.fail_first > 0:
+            self.fail_first -= 1
+            raise DeliveryError("stub failure")
+        self.sent.append((target, messages))
+        subject, _ = render_text(messages)
+        logger.info("Notification (stub): %s", subject)
+
+
+class WebhookTransport(Transport):
+    """
+    POSTs `{"event": "contact_messages.created", "messages": [...]}` to each
+    configured URL. 4xx responses (other than 408 and 429) are not retried.
+    """
+
+    name = "webhook"
+
+    def __init__(self, urls: Iterable[str], timeout: float):
+        self.urls = list(urls)
+        self.client = httpx.AsyncClient(timeout=timeout, headers={"Content-Type": "application/json"})
+
+    def targets(self) -> List[str]:
+        return self.urls
+
+    async def deliver(self, target: str, messages: List[dict]) -> None:
+        body = dumps({"event": "contact_messages.created", "messages": messages})
+        try:
+            response = await self.client.post(target, content=body)
+        except httpx.HTTPError as e:
+            raise DeliveryError(f"{type(e).__name__}: {str(e)}")
+        if response.status_code >= 400:
+            retryable = response.status_code >= 500 or response.status_code in (408, 429)
+            raise DeliveryError(f"HTTP {response.status_code}", retryable=retryable)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class SESTransport(Transport):
+    """Email through Amazon SES; boto3 calls block, so they run in a worker thread"""
+
+    name = "ses"
+
+    def __init__(self, sender: str, recipients: Iterable[str], region: Optional[str]):
+        import boto3
+
+        self.sender = sender
+        self.recipients = list(recipients)
+        self.client = boto3.client("ses", region_name=region)
+
+    def targets(self) -> List[str]:
+        return [",".join(self.recipients)]
+
+    async def deliver(self, target: str, messages: List[dict]) -> None:
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        subject, text = render_text(messages)
+        try:
+            await asyncio.to_thread(
+                self.client.send_email,
+                Source=self.sender,
+                Destination={"ToAddresses": target.split(",")},
+                Message={"Subject": {"Data": subject}, "Body": {"Text": {"Data": text}}},
+                # Replying to a single message goes straight to its sender
+                ReplyToAddresses=[messages[0]["email"]] if len(messages) == 1 else [],
+            )
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code", "")
+            raise DeliveryError(f"SES {code}: {str(e)}", retryable=code not in SES_PERMANENT_ERRORS)
+        except BotoCoreError as e:
+            raise DeliveryError(f"SES: {str(e)}")
+
+
+def build_transports(settings: NotificationSettings) -> Dict[str, Transport]:
+    """Transports for the configured channels; misconfigured ones are skipped with a warning"""
+    transports = {}
+    for channel in settings.channels:
+        try:
+            if channel == "stub":
+                transports[channel] = StubTransport()
+            elif channel == "webhook":
+                if not settings.webhook_urls:
+                    raise ValueError("NOTIFY_WEBHOOK_URLS is empty")
+                transports[channel] = WebhookTransport(settings.webhook_urls, settings.timeout_seconds)
+            elif channel == "ses":
+                if not settings.email_from or not settings.email_to:
+                    raise ValueError("NOTIFY_EMAIL_FROM and NOTIFY_EMAIL_TO are required")
+                transports[channel] = SESTransport(settings.email_from, settings.email_to, settings.aws_region)
+            else:
+                raise ValueError("unknown channel")
+        except Exception as e:
+            logger.warning("Notification channel %r disabled: %s", channel, e)
+    return transports
+
+
+class Notifier:
+    """
+    Background delivery of new-message notifications through a persisted
+    outbox.
+
+    `submit` writes the outbox entries right after the message is stored,
+    so a crash or restart loses nothing; the request never waits on the
+    network. The worker claims due entries and delivers them with at most
+    `concurrency` in flight. If the outbox write fails, the entries are held
+    in memory (at most `max_buffered`, oldest dropped and logged) and the
+    worker retries the write each round. Failed
+    deliveries are retried with exponential backoff and jitter until
+    `max_attempts`, then left in the outbox as "failed". Entries are claimed
+    with a lease, so with several workers (or after a crash) each entry is
+    delivered by one worker, at least once. `stop` makes a last attempt to
+    write what is still held.
+    """
+
+    def __init__(
+        self,
+        outbox: NotificationOutboxRepository,
+        settings: NotificationSettings,
+        transports: Dict[str, Transport],
+    ):
+        self.outbox = outbox
+        self.settings = settings
+        self.transports = transports
+        self._buffer: List[dict] = []
+        self._wake = asyncio.Event()
+        self._slots = asyncio.Semaphore(max(settings.concurrency, 1))
+        self._task: Optional[asyncio.Task] = None
+        self._last_delivery = time.monotonic()
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+        self.dropped = 0
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    async def submit(self, docs: Iterable[dict]) -> None:
+        """
+        Write notifications for newly stored messages to the outbox. Never
+        raises: when the outbox cannot be written, they are held for the
+        worker to retry.
+        """
+        entries = self._entries(docs)
+        if not entries:
+            return
+        try:
+            await self.outbox.enqueue(entries)
+        except Exception as e:
+            logger.error("Could not write %s notifications to the outbox, retrying later: %s", len(entries), e)
+            self._hold(entries)
+        self._wake.set()
+
+    def _entries(self, docs: Iterable[dict]) -> List[dict]:
+        now = datetime.utcnow()
+        entries = []
+        for doc in docs:
+            message = {field: doc.get(field) for field in NOTIFICATION_FIELDS}
+            if isinstance(message["timestamp"], datetime):
+                message["timestamp"] = message["timestamp"].isoformat()
+            for channel, transport in self.transports.items():
+                for target in transport.targets():
+                    entries.append({
+                        "id": str(uuid.uuid4()), "channel": channel, "target": target, "message": message,
+                        "status": "pending", "attempts": 0, "next_attempt_at": now, "created_at": now,
+                    })
+        return entries
+
+    def _hold(self, entries: List[dict]) -> None:
+        """Keep entries for the next outbox write, dropping the oldest beyond `max_buffered`"""
+        self._buffer.extend(entries)
+        overflow = len(self._buffer) - max(self.settings.max_buffered, 0)
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            logger.error("Dropped %s notifications: the outbox is unavailable and the buffer is full", overflow)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="notifications")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._persist()
+        for transport in self.transports.values():
+            await transport.close()
+
+    async def _run(self) -> None:
+        digest = self.settings.mode == "digest"
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.settings.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self._persist()
+                if digest and time.monotonic() - self._last_delivery < self.settings.digest_seconds:
+                    continue
+                self._last_delivery = time.monotonic()
+                await self.deliver_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Notification round failed: %s", e)
+                await asyncio.sleep(1.0)
+
+    async def _persist(self) -> None:
+        if not self._buffer:
+            return
+        entries, self._buffer = self._buffer, []
+        try:
+            await self.outbox.enqueue(entries)
+        except Exception:
+            # Keep them for the next round, ahead of anything held since
+            newer, self._buffer = self._buffer, []
+            self._hold(entries + newer)
+            raise
+
+    async def deliver_due(self) -> int:
+        """Deliver everything due now; returns the number of entries attempted"""
+        attempted = 0
+        while True:
+            now = datetime.utcnow()
+            entries = await self.outbox.claim_due(
+                now, now + timedelta(seconds=self.settings.lease_seconds), self.settings.batch_size
+            )
+            if not entries:
+                return attempted
+            attempted += len(entries)
+            await asyncio.gather(*(self._deliver(group) for group in self._groups(entries)))
+            if len(entries) < self.settings.batch_size:
+                return attempted
+
+    def _groups(self, entries: List[dict]) -> List[List[dict]]:
+        """One delivery per entry, or per channel and target in digest mode"""
+        if self.settings.mode != "digest":
+            return [[entry] for entry in entries]
+        groups: Dict[Tuple[str, str], List[dict]] = {}
+        for entry in entries:
+            groups.setdefault((entry["channel"], entry["target"]), []).append(entry)
+        return list(groups.values())
+
+    async def _deliver(self, entries: List[dict]) -> None:
+        channel, target = entries[0]["channel"], entries[0]["target"]
+        transport = self.transports.get(channel)
+        async with self._slots:
+            try:
+                if transport is None:
+                    raise DeliveryError(f"channel {channel!r} is not configured in this worker")
+                await asyncio.wait_for(
+                    transport.deliver(target, [entry["message"] for entry in entries]), self.settings.timeout_seconds
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._failed(entries, e)
+                return
+        await self.outbox.delete([entry["id"] for entry in entries])
+        self.delivered += len(entries)
+
+    async def _failed(self, entries: List[dict], error: Exception) -> None:
+        retryable = getattr(error, "retryable", True)
+        message = str(error) or type(error).__name__
+        for entry in entries:
+            attempts = entry["attempts"] + 1
+            next_attempt_at = None
+            if retryable and attempts < self.settings.max_attempts:
+                delay = min(self.settings.backoff_seconds * 2 ** (attempts - 1), self.settings.max_backoff_seconds)
+                next_attempt_at = datetime.utcnow() + timedelta(seconds=delay * random.uniform(0.5, 1.0))
+                self.retried += 1
+            else:
+                self.failed += 1
+            await self.outbox.record_failure(entry["id"], attempts, message, next_attempt_at)
+        logger.warning(
+            "Notification via %s failed (attempt %s): %s", entries[0]["channel"], entries[0]["attempts"] + 1, message
+        )
@@ -0,0 +1,207 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from utils.env import env_float, env_str
+from utils.serialization import dumps
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Collection holding one document per section: {"_id": <section>, "data": <content>}
+PORTFOLIO_COLLECTION = "portfolio_content"
+
+# Snapshot key of the whole portfolio (GET /api/portfolio)
+ALL_SECTIONS = ""
+
+
+@dataclass(frozen=True)
+class PortfolioSettings:
+    """
+    Portfolio content (skills, experience, projects, ...) served by
+    /api/portfolio. It is read from a JSON file or the portfolio_content
+    collection, checked for changes every `reload_seconds` (0 loads it once).
+    """
+    source: str = "file"  # "file" or "mongo"
+    path: str = "portfolio.json"  # relative to the backend directory
+    reload_seconds: float = 5.0
+    max_age_seconds: float = 0.0  # browser cache lifetime; 0 revalidates every time (cheap: a 304)
+
+    @classmethod
+    def from_env(cls) -> "PortfolioSettings":
+        return cls(
+            source=env_str("PORTFOLIO_SOURCE", cls.source),
+            path=os.environ.get("PORTFOLIO_PATH") or cls.path,
+            reload_seconds=env_float("PORTFOLIO_RELOAD_SECONDS", cls.reload_seconds),
+            max_age_seconds=env_float("PORTFOLIO_MAX_AGE_SECONDS", cls.max_age_seconds),
+        )
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    """
+    One response, ready to write: JSON bytes, precompressed variants and
+    their strong ETags. Each variant has its own tag (`"<hash>"`,
+    `"<hash>-gzip"`, `"<hash>-br"`), since strong validators must differ
+    for different bytes.
+    """
+    body: bytes
+    encoded: Mapping[str, bytes]  # content coding -> bytes, only where smaller than `body`
+    etag: str  # of the identity body
+    etags: Mapping[Optional[str], str]  # content coding (None for identity) -> ETag
+
+
+def _entry(content) -> SnapshotEntry:
+    body = dumps(content)
+    encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body, quality=11)
+    encoded = {coding: data for coding, data in encoded.items() if len(data) < len(body)}
+    # Derived from the content alone, so every worker and restart agrees on it
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    etags = {None: f'"{digest}"'}
+    etags.update((coding, f'"{digest}-{coding}"') for coding in encoded)
+    return SnapshotEntry(
+        body=body, encoded=MappingProxyType(encoded), etag=etags[None], etags=MappingProxyType(etags)
+    )
+
+
+@dataclass(frozen=True)
+class PortfolioSnapshot:
+    """Immutable content for every portfolio endpoint, keyed by section (ALL_SECTIONS for all of them)"""
+    entries: Mapping[str, SnapshotEntry] = field(default_factory=lambda: MappingProxyType({}))
+    loaded_at: Optional[datetime] = None
+
+    @property
+    def etag(self) -> Optional[str]:
+        entry = self.entries.get(ALL_SECTIONS)
+        return entry.etag if entry is not None else None
+
+    @classmethod
+    def build(cls, content: dict) -> "PortfolioSnapshot":
+        """Serialize and compress everything up front (runs off the event loop)"""
+        if not isinstance(content, dict):
+            raise ValueError("portfolio content must be a JSON object of sections")
+        entries = {ALL_SECTIONS: _entry(content)}
+        entries.update((section, _entry(data)) for section, data in content.items())
+        return cls(MappingProxyType(entries), datetime.utcnow())
+
+
+class FilePortfolioSource:
+    """Content from a JSON file; unchanged files (same mtime and size) are not re-read"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._stamp: Optional[Tuple[int, int]] = None
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+    async def load(self) -> Optional[dict]:
+        """The content, or None when it has not changed since the last load"""
+        def read():
+            stat = self.path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if stamp == self._stamp:
+                return None
+            # Recorded before parsing, so a broken file is reported once rather than on every check
+            self._stamp = stamp
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+
+        return await asyncio.to_thread(read)
+
+
+class MongoPortfolioSource:
+    """
+    Content from the portfolio_content collection (small: one document per
+    section). Each check reads it all; unchanged content is not rebuilt.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection):
+        self.collection = collection
+        self._digest: Optional[bytes] = None
+
+    def __str__(self) -> str:
+        return f"mongo:{self.collection.name}"
+
+    async def load(self) -> Optional[dict]:
+        """The content, or None when it is empty or has not changed since the last load"""
+        docs = await self.collection.find({}).sort("_id", 1).to_list(length=None)
+        if not docs:
+            return None
+        content = {doc["_id"]: doc.get("data") for doc in docs}
+        digest = hashlib.blake2b(dumps(content), digest_size=16).digest()
+        if digest == self._digest:
+            return None
+        self._digest = digest
+        return content
+
+
+class PortfolioContent:
+    """
+    Holds the current snapshot and swaps in a new one when the source
+    changes. The swap is a single attribute assignment, so a request sees
+    either the old snapshot or the new one, never a mix. A source that
+    fails to load or parse keeps the previous snapshot in place.
+    """
+
+    def __init__(self, source, settings: PortfolioSettings):
+        self.source = source
+        self.settings = settings
+        self.snapshot = PortfolioSnapshot()
+        self.reloads = 0
+        self.errors = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def reload(self) -> bool:
+        """Load the source and swap the snapshot if the content changed; returns whether it did"""
+        try:
+            content = await self.source.load()
+            if content is None:
+                return False
+            snapshot = await asyncio.to_thread(PortfolioSnapshot.build, content)
+        except FileNotFoundError:
+            return False  # not provided (yet); reported once at startup
+        except Exception as e:
+            self.errors += 1
+            logger.error("Portfolio content from %s not loaded: %s", self.source, e)
+            return False
+        if snapshot.etag == self.snapshot.etag:
+            return False
+        self.snapshot = snapshot
+        self.reloads += 1
+        logger.info("✓ Portfolio content loaded from %s (%s sections)", self.source, len(snapshot.entries) - 1)
+        return True
+
+    def start(self) -> None:
+        if self.settings.reload_seconds > 0:
+            self._task = asyncio.create_task(self._run(), name="portfolio-reload")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.reload_seconds)
+            await self.reload()
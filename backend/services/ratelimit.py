@@ -0,0 +1,205 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from services.idempotency import REPLAYED_HEADER
+from utils.env import env_bool, env_float, env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitSettings:
+    """
+    Per-client-IP limits for write endpoints; off unless RATE_LIMIT_ENABLED
+    is set. Only accepted requests (status below 400) use up the budget, so
+    validation errors and retries after a 5xx are free. Behind a reverse
+    proxy, set TRUST_PROXY_HEADERS so clients are told apart by
+    X-Forwarded-For rather than all sharing the proxy's address.
+    """
+    enabled: bool = False
+    per_minute: float = 5.0  # sustained accepted requests per minute per IP
+    burst: int = 5  # accepted requests allowed back to back
+    backend: str = "memory"  # "memory" (per worker) or "mongo" (shared by all workers)
+    max_clients: int = 100000  # IPs tracked in memory before the oldest are dropped
+    trust_proxy: bool = False  # key on the first X-Forwarded-For address
+
+    @classmethod
+    def from_env(cls) -> "RateLimitSettings":
+        return cls(
+            enabled=env_bool("RATE_LIMIT_ENABLED", cls.enabled),
+            per_minute=env_float("RATE_LIMIT_PER_MINUTE", cls.per_minute),
+            burst=env_int("RATE_LIMIT_BURST", cls.burst),
+            backend=env_str("RATE_LIMIT_BACKEND", cls.backend),
+            max_clients=env_int("RATE_LIMIT_MAX_CLIENTS", cls.max_clients),
+            trust_proxy=env_bool("TRUST_PROXY_HEADERS", cls.trust_proxy),
+        )
+
+
+class TokenBucketLimiter:
+    """
+    In-memory token bucket per key. Each key refills at `per_minute / 60`
+    tokens per second up to `burst`; the least recently seen keys are
+    dropped once `max_clients` are tracked.
+    """
+
+    def __init__(self, settings: RateLimitSettings):
+        self.rate = settings.per_minute / 60
+        self.burst = settings.burst
+        self.max_clients = settings.max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def _bucket(self, key: str) -> list:
+        """[tokens, last refill] for `key`, refilled up to now"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            tokens, last = bucket
+            bucket[0] = min(self.burst, tokens + (now - last) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    async def check(self, key: str) -> Tuple[bool, float]:
+        """Return (allowed, seconds until the next request would be allowed) without using any budget"""
+        tokens = self._bucket(key)[0]
+        if tokens >= 1:
+            return True, 0.0
+        return False, (1 - tokens) / self.rate if self.rate > 0 else 60.0
+
+    async def consume(self, key: str) -> None:
+        """Charge one accepted request to `key`"""
+        bucket = self._bucket(key)
+        bucket[0] = max(bucket[0] - 1, 0.0)
+
+
+class MongoWindowLimiter:
+    """
+    Fixed-window counter stored in MongoDB so every worker shares one budget
+    per IP. Window documents expire through a TTL index on `expires_at`.
+    Costs a read per checked request and a write per accepted one.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection, settings: RateLimitSettings):
+        self.collection = collection
+        self.window = 60.0
+        self.limit = max(int(settings.per_minute), 1)
+
+    def _window(self) -> Tuple[float, float]:
+        now = time.time()
+        return now, now - now % self.window
+
+    async def check(self, key: str) -> Tuple[bool, float]:
+        now, window_start = self._window()
+        doc = await self.collection.find_one({"_id": f"{key}:{int(window_start)}"}, {"count": 1})
+        if doc is None or doc["count"] < self.limit:
+            return True, 0.0
+        return False, window_start + self.window - now
+
+    async def consume(self, key: str) -> None:
+        _, window_start = self._window()
+        await self.collection.update_one(
+            {"_id": f"{key}:{int(window_start)}"},
+            {
+                "$inc": {"count": 1},
+                "$setOnInsert": {
+                    "expires_at": datetime.fromtimestamp(window_start, timezone.utc) + timedelta(seconds=self.window)
+                },
+            },
+            upsert=True,
+        )
+
+
+def client_ip(scope, trust_proxy: bool) -> str:
+    """Client address for an ASGI scope, optionally taken from X-Forwarded-For"""
+    if trust_proxy:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying `app.state.rate_limiter` to selected routes.
+
+    Runs before routing, so rejected requests never have their body read or
+    validated and never reach the database (unless the limiter itself is the
+    shared Mongo backend). The budget is charged once the response status is
+    known, and only for accepted requests (below 400, replays of an
+    Idempotency-Key excluded). Concurrent requests
+    from one client can therefore overshoot the budget by the number in
+    flight.
+    """
+
+    def __init__(self, app, routes: Iterable[Tuple[str, str]], trust_proxy: bool = False):
+        self.app = app
+        self.routes = frozenset(routes)
+        self.trust_proxy = trust_proxy
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"].rstrip("/")) not in self.routes:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = scope["app"].state.rate_limiter
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = client_ip(scope, self.trust_proxy)
+        try:
+            allowed, retry_after = await limiter.check(key)
+        except Exception as e:
+            # Fail open: a broken shared store must not take the endpoint down
+            logger.error("Rate limiter error: %s", e)
+            allowed, retry_after = True, 0.0
+        if not allowed:
+            metrics = getattr(scope["app"].state, "metrics", None)
+            if metrics is not None:
+                metrics.inc("http_rate_limited_total", (scope["method"], scope["path"]))
+            await self._reject(send, retry_after)
+            return
+
+        charge = False
+
+        async def send_tracking(message):
+            nonlocal charge
+            if message["type"] == "http.response.start":
+                # Replays of an idempotent request were already charged the first time
+                charge = message["status"] < 400 and not any(
+                    name == REPLAYED_HEADER for name, _ in message.get("headers", [])
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_tracking)
+        if charge:
+            try:
+                await limiter.consume(key)
+            except Exception as e:
+                logger.error("Rate limiter error: %s", e)
+
+    @staticmethod
+    async def _reject(send, retry_after: float) -> None:
+        body = json.dumps({"detail": "Too many requests, please try again later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(int(retry_after + 0.999), 1)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,311 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING
+
+from migrations import acquire_lock, release_lock
+from repositories.base import ContactRepository, DuplicateMessageError, Storage
+from utils.env import env_float, env_int
+from utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+STATUS_CHECK_TTL_INDEX = "status_checks_ttl"
+
+# Lock document in the migrations collection, so one worker archives at a time
+ARCHIVE_LOCK_ID = "archive_lock"
+
+ARCHIVE_SUFFIX = ".ndjson.gz"
+
+
+@dataclass(frozen=True)
+class RetentionSettings:
+    """
+    How long data is kept. Zero disables each rule. Contact messages past
+    their retention are moved into gzip NDJSON files under `archive_dir`,
+    one directory per message day, and can be restored with
+    `python manage.py restore-archive`.
+
+    Archiving deletes the messages from storage, so they also leave the
+    contact stats (the rollups are decremented like any delete, and
+    `manage.py rebuild-stats` only counts stored messages). Restoring them
+    counts them again. Stats therefore describe the messages currently
+    stored, not everything ever received.
+    """
+    status_check_days: int = 0
+    archive_after_days: int = 0
+    archive_handled_after_days: int = 0  # messages with status "archived" may go sooner
+    archive_dir: str = "archive"
+    batch_size: int = 1000
+    interval_hours: float = 0.0  # run inside the server; 0 leaves it to `manage.py archive`
+
+    @property
+    def archiving(self) -> bool:
+        return self.archive_after_days > 0 or self.archive_handled_after_days > 0
+
+    @classmethod
+    def from_env(cls) -> "RetentionSettings":
+        return cls(
+            status_check_days=env_int("STATUS_CHECK_RETENTION_DAYS", cls.status_check_days),
+            archive_after_days=env_int("CONTACT_ARCHIVE_AFTER_DAYS", cls.archive_after_days),
+            archive_handled_after_days=env_int("CONTACT_ARCHIVE_HANDLED_AFTER_DAYS", cls.archive_handled_after_days),
+            archive_dir=os.environ.get("CONTACT_ARCHIVE_DIR") or cls.archive_dir,
+            batch_size=env_int("CONTACT_ARCHIVE_BATCH_SIZE", cls.batch_size),
+            interval_hours=env_float("RETENTION_INTERVAL_HOURS", cls.interval_hours),
+        )
+
+
+async def ensure_status_check_ttl(db: AsyncIOMotorDatabase, days: int) -> None:
+    """
+    Create, resize or drop the status_checks TTL index to match `days`.
+    Checking costs one listIndexes, so every worker can call it on startup.
+    """
+    expire_after = days * 24 * 3600
+    existing = (await db.status_checks.index_information()).get(STATUS_CHECK_TTL_INDEX)
+    if days <= 0:
+        if existing is not None:
+            await db.status_checks.drop_index(STATUS_CHECK_TTL_INDEX)
+            logger.info("✓ Status check TTL index dropped")
+        return
+    if existing is None:
+        await db.status_checks.create_index(
+            [("timestamp", ASCENDING)], name=STATUS_CHECK_TTL_INDEX, expireAfterSeconds=expire_after
+        )
+        logger.info("✓ Status checks expire after %s days", days)
+    elif existing.get("expireAfterSeconds") != expire_after:
+        await db.command(
+            "collMod", "status_checks", index={"name": STATUS_CHECK_TTL_INDEX, "expireAfterSeconds": expire_after}
+        )
+        logger.info("✓ Status check TTL changed to %s days", days)
+
+
+class _DayFiles:
+    """
+    Writes archived messages to <dir>/dt=<day>/part-<run>.ndjson.gz. Input
+    arrives oldest first, so only the current day's file is open at a time.
+    """
+
+    def __init__(self, directory: Path, run_id: str):
+        self.directory = directory
+        self.run_id = run_id
+        self.day: Optional[str] = None
+        self.file = None
+        self.paths: List[Path] = []
+
+    def write_batch(self, docs: List[dict]) -> None:
+        """Append `docs` and sync them (blocking: compression and disk writes; run in a thread)"""
+        for doc in docs:
+            self.write(doc)
+        self.sync()
+
+    def write(self, doc: dict) -> None:
+        day = doc["timestamp"].strftime("%Y-%m-%d")
+        if day != self.day:
+            self.close()
+            path = self.directory / f"dt={day}" / f"part-{self.run_id}{ARCHIVE_SUFFIX}"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = gzip.open(path, "ab")
+            self.day = day
+            self.paths.append(path)
+        self.file.write(dumps(doc) + b"\n")
+
+    def sync(self) -> None:
+        """Make everything written so far durable and readable, before the source rows are deleted"""
+        if self.file is not None:
+            self.file.flush()
+            self.file.fileobj.flush()
+            os.fsync(self.file.fileobj.fileno())
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+
+async def archive_contacts(
+    contacts: ContactRepository,
+    settings: RetentionSettings,
+    now: Optional[datetime] = None,
+    on_archived: Optional[Callable[[List[str]], None]] = None,
+) -> Tuple[int, List[Path]]:
+    """
+    Move expired contact messages into the archive, one batch at a time:
+    read the oldest `batch_size`, append them to their day files, sync, then
+    delete them (which takes them out of the stats; see RetentionSettings).
+    Compression and file writes run in a worker thread, off the event loop.
+    Memory use is one batch
+    regardless of collection size. A crash between sync and delete leaves
+    rows in both places; restoring skips the duplicates.
+    Returns the number of messages moved and the files written.
+    """
+    now = now or datetime.utcnow()
+    before = now - timedelta(days=settings.archive_after_days) if settings.archive_after_days > 0 else datetime.min
+    handled_before = (
+        now - timedelta(days=settings.archive_handled_after_days) if settings.archive_handled_after_days > 0 else None
+    )
+    run_id = f"{now.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    files = _DayFiles(Path(settings.archive_dir) / "contact_messages", run_id)
+    archived = 0
+    try:
+        while True:
+            batch = await contacts.list_expired(before, handled_before, settings.batch_size)
+            if not batch:
+                break
+            await asyncio.to_thread(files.write_batch, batch)
+            deleted = await contacts.delete_many({doc["id"]: doc for doc in batch})
+            archived += deleted
+            if on_archived is not None:
+                on_archived([doc["id"] for doc in batch])
+            if deleted < len(batch):
+                # Rows vanished between read and delete; avoid spinning on the same batch
+                logger.warning("Archived batch deleted %s/%s messages", deleted, len(batch))
+                break
+    finally:
+        await asyncio.to_thread(files.close)
+    if archived:
+        logger.info("Archived %s contact messages into %s files", archived, len(files.paths))
+    return archived, files.paths
+
+
+def archive_paths(paths: Iterable[str]) -> List[Path]:
+    """Archive files named directly or found under the given directories, oldest day first"""
+    found = []
+    for name in paths:
+        path = Path(name)
+        found.extend(sorted(path.rglob(f"*{ARCHIVE_SUFFIX}")) if path.is_dir() else [path])
+    return found
+
+
+async def _read_archive(path: Path, batch_size: int) -> AsyncIterator[List[dict]]:
+    """Documents from one archive file in batches; a truncated tail (crash mid-write) is skipped"""
+    def read_batches():
+        batches, batch = [], []
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as lines:
+                for line in lines:
+                    if line.strip():
+                        batch.append(json.loads(line))
+                    if len(batch) >= batch_size:
+                        batches.append(batch)
+                        batch = []
+                        if len(batches) >= 4:
+                            yield batches
+                            batches = []
+        except (EOFError, json.JSONDecodeError) as e:
+            logger.warning("Archive %s is truncated, restoring what precedes the damage: %s", path, e)
+        if batch:
+            batches.append(batch)
+        yield batches
+
+    reader = read_batches()
+    while True:
+        batches = await asyncio.to_thread(next, reader, None)
+        if batches is None:
+            return
+        for batch in batches:
+            yield batch
+
+
+async def restore_archive(contacts: ContactRepository, paths: Iterable[str], batch_size: int = 1000) -> Tuple[int, int]:
+    """
+    Insert archived messages back into storage. Messages whose id is still
+    stored are skipped, so restoring twice (or after a partial archive run)
+    is safe. Returns (restored, skipped).
+    """
+    restored = skipped = 0
+    for path in archive_paths(paths):
+        async for batch in _read_archive(path, batch_size):
+            for doc in batch:
+                doc["timestamp"] = datetime.fromisoformat(doc["timestamp"])
+            errors = await contacts.insert_many(batch)
+            duplicates = sum(isinstance(error, DuplicateMessageError) for error in errors.values())
+            if len(errors) > duplicates:
+                raise next(error for error in errors.values() if not isinstance(error, DuplicateMessageError))
+            restored += len(batch) - duplicates
+            skipped += duplicates
+        logger.info("Restored %s", path)
+    return restored, skipped
+
+
+class RetentionJob:
+    """
+    Periodic retention inside the server: archive expired contact messages
+    and, for backends without TTL indexes, delete expired status checks.
+    With MongoDB, a lease in the migrations collection keeps concurrent
+    workers from archiving the same rows.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        settings: RetentionSettings,
+        db: Optional[AsyncIOMotorDatabase] = None,
+        on_archived: Optional[Callable[[List[str]], None]] = None,
+        on_expired: Optional[Callable[[], None]] = None,
+    ):
+        self.storage = storage
+        self.settings = settings
+        self.db = db
+        self.on_archived = on_archived
+        self.on_expired = on_expired
+        self._task: Optional[asyncio.Task] = None
+        self.archived = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="retention")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                logger.error("Retention run failed: %s", e)
+            await asyncio.sleep(self.settings.interval_hours * 3600)
+
+    async def run_once(self) -> None:
+        settings = self.settings
+        if settings.status_check_days > 0:
+            if self.db is None:
+                cutoff = datetime.utcnow() - timedelta(days=settings.status_check_days)
+                expired = await self.storage.status_checks.delete_before(cutoff)
+                if expired:
+                    logger.info("Deleted %s expired status checks", expired)
+            # TTL deletes happen outside the request path; let list ETags move on
+            if self.on_expired is not None:
+                self.on_expired()
+        if not settings.archiving:
+            return
+        if self.db is None:
+            self.archived += (await archive_contacts(self.storage.contacts, settings, on_archived=self.on_archived))[0]
+            return
+        owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        if not await acquire_lock(self.db, owner, 3600, lock_id=ARCHIVE_LOCK_ID):
+            return
+        try:
+            self.archived += (await archive_contacts(self.storage.contacts, settings, on_archived=self.on_archived))[0]
+        finally:
+            await release_lock(self.db, owner, lock_id=ARCHIVE_LOCK_ID)
@@ -0,0 +1,164 @@
+import html
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.pagination import (
+    KEYSET_SORT,
+    decode_score_cursor,
+    encode_cursor,
+    encode_score_cursor,
+    keyset_filter,
+)
+
+# Fields covered by the text index, with their relevance weights
+SEARCH_WEIGHTS = {"subject": 5, "name": 3, "message": 1}
+
+# Characters of context kept around the first match in long fields
+SNIPPET_CONTEXT = 80
+
+_TERM_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def parse_query(query: str) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Split a Mongo $text query string into (words, phrases, excluded words).
+    A document matches if it contains any of the words (or there are none),
+    every phrase and none of the excluded words.
+    """
+    words, phrases, excluded = [], [], []
+    for phrase, word in _TERM_PATTERN.findall(query):
+        if phrase.strip():
+            phrases.append(phrase.strip())
+        elif word.startswith("-"):
+            excluded.extend(_WORD_PATTERN.findall(word[1:]))
+        else:
+            words.extend(_WORD_PATTERN.findall(word))
+    return words, phrases, excluded
+
+
+def search_terms(query: str) -> List[str]:
+    """Positive terms and phrases from a Mongo $text query string"""
+    words, phrases, _ = parse_query(query)
+    return phrases + words
+
+
+def text_score(doc: dict, words: List[str], phrases: List[str], excluded: List[str]) -> Optional[float]:
+    """
+    Weighted relevance of a document for a parsed query, or None if it does
+    not match. As with $text, a query with phrases matches on the phrases
+    alone and its words only add to the score. Words match tokens they
+    prefix (a stand-in for stemming); the score is the weighted share of
+    matching tokens per field.
+    """
+    if not words and not phrases:
+        return None
+    fields = {field: (doc.get(field) or "").lower() for field in SEARCH_WEIGHTS}
+    text = " ".join(fields.values())
+    if any(phrase.lower() not in text for phrase in phrases):
+        return None
+    lowered = [word.lower() for word in words]
+    excluded = [word.lower() for word in excluded]
+    score, matched_word = 0.0, bool(phrases) or not words
+    for field, value in fields.items():
+        tokens = _WORD_PATTERN.findall(value)
+        if any(token.startswith(word) for token in tokens for word in excluded):
+            return None
+        hits = sum(1 for token in tokens if any(token.startswith(word) for word in lowered))
+        hits += sum(value.count(phrase.lower()) for phrase in phrases)
+        if hits:
+            matched_word = matched_word or any(token.startswith(word) for token in tokens for word in lowered)
+            score += SEARCH_WEIGHTS[field] * hits / (len(tokens) or 1)
+    return score if matched_word else None
+
+
+def build_search_pipeline(
+    query: str,
+    projection: Dict[str, int],
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    sort: str = "relevance",
+    cursor: Optional[str] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Aggregation pipeline for a text search page.
+
+    Status and date filters are applied in the same $match as $text. For
+    relevance order the keyset cursor is (score, timestamp, id) and is
+    applied after the score is projected; for newest-first it seeks on
+    (timestamp, id) like the plain listing.
+    """
+    conditions: List[Dict[str, Any]] = [{"$text": {"$search": query}}]
+    if status is not None:
+        conditions.append({"status": status})
+    if since is not None or until is not None:
+        timestamp_range = {}
+        if since is not None:
+            timestamp_range["$gte"] = since
+        if until is not None:
+            timestamp_range["$lt"] = until
+        conditions.append({"timestamp": timestamp_range})
+    if sort == "newest" and cursor:
+        conditions.append(keyset_filter(cursor))
+
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": {"$and": conditions} if len(conditions) > 1 else conditions[0]},
+        {"$project": {**projection, "score": {"$meta": "textScore"}}},
+    ]
+    if sort == "newest":
+        pipeline.append({"$sort": dict(KEYSET_SORT)})
+    else:
+        if cursor:
+            score, timestamp, doc_id = decode_score_cursor(cursor)
+            pipeline.append({"$match": {"$or": [
+                {"score": {"$lt": score}},
+                {"score": score, "timestamp": {"$lt": timestamp}},
+                {"score": score, "timestamp": timestamp, "id": {"$lt": doc_id}},
+            ]}})
+        pipeline.append({"$sort": {"score": -1, "timestamp": -1, "id": -1}})
+    pipeline.append({"$limit": limit})
+    return pipeline
+
+
+def next_search_cursor(docs: List[dict], limit: int, sort: str) -> Optional[str]:
+    """Cursor for the page after `docs`, or None when this was the last page"""
+    if len(docs) < limit:
+        return None
+    last = docs[-1]
+    if sort == "newest":
+        return encode_cursor(last["timestamp"], last["id"])
+    return encode_score_cursor(last["score"], last["timestamp"], last["id"])
+
+
+def highlight(doc: dict, terms: List[str]) -> Dict[str, str]:
+    """
+    HTML-escaped snippets of the searched fields with matches wrapped in <mark>.
+    Words starting with a term are marked, approximating the stemming Mongo
+    applies to the query.
+    """
+    if not terms:
+        return {}
+    pattern = re.compile(
+        "|".join(rf"\b{re.escape(term)}\w*" for term in sorted(terms, key=len, reverse=True)),
+        re.IGNORECASE
+    )
+    highlights = {}
+    for field in SEARCH_WEIGHTS:
+        text = doc.get(field) or ""
+        first = pattern.search(text)
+        if first is None:
+            continue
+        start = max(first.start() - SNIPPET_CONTEXT, 0)
+        end = min(first.end() + SNIPPET_CONTEXT, len(text))
+        snippet = text[start:end]
+        parts, position = [], 0
+        for match in pattern.finditer(snippet):
+            parts.append(html.escape(snippet[position:match.start()]))
+            parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+            position = match.end()
+        parts.append(html.escape(snippet[position:]))
+        highlights[field] = ("…" if start else "") + "".join(parts) + ("…" if end < len(text) else "")
+    return highlights
@@ -0,0 +1,216 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple, get_args
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from models.contact import MessageStatus
+
+logger = logging.getLogger(__name__)
+
+# Rollup documents, keyed so that every bucket is a single upsert target:
+#   {_id: "day:2026-10-17", kind: "day", day, total, status: {unread, read, archived}}
+#   {_id: "domain:example.com", kind: "domain", domain, total}
+#   {_id: "totals", kind: "totals", total, status: {...}}
+STATS_COLLECTION = "contact_stats"
+STATUSES = get_args(MessageStatus)
+DAY_FORMAT = "%Y-%m-%d"
+
+
+def stats_day(timestamp: datetime) -> str:
+    """UTC day of `timestamp`; naive values are taken as UTC, as MongoDB stores them"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.strftime(DAY_FORMAT)
+
+
+def sender_domain(email: str) -> str:
+    return email.rsplit("@", 1)[-1].strip().lower()
+
+
+def _rollup_operations(deltas: Iterable[Tuple[dict, Optional[str], int]]) -> List[UpdateOne]:
+    """
+    Collapse per-message changes into one `$inc` upsert per bucket.
+
+    Each delta is (message, status, count): the message's day and domain
+    totals move by `count`, and its day/overall status counters move by
+    `count` for `status` (None leaves status counters alone).
+    """
+    incs: Dict[str, Counter] = {}
+    fields: Dict[str, dict] = {}
+
+    def bump(key: str, field: str, count: int, **set_on_insert):
+        incs.setdefault(key, Counter())[field] += count
+        fields.setdefault(key, set_on_insert)
+
+    for doc, status, count in deltas:
+        day = stats_day(doc["timestamp"])
+        if count and status is None:
+            domain = sender_domain(doc["email"])
+            bump(f"day:{day}", "total", count, kind="day", day=day)
+            bump(f"domain:{domain}", "total", count, kind="domain", domain=domain)
+            bump("totals", "total", count, kind="totals")
+        elif count:
+            bump(f"day:{day}", f"status.{status}", count, kind="day", day=day)
+            bump("totals", f"status.{status}", count, kind="totals")
+
+    return [
+        UpdateOne(
+            {"_id": key},
+            {"$inc": {field: count for field, count in counter.items() if count}, "$setOnInsert": fields[key]},
+            upsert=True
+        )
+        for key, counter in incs.items()
+        if any(counter.values())
+    ]
+
+
+async def _apply(db: AsyncIOMotorDatabase, deltas: Iterable[Tuple[dict, Optional[str], int]]) -> None:
+    """
+    Write rollup changes. Failures are logged rather than raised: the message
+    write has already happened, and `python manage.py rebuild-stats` repairs
+    any drift.
+    """
+    operations = _rollup_operations(deltas)
+    if not operations:
+        return
+    try:
+        await db[STATS_COLLECTION].bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.error("Failed to update contact stats rollups: %s", e)
+
+
+async def record_created(db: AsyncIOMotorDatabase, docs: Iterable[dict]) -> None:
+    """Count newly stored messages"""
+    deltas = []
+    for doc in docs:
+        deltas.append((doc, None, 1))
+        deltas.append((doc, doc["status"], 1))
+    await _apply(db, deltas)
+
+
+async def record_deleted(db: AsyncIOMotorDatabase, docs: Iterable[dict]) -> None:
+    """Uncount deleted messages (documents need timestamp, email and status)"""
+    deltas = []
+    for doc in docs:
+        deltas.append((doc, None, -1))
+        deltas.append((doc, doc.get("status", "unread"), -1))
+    await _apply(db, deltas)
+
+
+async def record_status_changed(db: AsyncIOMotorDatabase, docs: Iterable[dict], status: str) -> None:
+    """Move messages from their previous `status` to `status`"""
+    deltas = []
+    for doc in docs:
+        if doc.get("status") == status:
+            continue
+        deltas.append((doc, doc.get("status", "unread"), -1))
+        deltas.append((doc, status, 1))
+    await _apply(db, deltas)
+
+
+def _status_counts(counts: Optional[dict]) -> Dict[str, int]:
+    counts = counts or {}
+    return {status: counts.get(status, 0) for status in STATUSES}
+
+
+def stats_window(days: int) -> List[str]:
+    """The last `days` UTC days as DAY_FORMAT strings, oldest first"""
+    today = datetime.utcnow().date()
+    return [(today - timedelta(days=offset)).strftime(DAY_FORMAT) for offset in range(days - 1, -1, -1)]
+
+
+def assemble_stats(
+    days: List[str],
+    day_status_counts: Dict[str, Dict[str, int]],
+    status_totals: Dict[str, int],
+    domains: List[Tuple[str, int]],
+) -> dict:
+    """
+    Stats response body: overall totals, one zero-filled entry per day in
+    `days` and the given (domain, count) pairs, most frequent first
+    """
+    daily = []
+    for day in days:
+        counts = _status_counts(day_status_counts.get(day))
+        daily.append({"day": day, "total": sum(counts.values()), "by_status": counts})
+    by_status = _status_counts(status_totals)
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "daily": daily,
+        "top_domains": [{"domain": domain, "count": count} for domain, count in domains],
+    }
+
+
+async def read_stats(db: AsyncIOMotorDatabase, days: int, top_domains: int) -> dict:
+    """
+    Dashboard numbers from the rollups only: overall totals, one entry per
+    day for the last `days` days (zero-filled, oldest first) and the
+    `top_domains` sender domains by message count.
+    """
+    collection = db[STATS_COLLECTION]
+    window = stats_window(days)
+
+    totals = await collection.find_one({"_id": "totals"})
+    day_counts = {
+        doc["day"]: doc.get("status", {})
+        async for doc in collection.find({"_id": {"$gte": f"day:{window[0]}", "$lt": "day;"}})
+    }
+    domains = await collection.find(
+        {"kind": "domain", "total": {"$gt": 0}}, {"_id": 0, "domain": 1, "total": 1}
+    ).sort("total", -1).limit(top_domains).to_list(length=top_domains)
+
+    return assemble_stats(
+        window,
+        day_counts,
+        (totals or {}).get("status", {}),
+        [(doc["domain"], doc["total"]) for doc in domains],
+    )
+
+
+def rebuild_pipeline() -> List[dict]:
+    """
+    Single aggregation over contact_messages producing every rollup document:
+    day buckets, then domain and overall totals via $unionWith, written with
+    $out (which swaps the collection in atomically and keeps its indexes).
+    """
+    status_sums = {
+        status: {"$sum": {"$cond": [{"$eq": [{"$ifNull": ["$status", "unread"]}, status]}, 1, 0]}}
+        for status in STATUSES
+    }
+    status_doc = {status: f"${status}" for status in STATUSES}
+    return [
+        {"$group": {
+            "_id": {"$dateToString": {"format": DAY_FORMAT, "date": "$timestamp"}},
+            "total": {"$sum": 1},
+            **status_sums,
+        }},
+        {"$project": {
+            "_id": {"$concat": ["day:", "$_id"]}, "kind": "day", "day": "$_id", "total": 1, "status": status_doc,
+        }},
+        {"$unionWith": {"coll": "contact_messages", "pipeline": [
+            {"$group": {
+                "_id": {"$toLower": {"$arrayElemAt": [{"$split": ["$email", "@"]}, -1]}},
+                "total": {"$sum": 1},
+            }},
+            {"$project": {"_id": {"$concat": ["domain:", "$_id"]}, "kind": "domain", "domain": "$_id", "total": 1}},
+        ]}},
+        {"$unionWith": {"coll": "contact_messages", "pipeline": [
+            {"$group": {"_id": "totals", "total": {"$sum": 1}, **status_sums}},
+            {"$project": {"kind": "totals", "total": 1, "status": status_doc}},
+        ]}},
+        {"$out": STATS_COLLECTION},
+    ]
+
+
+async def rebuild_stats(db: AsyncIOMotorDatabase) -> int:
+    """
+    Recompute all rollups from contact_messages. Increments made by requests
+    while the pipeline runs are lost, so run it during quiet periods.
+    Returns the number of rollup documents written.
+    """
+    await db.contact_messages.aggregate(rebuild_pipeline()).to_list(length=None)
+    return await db[STATS_COLLECTION].count_documents({})
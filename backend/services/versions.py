@@ -0,0 +1,106 @@
+import hashlib
+import multiprocessing
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator
+
+from fastapi import Request
+
+from utils.env import env_bool, env_float, env_int
+
+# Staleness bound for per-worker state when several workers run without a change stream
+MULTI_WORKER_STALENESS_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class ETagSettings:
+    """
+    Conditional GET for list endpoints.
+
+    Versions are counted per worker process. With several workers, set
+    `max_staleness_seconds` so validators also roll over on that interval:
+    a write handled by another worker then shows up within that bound.
+    Several workers without a change stream to follow default to
+    MULTI_WORKER_STALENESS_SECONDS when it is left unset.
+    """
+    enabled: bool = True
+    max_staleness_seconds: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> "ETagSettings":
+        return cls(
+            enabled=env_bool("ETAG_ENABLED", cls.enabled),
+            max_staleness_seconds=env_float("ETAG_MAX_STALENESS_SECONDS", cls.max_staleness_seconds),
+        )
+
+
+def running_multiple_workers() -> bool:
+    """
+    Whether this process is one of several server workers: WEB_CONCURRENCY
+    above 1, or started by a process manager such as `uvicorn --workers`
+    """
+    return env_int("WEB_CONCURRENCY", 1) > 1 or multiprocessing.parent_process() is not None
+
+
+class CollectionVersions:
+    """
+    In-process version counter per collection, bumped by every write path.
+
+    An ETag combines a per-process epoch (so validators from another worker
+    or an earlier process never match), the collection version and a hash
+    of the request variant (query string). Checking one costs a dict lookup
+    and a string comparison; no documents are read.
+    """
+
+    def __init__(self, settings: ETagSettings):
+        self.settings = settings
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: Dict[str, int] = {}
+        self.not_modified = 0
+
+    def bump(self, *collections: str) -> None:
+        for collection in collections:
+            self._versions[collection] = self._versions.get(collection, 0) + 1
+
+    @contextmanager
+    def bumping(self, *collections: str) -> Iterator[None]:
+        """
+        Bump after the wrapped write, even if it fails part-way. Bumping
+        before it would let a concurrent reader tag the old data with the
+        new version.
+        """
+        try:
+            yield
+        finally:
+            self.bump(*collections)
+
+    def version(self, collection: str) -> int:
+        return self._versions.get(collection, 0)
+
+    def etag(self, collection: str, variant: str = "") -> str:
+        window = ""
+        if self.settings.max_staleness_seconds > 0:
+            window = f".{int(time.time() // self.settings.max_staleness_seconds)}"
+        digest = hashlib.blake2b(variant.encode(), digest_size=6).hexdigest()
+        return f'W/"{self.epoch}.{self.version(collection)}{window}.{digest}"'
+
+    def is_fresh(self, request: Request, etag: str) -> bool:
+        """True when the request's If-None-Match already names `etag` (weak comparison)"""
+        if not self.settings.enabled:
+            return False
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+        if "*" in candidates or etag.removeprefix("W/") in candidates:
+            self.not_modified += 1
+            return True
+        return False
+
+    def headers(self, etag: str) -> Dict[str, str]:
+        """Validator headers for a list response; clients must revalidate before reusing it"""
+        if not self.settings.enabled:
+            return {}
+        return {"ETag": etag, "Cache-Control": "private, no-cache"}
@@ -0,0 +1,44 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from repositories.base import Storage
+from utils.env import env_str
+
+STORAGE_BACKENDS = ("mongo", "memory", "sqlite")
+
+
+@dataclass(frozen=True)
+class StorageSettings:
+    """Which storage backend the API uses, read from the environment"""
+    backend: str = "mongo"  # "mongo", "memory" (per process, not persisted) or "sqlite"
+    sqlite_path: str = "portfolio.sqlite3"
+
+    @classmethod
+    def from_env(cls) -> "StorageSettings":
+        settings = cls(
+            backend=env_str("STORAGE_BACKEND", cls.backend),
+            sqlite_path=os.environ.get("SQLITE_PATH") or cls.sqlite_path,
+        )
+        if settings.backend not in STORAGE_BACKENDS:
+            raise ValueError(f"STORAGE_BACKEND must be one of {', '.join(STORAGE_BACKENDS)}")
+        return settings
+
+
+async def open_storage(settings: StorageSettings, db: Optional[AsyncIOMotorDatabase] = None) -> Storage:
+    """
+    Open the configured backend. The Mongo backend wraps `db`, whose client
+    is owned by the caller; embedded backends are imported only when used.
+    """
+    if settings.backend == "mongo":
+        from repositories.mongo import MongoStorage
+        return MongoStorage(db)
+    if settings.backend == "memory":
+        from repositories.memory import MemoryStorage
+        return MemoryStorage()
+    from repositories.sqlite import SQLiteStorage
+    storage = SQLiteStorage(settings.sqlite_path)
+    await storage.open()
+    return storage
@@ -0,0 +1,40 @@
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """
+    Factory for an httpx client bound to a fresh in-process app on memory
+    storage, with its lifespan running. Keyword arguments are set as
+    environment variables before the app is built.
+    """
+    @asynccontextmanager
+    async def client(**env):
+        monkeypatch.setenv("MONGO_URL", "mongodb://localhost:27017")
+        monkeypatch.setenv("DB_NAME", "portfolio_tests")
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+
+        import server
+        from repositories.memory import MemoryStorage
+
+        app = server.create_app(storage=MemoryStorage())
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app, client=("203.0.113.7", 50000))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                yield http
+
+    return client
@@ -0,0 +1,166 @@
+"""
+In-process API tests: the app runs on memory storage behind httpx's ASGI
+transport, so no server or database is needed.
+
+    python -m pytest backend/tests
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def message(index: int = 0, **fields) -> dict:
+    return {
+        "name": f"Sender {index}",
+        "email": f"sender{index}@example.com",
+        "subject": f"Subject {index}",
+        "message": f"Message body number {index}, long enough to pass validation.",
+        **fields,
+    }
+
+
+async def test_create_and_get(api):
+    async with api() as client:
+        created = await client.post("/api/contact", json=message())
+        assert created.status_code == 201
+        data = created.json()["data"]
+        assert data["status"] == "unread"
+
+        fetched = await client.get(f"/api/contact/{data['id']}")
+        assert fetched.status_code == 200
+        assert fetched.json()["data"]["email"] == "sender0@example.com"
+
+        assert (await client.post("/api/contact", json=message(email="not-an-email"))).status_code == 422
+
+
+async def test_duplicate_submission_returns_original(api):
+    async with api() as client:
+        first = (await client.post("/api/contact", json=message())).json()["data"]["id"]
+        repeat = await client.post("/api/contact", json=message(email=" SENDER0@example.com "))
+        assert repeat.status_code == 200
+        assert repeat.json()["data"]["id"] == first
+        assert (await client.get("/api/contact")).json()["count"] == 1
+
+
+async def test_duplicate_of_deleted_message_is_stored_again(api):
+    async with api() as client:
+        first = (await client.post("/api/contact", json=message())).json()["data"]["id"]
+        assert (await client.delete(f"/api/contact/{first}")).status_code == 200
+        again = await client.post("/api/contact", json=message())
+        assert again.status_code == 201
+        assert again.json()["data"]["id"] != first
+
+
+async def test_cursor_pagination(api):
+    async with api() as client:
+        now = datetime.utcnow()
+        batch = [message(index, timestamp=(now - timedelta(minutes=index)).isoformat()) for index in range(7)]
+        assert (await client.post("/api/contact/batch", json={"messages": batch})).status_code == 201
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            page = (await client.get("/api/contact", params=params)).json()
+            seen.extend(doc["subject"] for doc in page["data"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [f"Subject {index}" for index in range(7)]  # newest first, no gaps or repeats
+
+
+async def test_bad_cursor_is_rejected(api):
+    async with api() as client:
+        response = await client.get("/api/contact", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+
+async def test_list_etag_revalidation(api):
+    async with api() as client:
+        await client.post("/api/contact", json=message())
+        first = await client.get("/api/contact")
+        etag = first.headers["etag"]
+
+        unchanged = await client.get("/api/contact", headers={"If-None-Match": etag})
+        assert unchanged.status_code == 304
+
+        await client.post("/api/contact", json=message(1))
+        changed = await client.get("/api/contact", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.json()["count"] == 2
+
+
+async def test_export(api):
+    async with api() as client:
+        await client.post("/api/contact/batch", json={"messages": [message(index) for index in range(3)]})
+
+        ndjson = await client.get("/api/contact/export")
+        assert ndjson.status_code == 200
+        rows = [json.loads(line) for line in ndjson.text.splitlines()]
+        assert sorted(row["email"] for row in rows) == [f"sender{index}@example.com" for index in range(3)]
+
+        csv = await client.get("/api/contact/export", params={"format": "csv"})
+        lines = csv.text.strip().splitlines()
+        assert len(lines) == 4  # header and one row per message
+        assert "email" in lines[0]
+
+
+async def test_batch_and_bulk_delete(api):
+    async with api() as client:
+        batch = [message(0, id="m-0"), message(1, id="m-1"), message(2, id="m-0")]
+        imported = (await client.post("/api/contact/batch", json={"messages": batch})).json()
+        assert imported["processed"] == 2
+        assert [item["result"] for item in imported["results"]] == ["created", "created", "duplicate"]
+
+        deleted = (await client.post("/api/contact/bulk-delete", json={"ids": ["m-0", "missing"]})).json()
+        assert deleted["processed"] == 1
+        assert [item["result"] for item in deleted["results"]] == ["deleted", "not_found"]
+        assert (await client.get("/api/contact/m-0")).status_code == 404
+        assert (await client.get("/api/contact/m-1")).status_code == 200
+
+
+async def test_idempotency_key_replay(api):
+    async with api() as client:
+        headers = {"Idempotency-Key": "retry-1"}
+        first = await client.post("/api/contact", json=message(), headers=headers)
+        repeat = await client.post("/api/contact", json=message(), headers=headers)
+        assert repeat.status_code == first.status_code == 201
+        assert repeat.headers["idempotent-replayed"] == "true"
+        assert repeat.json()["data"]["id"] == first.json()["data"]["id"]
+
+        reused = await client.post("/api/contact", json=message(1), headers=headers)
+        assert reused.status_code == 422
+        assert (await client.get("/api/contact")).json()["count"] == 1
+
+
+async def test_rate_limit(api):
+    async with api(RATE_LIMIT_ENABLED="true", RATE_LIMIT_BURST=2, RATE_LIMIT_PER_MINUTE="0.01") as client:
+        # Rejected submissions and replays do not use up the budget
+        assert (await client.post("/api/contact", json=message(email="bad"))).status_code == 422
+        headers = {"Idempotency-Key": "once"}
+        assert (await client.post("/api/contact", json=message(0), headers=headers)).status_code == 201
+        assert (await client.post("/api/contact", json=message(0), headers=headers)).status_code == 201
+        assert (await client.post("/api/contact", json=message(1))).status_code == 201
+
+        limited = await client.post("/api/contact", json=message(2))
+        assert limited.status_code == 429
+        assert int(limited.headers["retry-after"]) > 0
+
+
+async def test_portfolio_seed_and_etags(api):
+    async with api() as client:
+        plain = await client.get("/api/portfolio", headers={"Accept-Encoding": "identity"})
+        assert plain.status_code == 200
+        assert "projects" in plain.json()
+        assert plain.headers["vary"] == "Accept-Encoding"
+
+        gzipped = await client.get("/api/portfolio", headers={"Accept-Encoding": "gzip"})
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert gzipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+        revalidated = await client.get(
+            "/api/portfolio", headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
@@ -0,0 +1,27 @@
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting from the environment (1/true/yes/on)"""
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_str(name: str, default: str) -> str:
+    """Read a string setting from the environment, lower-cased and stripped"""
+    value = os.environ.get(name)
+    return value.strip().lower() if value not in (None, "") else default
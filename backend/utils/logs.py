@@ -0,0 +1,179 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from utils.env import env_int, env_str
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LogRecord attributes that are not user-supplied `extra=` fields
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def _parse_sample_rates(value: str) -> Dict[str, float]:
+    """`routes.contact=0.1,services.ingestion=0.5` -> {logger name: fraction of INFO records kept}"""
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+@dataclass(frozen=True)
+class LogSettings:
+    """
+    Root logging setup. In "queue" mode request handlers only enqueue
+    records; a background thread formats and writes them, so a slow log
+    sink never blocks the event loop. Records arriving while `queue_size`
+    are pending are dropped and counted instead.
+    """
+    level: str = "INFO"
+    format: str = "text"  # "text" or "json"
+    mode: str = "queue"  # "queue" or "sync"
+    queue_size: int = 10000
+    sample_rates: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "LogSettings":
+        return cls(
+            level=env_str("LOG_LEVEL", cls.level).upper(),
+            format=env_str("LOG_FORMAT", cls.format),
+            mode=env_str("LOG_MODE", cls.mode),
+            queue_size=env_int("LOG_QUEUE_SIZE", cls.queue_size),
+            # Logger names are case-sensitive, so not read through env_str (which lower-cases)
+            sample_rates=_parse_sample_rates(os.environ.get("LOG_SAMPLE", "")),
+        )
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, extra fields and exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of INFO-and-below records from the configured loggers (and their children)"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.sampled_out = 0
+        self._cache: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate, prefix = 1.0, name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue that drops (and counts) records when
+    full rather than blocking. Records are enqueued unformatted, so message
+    interpolation happens on the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """The installed root handler chain; `stop` flushes what is still queued"""
+
+    def __init__(
+        self,
+        sampling: SamplingFilter,
+        queue_handler: Optional[DroppingQueueHandler] = None,
+        listener: Optional[QueueListener] = None,
+    ):
+        self.sampling = sampling
+        self.queue_handler = queue_handler
+        self.listener = listener
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue_handler.queue.qsize() if self.queue_handler is not None else 0,
+            "dropped": self.queue_handler.dropped if self.queue_handler is not None else 0,
+            "sampled_out": self.sampling.sampled_out,
+        }
+
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+
+def configure_logging(settings: LogSettings) -> LogPipeline:
+    """Replace the root handlers according to `settings` (idempotent per process)"""
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JSONFormatter() if settings.format == "json" else logging.Formatter(TEXT_FORMAT))
+    sampling = SamplingFilter(settings.sample_rates)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(settings.level)
+
+    if settings.mode != "queue":
+        output.addFilter(sampling)
+        root.addHandler(output)
+        return LogPipeline(sampling)
+
+    # Sample before enqueueing so dropped lines never cost a queue slot
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.queue_size))
+    queue_handler.addFilter(sampling)
+    listener = QueueListener(queue_handler.queue, output, respect_handler_level=True)
+    listener.start()
+    root.addHandler(queue_handler)
+    pipeline = LogPipeline(sampling, queue_handler, listener)
+    atexit.register(pipeline.stop)
+    return pipeline
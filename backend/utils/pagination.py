@@ -0,0 +1,86 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+
+# Sort order matching `keyset_filter`; `id` breaks ties between equal timestamps
+KEYSET_SORT = [("timestamp", -1), ("id", -1)]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def _encode(values: list) -> str:
+    payload = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(timestamp: datetime, doc_id: str) -> str:
+    """
+    Build an opaque keyset cursor from the (timestamp, id) of the last row on a page
+    """
+    return _encode([timestamp.isoformat(), doc_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by `encode_cursor` back into (timestamp, id)
+    """
+    try:
+        timestamp, doc_id = _decode(cursor)
+        return datetime.fromisoformat(timestamp), str(doc_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def encode_score_cursor(score: float, timestamp: datetime, doc_id: str) -> str:
+    """
+    Cursor for result sets ordered by (score desc, timestamp desc, id desc)
+    """
+    return _encode([score, timestamp.isoformat(), doc_id])
+
+
+def decode_score_cursor(cursor: str) -> Tuple[float, datetime, str]:
+    """
+    Decode a cursor produced by `encode_score_cursor` back into (score, timestamp, id)
+    """
+    try:
+        score, timestamp, doc_id = _decode(cursor)
+        return float(score), datetime.fromisoformat(timestamp), str(doc_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def keyset_filter(cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Mongo filter selecting rows strictly after the cursor in
+    (timestamp desc, id desc) order. Returns an empty filter for the first page.
+    """
+    if not cursor:
+        return {}
+    timestamp, doc_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "id": {"$lt": doc_id}},
+        ]
+    }
+
+
+def next_cursor(docs: list, limit: int) -> Optional[str]:
+    """
+    Cursor for the page following `docs`, or None when this was the last page
+    """
+    if limit <= 0 or len(docs) < limit:
+        return None
+    last = docs[-1]
+    return encode_cursor(last["timestamp"], last["id"])
+
@@ -0,0 +1,49 @@
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib encoder produces the same output
+    orjson = None
+
+
+def _default(value: Any, naive_utc: bool) -> Any:
+    if isinstance(value, datetime):
+        if naive_utc and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        text = value.isoformat()
+        return text[:-6] + "Z" if naive_utc and text.endswith("+00:00") else text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, naive_utc: bool = False) -> bytes:
+    """
+    Encode plain dicts/lists (e.g. documents straight from Mongo) as compact
+    UTF-8 JSON, matching pydantic's output for datetimes. With `naive_utc`,
+    naive datetimes are written as UTC (`...Z`).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=(orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z) if naive_utc else 0)
+    return json.dumps(
+        obj, default=lambda value: _default(value, naive_utc), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for documents that were validated when they were written.
+
+    Returning it from a route skips `response_model` re-validation (the model
+    still documents the schema in OpenAPI) and encodes with `dumps`.
+    """
+    media_type = "application/json"
+
+    def __init__(self, content: Any, naive_utc: bool = False, **kwargs):
+        self.naive_utc = naive_utc
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content, naive_utc=self.naive_utc)
@@ -6,12 +6,13 @@ Tests the contact form API endpoints for proper functionality
 
 import requests
 import json
+import os
 import sys
 from datetime import datetime
 import uuid
 
-# Test configuration
-BASE_URL = "https://portfolio-pro-322.preview.emergentagent.com/api"
+# Test configuration (point BACKEND_TEST_URL at e.g. http://localhost:8001/api for local runs)
+BASE_URL = os.environ.get("BACKEND_TEST_URL", "https://portfolio-pro-322.preview.emergentagent.com/api")
 CONTACT_ENDPOINT = f"{BASE_URL}/contact"
 
 def log_test_result(test_name, success, details=""):